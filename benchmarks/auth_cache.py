@@ -0,0 +1,51 @@
+"""
+Authenticated requests per second with the principal cache on and off.
+
+    python -m benchmarks.auth_cache --requests 2000 --concurrency 20
+"""
+import argparse
+import asyncio
+import json
+
+from benchmarks.common import asgi_client, bearer, seed_demo_data, timer, use_scratch_database
+
+
+async def _run(requests: int, concurrency: int) -> dict:
+    use_scratch_database()
+    from proplan.utils.principal_cache import principal_cache
+
+    await seed_demo_data()
+    results = {}
+    async with asgi_client() as client:
+        headers = await bearer(client, "admin@example.com", "admin123")
+        me = (await client.get("/users/?limit=1", headers=headers)).json()[0]["id"]
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with sem:
+                r = await client.get(f"/users/{me}", headers=headers)
+                r.raise_for_status()
+
+        for label, ttl in (("cache_off", 0), ("cache_on", 30)):
+            principal_cache.configure(maxsize=4096, ttl=ttl)
+            with timer() as t:
+                await asyncio.gather(*(one() for _ in range(requests)))
+            results[label] = {
+                "requests": requests,
+                "seconds": round(t["seconds"], 3),
+                "rps": round(requests / t["seconds"], 1),
+                "cache": principal_cache.stats(),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(_run(args.requests, args.concurrency)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Auto-assign solver at scale.
+
+"solver" times `proplan.utils.matching.max_assignment` on synthetic tasks/workers
+(a `--leave` share of workers has leave overlapping some task windows); "api" seeds
+one project through `manage.seed_bulk` and times POST /projects/{id}/auto-assign
+(dry run, then for real) end to end on the scratch database.
+
+    python -m benchmarks.auto_assign --tasks 10000 --workers 10000
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import random
+from datetime import date, timedelta
+
+from benchmarks.common import asgi_client, bearer, seed_demo_data, timer, use_scratch_database
+
+
+def solver(tasks: int, workers: int, leave_share: float, headcount: int, seed: int) -> dict:
+    from proplan.utils.matching import Slot, blocked_tasks, max_assignment
+
+    rng = random.Random(seed)
+    base = date.today()
+    slots = []
+    for i in range(tasks):
+        start = base + timedelta(days=rng.randrange(90))
+        slots.append(Slot(i, headcount, start, start + timedelta(days=rng.randrange(5))))
+    slots.sort(key=lambda s: s.start)
+    leave = {}
+    for w in range(workers):
+        if rng.random() < leave_share:
+            start = base + timedelta(days=rng.randrange(90))
+            leave[w] = [(start, start + timedelta(days=rng.randrange(1, 15)))]
+
+    with timer() as t_blocked:
+        blocked = blocked_tasks(slots, leave)
+    with timer() as t:
+        pairs = max_assignment(slots, list(range(workers)), leave)
+    return {
+        "tasks": tasks,
+        "workers": workers,
+        "slots": tasks * headcount,
+        "workers_with_leave": len(leave),
+        "blocked_edges": sum(len(b) for b in blocked.values()),
+        "assigned": len(pairs),
+        "blocked_index_seconds": round(t_blocked["seconds"], 3),
+        "seconds": round(t["seconds"], 3),
+    }
+
+
+async def api(tasks: int, workers: int, seed: int) -> dict:
+    use_scratch_database()
+    from proplan.manage import seed_bulk
+
+    await seed_demo_data()
+    with timer() as t_seed:
+        await seed_bulk(workers, 1, tasks, 1, seed)
+    project_id = 2  # the demo project is 1
+    results = {"seed_seconds": round(t_seed["seconds"], 2)}
+    async with asgi_client() as client:
+        admin = await bearer(client, "admin@example.com", "admin123")
+        for label, dry in (("dry_run", "true"), ("commit", "false")):
+            with timer() as t:
+                r = await client.post(f"/projects/{project_id}/auto-assign?dry_run={dry}", headers=admin, timeout=600)
+            r.raise_for_status()
+            body = r.json()
+            results[label] = {
+                "seconds": round(t["seconds"], 3),
+                "assigned": body["assigned"],
+                "unfilled_tasks": len(body["unfilled"]),
+                "idle_workers": body["idle_workers"],
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=10_000)
+    parser.add_argument("--leave", type=float, default=0.2, help="share of workers with leave in the task horizon")
+    parser.add_argument("--headcount", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--skip-api", action="store_true", help="only time the in-memory solver")
+    args = parser.parse_args()
+
+    results = {"solver": solver(args.tasks, args.workers, args.leave, args.headcount, args.seed)}
+    if not args.skip_api:
+        # the app prints a line per (skipped) email
+        with contextlib.redirect_stdout(io.StringIO()):
+            results["api"] = asyncio.run(api(args.tasks, args.workers, args.seed))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
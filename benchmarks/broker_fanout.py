@@ -0,0 +1,102 @@
+"""
+Cross-process delivery through the notification broker, offline on one box.
+
+Starts `--workers` processes that each run a broker plus a hub with one subscribed
+socket, publish `--events` events at `--rate` events/s, and report what arrived from
+the other processes and how late (wall clock, so processes share a time base).
+
+    python -m benchmarks.broker_fanout --backend socket --workers 4 --events 500
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.broker_fanout --backend postgres
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing as mp
+import os
+import tempfile
+import time
+
+
+class _Recorder:
+    def __init__(self):
+        self.received: list[tuple[int, float]] = []
+
+    async def send_text(self, text: str) -> None:
+        event = json.loads(text)
+        self.received.append((event["origin"], time.time() - event["sent_at"]))
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        pass
+
+
+async def _worker(index: int, args, barrier) -> dict:
+    from proplan.notifications import Hub, create_broker
+
+    hub = Hub(queue_size=args.workers * args.events + 1)
+    kwargs = {"path": args.socket_path} if args.backend == "socket" else {}
+    broker = create_broker(args.backend, hub, **kwargs)
+    await broker.start()
+    recorder = _Recorder()
+    hub.subscribe(hub.connect(recorder, user_id=index), ["project:1"])
+    await asyncio.to_thread(barrier.wait)
+
+    interval = 1 / args.rate if args.rate else 0
+    for seq in range(args.events):
+        broker.publish(["project:1"], {"type": "bench", "origin": index, "seq": seq, "sent_at": time.time()})
+        await asyncio.sleep(interval)
+    await asyncio.to_thread(barrier.wait)
+    deadline = time.time() + args.drain
+    expected = args.workers * args.events
+    while len(recorder.received) < expected and time.time() < deadline:
+        await asyncio.sleep(0.01)
+    await asyncio.to_thread(barrier.wait)
+    await broker.stop()
+    relay = getattr(broker, "is_relay", False)
+    return {"worker": index, "relay": relay, "received": recorder.received, "batches_sent": broker.batches_sent}
+
+
+def _run_worker(index: int, args, barrier, results) -> None:
+    results.put(asyncio.run(_worker(index, args, barrier)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=("socket", "postgres"), default="socket")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--events", type=int, default=500, help="events published per worker")
+    parser.add_argument("--rate", type=float, default=1000, help="events/s per worker (0 = as fast as possible)")
+    parser.add_argument("--drain", type=float, default=5, help="seconds to wait for stragglers")
+    parser.add_argument("--socket-path", default=os.path.join(tempfile.gettempdir(), f"proplan-bench-{os.getpid()}.sock"))
+    args = parser.parse_args()
+
+    ctx = mp.get_context("spawn")
+    barrier, results = ctx.Barrier(args.workers), ctx.Queue()
+    procs = [ctx.Process(target=_run_worker, args=(i, args, barrier, results)) for i in range(args.workers)]
+    for p in procs:
+        p.start()
+    reports = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+
+    latencies = sorted(lat for r in reports for origin, lat in r["received"] if origin != r["worker"])
+    expected = args.workers * (args.workers - 1) * args.events
+
+    def pct(p: float):
+        return round(latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000, 2) if latencies else None
+
+    print(json.dumps({
+        "backend": args.backend,
+        "workers": args.workers,
+        "events_per_worker": args.events,
+        "cross_worker_expected": expected,
+        "cross_worker_received": len(latencies),
+        "p50_ms": pct(50),
+        "p99_ms": pct(99),
+        "max_ms": pct(100),
+        "batches_sent": sum(r["batches_sent"] for r in reports),
+        "relay": [r["worker"] for r in reports if r["relay"]],
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
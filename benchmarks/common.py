@@ -0,0 +1,49 @@
+"""
+Helpers shared by the benchmark scripts.
+
+Benchmarks run fully offline: point DATABASE_URL at a scratch SQLite file (or a local
+Postgres) *before* importing anything from `proplan`, then drive the app in-process.
+"""
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+
+def use_scratch_database() -> str:
+    """Default DATABASE_URL to a fresh SQLite file unless the caller already set one."""
+    if "DATABASE_URL" not in os.environ:
+        path = os.path.join(tempfile.mkdtemp(prefix="proplan-bench-"), "bench.db")
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{path}"
+    return os.environ["DATABASE_URL"]
+
+
+async def seed_demo_data() -> None:
+    from proplan.database import async_session_factory, init_db
+    from proplan.manage import seed_projects_and_tasks, seed_users
+
+    await init_db()
+    async with async_session_factory() as session:
+        await seed_users(session)
+        await seed_projects_and_tasks(session)
+
+
+def asgi_client():
+    import httpx
+    from proplan.main import app
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+
+
+async def bearer(client, email: str, password: str) -> dict:
+    r = await client.post("/auth/token", data={"username": email, "password": password})
+    r.raise_for_status()
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+@contextmanager
+def timer():
+    result = {}
+    start = time.perf_counter()
+    yield result
+    result["seconds"] = time.perf_counter() - start
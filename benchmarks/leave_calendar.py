@@ -0,0 +1,124 @@
+"""
+Team leave heatmap for a large project over a year.
+
+"naive" replays the client-side approach (walk every day of every entry);
+"sweep" is `proplan.utils.leave_calendar.leave_heatmap`. Both run on the same
+synthetic entries and must agree; "api" times GET /projects/{id}/leave-calendar
+on a project seeded through `manage.seed_bulk`.
+
+    python -m benchmarks.leave_calendar --members 5000 --entries-per-member 6
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import random
+from datetime import date, timedelta
+
+from benchmarks.common import asgi_client, bearer, seed_demo_data, timer, use_scratch_database
+
+
+def naive(entries, start: date, end: date) -> list[dict]:
+    days = {}
+    for user_id, kind, a, b in entries:
+        d = max(a, start)
+        while d <= min(b, end):
+            day = days.setdefault(d, {"users": set(), "by_type": {}})
+            day["users"].add(user_id)
+            day["by_type"].setdefault(kind.value, set()).add(user_id)
+            d += timedelta(days=1)
+    return [
+        {
+            "total": len(days[d]["users"]),
+            "by_type": {k: len(v) for k, v in days[d]["by_type"].items()},
+            "user_ids": sorted(days[d]["users"]),
+        } if d in days else {"total": 0, "by_type": {}, "user_ids": []}
+        for d in (start + timedelta(days=i) for i in range((end - start).days + 1))
+    ]
+
+
+def offline(members: int, per_member: int, seed: int) -> dict:
+    from proplan.enums import DayOffType
+    from proplan.utils.leave_calendar import leave_heatmap
+
+    rng = random.Random(seed)
+    start = date.today()
+    end = start + timedelta(days=364)
+    types = list(DayOffType)
+    entries = []
+    for user_id in range(members):
+        for _ in range(per_member):
+            a = start + timedelta(days=rng.randrange(-10, 365))
+            entries.append((user_id, rng.choice(types), a, a + timedelta(days=rng.randrange(14))))
+
+    with timer() as t_naive:
+        expected = naive(entries, start, end)
+    with timer() as t_sweep:
+        rows = leave_heatmap(entries, start, end, DayOffType)
+    agree = all(
+        r["total"] == e["total"]
+        and r["user_ids"] == e["user_ids"]
+        and {k: v for k, v in r["by_type"].items() if v} == e["by_type"]
+        for r, e in zip(rows, expected)
+    )
+    return {
+        "members": members,
+        "entries": len(entries),
+        "days": len(rows),
+        "naive_seconds": round(t_naive["seconds"], 3),
+        "sweep_seconds": round(t_sweep["seconds"], 3),
+        "agree": agree,
+    }
+
+
+async def api(members: int, per_member: int, seed: int) -> dict:
+    use_scratch_database()
+    from proplan.manage import seed_bulk
+
+    await seed_demo_data()
+    with timer() as t_seed:
+        await seed_bulk(members, 1, 1, per_member, seed)
+    project_id = 2  # the demo project is 1
+    # seed_bulk lays leave out from ~180 days ago onwards: the year around today holds all of it
+    start = date.today() - timedelta(days=180)
+    async with asgi_client() as client:
+        admin = await bearer(client, "admin@example.com", "admin123")
+        with timer() as t:
+            r = await client.get(
+                f"/projects/{project_id}/leave-calendar",
+                params={"from": str(start), "to": str(start + timedelta(days=364))},
+                headers=admin,
+                timeout=600,
+            )
+        r.raise_for_status()
+        days = r.json()["days"]
+    on_leave = set().union(*(d["user_ids"] for d in days))
+    # timing an almost empty calendar would say nothing about the sweep
+    assert not per_member or len(on_leave) >= 0.9 * members, f"only {len(on_leave)} of {members} members in the window"
+    return {
+        "seed_seconds": round(t_seed["seconds"], 2),
+        "seconds": round(t["seconds"], 3),
+        "members_on_leave": len(on_leave),
+        "peak_off": max(d["total"] for d in days),
+        "bytes": len(r.content),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--members", type=int, default=5000)
+    parser.add_argument("--entries-per-member", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=3)
+    parser.add_argument("--skip-api", action="store_true", help="only time the in-memory computation")
+    args = parser.parse_args()
+
+    results = {"offline": offline(args.members, args.entries_per_member, args.seed)}
+    if not args.skip_api:
+        with contextlib.redirect_stdout(io.StringIO()):
+            results["api"] = asyncio.run(api(args.members, args.entries_per_member, args.seed))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
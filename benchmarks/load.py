@@ -0,0 +1,266 @@
+"""
+HTTP load generator with a configurable ProPlan traffic mix.
+
+Drives the app in-process through ASGI (default) or a running server (`--url`), and
+prints per-route throughput and p50/p95/p99 latency as JSON so runs can be diffed
+across commits. Runs offline against SQLite (default scratch DB) or a local Postgres
+given through DATABASE_URL; with `--url`, point the server at the same DATABASE_URL
+so it sees the seeded data (or pass `--no-seed` for an already-seeded server).
+
+    python -m benchmarks.load --duration 30 --users 20 \\
+        --mix login=1,list_tasks=6,list_projects=3,assign_worker=2,day_off=1,report_csv=1
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import random
+import subprocess
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+from benchmarks.common import asgi_client, bearer, seed_demo_data, use_scratch_database
+
+DEFAULT_MIX = "login=1,list_tasks=6,list_projects=3,assign_worker=2,day_off=1,report_csv=1"
+WORKER_PASSWORD = "worker123"
+
+
+@dataclass
+class RouteStats:
+    latencies: list[float] = field(default_factory=list)
+    statuses: dict[int, int] = field(default_factory=lambda: defaultdict(int))
+    errors: int = 0
+
+    def summary(self, seconds: float) -> dict:
+        ordered = sorted(self.latencies)
+
+        def pct(p: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000, 2)
+
+        return {
+            "requests": len(ordered),
+            "throughput_rps": round(len(ordered) / seconds, 2),
+            "p50_ms": pct(50),
+            "p95_ms": pct(95),
+            "p99_ms": pct(99),
+            "statuses": dict(sorted(self.statuses.items())),
+            "errors": self.errors,
+        }
+
+
+@dataclass
+class Fixture:
+    admin: dict
+    worker_headers: list[dict]
+    worker_emails: list[str]
+    worker_ids: list[int]
+    task_ids: list[int]
+    project_ids: list[int]
+    report_month: date
+
+
+async def seed_load_fixture(workers: int, tasks: int) -> None:
+    """Demo data plus `workers` project members and `tasks` tasks spread over last month."""
+    from sqlmodel import select
+    from proplan.database import async_session_factory
+    from proplan.models import Project, ProjectWorkerLink, Task, User
+    from proplan.enums import Role
+    from proplan.utils.users_dependency import get_password_hash
+
+    await seed_demo_data()
+    password_hash = get_password_hash(WORKER_PASSWORD)
+    last_month = date.today().replace(day=1) - timedelta(days=1)
+    async with async_session_factory() as session:
+        project = (await session.exec(select(Project).order_by(Project.id))).first()
+        users = [
+            User(name=f"Load Worker {i}", email=f"load{i}@example.com", password_hash=password_hash, role=Role.WORKER)
+            for i in range(workers)
+        ]
+        session.add_all(users)
+        await session.flush()
+        session.add_all(ProjectWorkerLink(project_id=project.id, user_id=u.id) for u in users)
+        session.add_all(
+            Task(
+                name=f"Load task {i}",
+                project_id=project.id,
+                start_time=datetime(last_month.year, last_month.month, 1 + i % last_month.day, 9),
+            )
+            for i in range(tasks)
+        )
+        await session.commit()
+
+
+async def load_fixture(client, workers: int) -> Fixture:
+    admin = await bearer(client, "admin@example.com", "admin123")
+    emails = [f"load{i}@example.com" for i in range(workers)]
+    worker_headers = [await bearer(client, email, WORKER_PASSWORD) for email in emails[: min(workers, 20)]]
+    users = (await client.get("/users/?limit=500", headers=admin)).json()
+    by_email = {u["email"]: u["id"] for u in users}
+    tasks = (await client.get("/tasks/?limit=500", headers=admin)).json()
+    projects = (await client.get("/projects/?limit=500", headers=admin)).json()
+    return Fixture(
+        admin=admin,
+        worker_headers=worker_headers,
+        worker_emails=emails,
+        worker_ids=[by_email[e] for e in emails if e in by_email],
+        task_ids=[t["id"] for t in tasks],
+        project_ids=[p["id"] for p in projects],
+        report_month=date.today().replace(day=1) - timedelta(days=1),
+    )
+
+
+Scenario = Callable[["Runner"], Awaitable[None]]
+
+
+class Runner:
+    def __init__(self, client, fixture: Fixture, rng: random.Random):
+        self.client = client
+        self.fx = fixture
+        self.rng = rng
+        self.stats: dict[str, RouteStats] = defaultdict(RouteStats)
+
+    async def request(self, route: str, method: str, url: str, **kwargs) -> Optional[int]:
+        start = time.perf_counter()
+        stats = self.stats[route]
+        try:
+            r = await self.client.request(method, url, **kwargs)
+        except Exception:
+            stats.errors += 1
+            return None
+        stats.latencies.append(time.perf_counter() - start)
+        stats.statuses[r.status_code] += 1
+        if r.status_code >= 500:
+            stats.errors += 1
+        return r.status_code
+
+    # ---- scenarios ----------------------------------------------------------
+
+    async def login(self):
+        email = self.rng.choice(self.fx.worker_emails)
+        await self.request("POST /auth/token", "POST", "/auth/token",
+                           data={"username": email, "password": WORKER_PASSWORD})
+
+    async def list_tasks(self):
+        await self.request("GET /tasks/", "GET", "/tasks/?limit=100", headers=self.fx.admin)
+
+    async def list_projects(self):
+        await self.request("GET /projects/", "GET", "/projects/?limit=100", headers=self.fx.admin)
+
+    async def assign_worker(self):
+        task_id = self.rng.choice(self.fx.task_ids)
+        worker_id = self.rng.choice(self.fx.worker_ids)
+        status = await self.request("POST /tasks/{task_id}/assign-worker/{worker_id}", "POST",
+                                    f"/tasks/{task_id}/assign-worker/{worker_id}", headers=self.fx.admin)
+        if status == 200:
+            # release the worker again so the one-task-per-worker rule does not exhaust the pool
+            await self.request("POST /tasks/{task_id}/remove-worker/{worker_id}", "POST",
+                               f"/tasks/{task_id}/remove-worker/{worker_id}", headers=self.fx.admin)
+
+    async def day_off(self):
+        start = date.today() + timedelta(days=self.rng.randint(30, 300))
+        await self.request("POST /days-off/", "POST", "/days-off/", headers=self.rng.choice(self.fx.worker_headers),
+                           json={"type": "Day Off", "start_date": start.isoformat(), "end_date": start.isoformat()})
+
+    async def report_csv(self):
+        month = self.fx.report_month
+        project_id = self.rng.choice(self.fx.project_ids)
+        await self.request("GET /reports/projects/{project_id}/{year}/{month}/export-csv", "GET",
+                           f"/reports/projects/{project_id}/{month.year}/{month.month}/export-csv",
+                           headers=self.fx.admin)
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "login": Runner.login,
+    "list_tasks": Runner.list_tasks,
+    "list_projects": Runner.list_projects,
+    "assign_worker": Runner.assign_worker,
+    "day_off": Runner.day_off,
+    "report_csv": Runner.report_csv,
+}
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    mix = {}
+    for part in filter(None, spec.split(",")):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+async def run(args) -> dict:
+    import httpx
+
+    mix = parse_mix(args.mix)
+    if not args.url:
+        use_scratch_database()
+    if not args.no_seed:
+        await seed_load_fixture(args.workers, args.tasks)
+
+    client = httpx.AsyncClient(base_url=args.url, timeout=60) if args.url else asgi_client()
+    async with client:
+        fixture = await load_fixture(client, args.workers)
+        runner = Runner(client, fixture, random.Random(args.seed))
+        names, weights = list(mix), list(mix.values())
+        deadline = time.perf_counter() + args.duration
+
+        async def virtual_user():
+            while time.perf_counter() < deadline:
+                await SCENARIOS[runner.rng.choices(names, weights)[0]](runner)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(virtual_user() for _ in range(args.users)))
+        elapsed = time.perf_counter() - started
+
+    total = sum(len(s.latencies) for s in runner.stats.values())
+    return {
+        "commit": _git_revision(),
+        "target": args.url or "asgi",
+        "database": "external" if args.url else use_scratch_database().split(":", 1)[0],
+        "mix": mix,
+        "users": args.users,
+        "duration_s": round(elapsed, 2),
+        "total": {"requests": total, "throughput_rps": round(total / elapsed, 2)},
+        "routes": {route: stats.summary(elapsed) for route, stats in sorted(runner.stats.items())},
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="base URL of a running server (default: in-process ASGI)")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to run")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario=weight,... (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=50, help="seeded project members")
+    parser.add_argument("--tasks", type=int, default=500, help="seeded tasks")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for the traffic mix")
+    parser.add_argument("--no-seed", action="store_true", help="assume the database is already seeded")
+    parser.add_argument("--out", help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    # the app prints a line per (skipped) email; keep stdout clean for the JSON
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = asyncio.run(run(args))
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as fh:
+            fh.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Login throughput and event-loop responsiveness during a burst of /auth/token calls.
+
+Compares hashing inline on the event loop with the bounded hashing pool, and reports
+how many logins were shed with 503 once the queue was full.
+
+    python -m benchmarks.login_throughput --logins 200 --workers 4 --queue 32
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from benchmarks.common import asgi_client, seed_demo_data, timer, use_scratch_database
+
+
+async def _burst(client, logins: int) -> dict:
+    statuses: dict[int, int] = {}
+    health_ms: list[float] = []
+    done = asyncio.Event()
+
+    async def login():
+        r = await client.post("/auth/token", data={"username": "worker1@example.com", "password": "worker123"})
+        statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+
+    async def probe():
+        # a cheap request that should stay fast while logins are being hashed
+        # includes time spent waiting for the event loop, which inline bcrypt blocks
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.005)
+            await client.get("/health")
+            health_ms.append((time.perf_counter() - start) * 1000 - 5)
+
+    probe_task = asyncio.create_task(probe())
+    with timer() as t:
+        await asyncio.gather(*(login() for _ in range(logins)))
+    done.set()
+    await probe_task
+    ok = statuses.get(200, 0)
+    return {
+        "seconds": round(t["seconds"], 3),
+        "logins_per_second": round(ok / t["seconds"], 1),
+        "statuses": statuses,
+        "health_samples": len(health_ms),
+        "health_p50_ms": round(statistics.median(health_ms), 2) if health_ms else None,
+        "health_max_ms": round(max(health_ms), 2) if health_ms else None,
+    }
+
+
+async def _run(logins: int, workers: int, queue: int, kind: str) -> dict:
+    use_scratch_database()
+    from proplan.utils.password_hasher import password_hasher
+
+    await seed_demo_data()
+    results = {}
+    async with asgi_client() as client:
+        for label, n in (("inline", 0), (f"{kind}_pool", workers)):
+            password_hasher.shutdown()
+            password_hasher.kind, password_hasher.workers, password_hasher.queue_size = kind, n, queue
+            password_hasher.rejected = 0
+            results[label] = await _burst(client, logins)
+    password_hasher.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queue", type=int, default=32)
+    parser.add_argument("--executor", choices=("thread", "process"), default="thread")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(_run(args.logins, args.workers, args.queue, args.executor)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
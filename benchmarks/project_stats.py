@@ -0,0 +1,89 @@
+"""
+Dashboard counters: stored `project_stats` rows vs counting on every request.
+
+Seeds `--projects` x `--tasks-per-project` tasks through `manage.seed_bulk`, then times
+GET /projects/{id}/stats (a primary-key read) and one page of GET /projects/stats
+against the aggregate the counters replace (`stats_manager.counts_query`, i.e. a
+GROUP BY over tasks and memberships). Both answers are checked to agree.
+
+    python -m benchmarks.project_stats --projects 1000 --tasks-per-project 1000
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import statistics
+import time
+
+from benchmarks.common import asgi_client, bearer, seed_demo_data, timer, use_scratch_database
+
+COLUMNS = ("open_tasks", "in_progress_tasks", "done_tasks", "members")
+
+
+def _summary(samples: list[float]) -> dict:
+    samples = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(samples) * 1000, 2),
+        "p95_ms": round(samples[min(len(samples) - 1, int(0.95 * len(samples)))] * 1000, 2),
+    }
+
+
+async def run(projects: int, tasks_per_project: int, repeat: int) -> dict:
+    use_scratch_database()
+    from proplan.database import async_session_factory
+    from proplan.manage import seed_bulk
+    from proplan.managers.stats_manager import counts_query
+
+    await seed_demo_data()
+    with timer() as t_seed:
+        counts = await seed_bulk(projects // 10 or 1, projects, tasks_per_project, 0, 7)
+    project_id = 1 + projects // 2
+
+    results = {"tasks": counts["tasks"], "seed_seconds": round(t_seed["seconds"], 1)}
+    async with asgi_client() as client:
+        admin = await bearer(client, "admin@example.com", "admin123")
+        samples, stored = [], None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            r = await client.get(f"/projects/{project_id}/stats", headers=admin)
+            samples.append(time.perf_counter() - start)
+            stored = r.raise_for_status().json()
+        results["GET /projects/{id}/stats"] = _summary(samples)
+
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            r = await client.get("/projects/stats", params={"limit": 500}, headers=admin)
+            samples.append(time.perf_counter() - start)
+            r.raise_for_status()
+        results["GET /projects/stats (500 rows)"] = _summary(samples)
+
+    samples, counted = {"one project": [], "all projects": []}, None
+    async with async_session_factory() as session:
+        for _ in range(max(1, repeat // 5)):
+            start = time.perf_counter()
+            counted = (await session.exec(counts_query(project_id))).one()
+            samples["one project"].append(time.perf_counter() - start)
+            start = time.perf_counter()
+            (await session.exec(counts_query())).all()
+            samples["all projects"].append(time.perf_counter() - start)
+    results["aggregate on read"] = {label: _summary(s) for label, s in samples.items()}
+    results["matches"] = tuple(stored[c] for c in COLUMNS) == tuple(counted[1:])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=1000)
+    parser.add_argument("--tasks-per-project", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50, help="requests per route")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = asyncio.run(run(args.projects, args.tasks_per_project, args.repeat))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Full-text search latency on a large task table.
+
+Seeds `--projects` x `--tasks-per-project` tasks through `manage.seed_bulk` (1M by
+default; names look like "Pour roof #123"), then times GET /tasks/?q= and GET /search?q=
+through the ASGI app for common, narrow, multi-word and single-row queries. "like_scan"
+runs the same queries through the unindexed LIKE fallback for comparison.
+
+    python -m benchmarks.search --projects 1000 --tasks-per-project 1000
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.search
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import statistics
+import time
+
+from benchmarks.common import asgi_client, bearer, seed_demo_data, timer, use_scratch_database
+
+QUERIES = {
+    "common word": "inspect",
+    "prefix": "scaff",
+    "two words": "pour roof",
+    "single row": "{tid}",
+}
+
+
+def _summary(samples: list[float]) -> dict:
+    samples = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(samples) * 1000, 2),
+        "p95_ms": round(samples[min(len(samples) - 1, int(0.95 * len(samples)))] * 1000, 2),
+    }
+
+
+async def run(projects: int, tasks_per_project: int, repeat: int, limit: int) -> dict:
+    use_scratch_database()
+    from proplan.database import async_session_factory
+    from proplan.manage import seed_bulk
+    from proplan.models import Task
+    from proplan.search import match
+    from proplan.utils.fieldsets import select_rows
+    from proplan.utils.pagination import PageParams, paginate_ranked
+
+    await seed_demo_data()
+    with timer() as t_seed:
+        counts = await seed_bulk(projects // 10 or 1, projects, tasks_per_project, 0, 11)
+    tid = 1_000 + tasks_per_project * projects // 2  # some task in the middle of the table
+    queries = {label: q.format(tid=tid) for label, q in QUERIES.items()}
+
+    results = {"tasks": counts["tasks"], "seed_seconds": round(t_seed["seconds"], 1), "queries": {}}
+    async with asgi_client() as client:
+        admin = await bearer(client, "admin@example.com", "admin123")
+        for label, q in queries.items():
+            entry = results["queries"][label] = {"q": q}
+            for route in ("/tasks/", "/search"):
+                samples, matched = [], 0
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    r = await client.get(route, params={"q": q, "limit": limit}, headers=admin, timeout=600)
+                    samples.append(time.perf_counter() - start)
+                    r.raise_for_status()
+                    body = r.json()
+                    matched = len(body if route == "/tasks/" else body["tasks"]["items"])
+                entry[route] = {**_summary(samples), "returned": matched}
+
+            samples = []
+            for _ in range(max(1, repeat // 5)):
+                async with async_session_factory() as session:
+                    statement, rank = match(select_rows(Task, None), Task, q, "unindexed")
+                    start = time.perf_counter()
+                    await paginate_ranked(session, statement, rank, Task.id, PageParams(limit=limit))
+                    samples.append(time.perf_counter() - start)
+            entry["like_scan"] = _summary(samples)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=1000)
+    parser.add_argument("--tasks-per-project", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20, help="requests per query and route")
+    parser.add_argument("--limit", type=int, default=20, help="page size")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = asyncio.run(run(args.projects, args.tasks_per_project, args.repeat, args.limit))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Serializing large task lists, offline (no database, no HTTP).
+
+Builds `--rows` transient `Task` instances and encodes them the ways a list endpoint
+can: the previous path (no response_model, so `jsonable_encoder` + stdlib json),
+FastAPI's `response_model` path (validate from attributes, dump, render), and
+`proplan.responses.RowEncoder` with each available backend. Every output is checked to
+decode to the same list. "gzip" times the compression middleware's work on the body.
+
+    python -m benchmarks.serialization --rows 100000
+"""
+import argparse
+import gzip
+import json
+from datetime import datetime, timedelta
+from typing import List
+from unittest import mock
+
+from benchmarks.common import timer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--gzip-level", type=int, default=5)
+    args = parser.parse_args()
+
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import TypeAdapter
+
+    from proplan import responses
+    from proplan.custom_models import TaskOut
+    from proplan.enums import TaskStatus
+    from proplan.models import Task
+
+    base = datetime(2025, 1, 1, 8, 30)
+    rows = [
+        Task(
+            id=i, name=f"Task {i}", start_time=base + timedelta(hours=i), end_time=None,
+            status=list(TaskStatus)[i % 3], details="Site inspection and report " * 2,
+            project_id=i % 1000 + 1, version=1_700_000_000_000_000 + i,
+        )
+        for i in range(args.rows)
+    ]
+    adapter = TypeAdapter(List[TaskOut])
+    encoder = responses.RowEncoder(TaskOut)
+
+    candidates = {
+        "jsonable_encoder + json": lambda: json.dumps(jsonable_encoder(rows)).encode(),
+        "response_model + json": lambda: json.dumps(adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")).encode(),
+        "response_model + fast render": lambda: responses.dumps(adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")),
+        "row_encoder (pydantic-core)": lambda: _without_orjson(responses, encoder, rows),
+    }
+    if responses.orjson is not None:
+        candidates["row_encoder (orjson)"] = lambda: encoder.encode(rows)
+
+    results, reference, body = {}, None, b""
+    for label, encode in candidates.items():
+        with timer() as t:
+            body = encode()
+        decoded = json.loads(body)
+        reference = reference if reference is not None else decoded
+        results[label] = {"seconds": round(t["seconds"], 3), "bytes": len(body), "matches": decoded == reference}
+
+    with timer() as t:
+        packed = gzip.compress(body, compresslevel=args.gzip_level)
+    results["gzip"] = {
+        "level": args.gzip_level,
+        "seconds": round(t["seconds"], 3),
+        "bytes": len(packed),
+        "ratio": round(len(body) / len(packed), 1),
+    }
+    print(json.dumps({"rows": args.rows, "results": results}, indent=2))
+
+
+def _without_orjson(responses, encoder, rows) -> bytes:
+    with mock.patch.object(responses, "orjson", None):
+        return encoder.encode(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Messages per second through NotificationManager against a local SMTP stand-in.
+
+Requires `aiosmtpd` (dev dependency). "per_message" reproduces the old behaviour
+of one SMTP session per email; "pooled" reuses sessions from SMTPTransport.
+
+    python -m benchmarks.smtp_throughput --messages 500 --pool-size 4
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+
+from benchmarks.common import timer
+
+
+class _Sink:
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+async def _send_all(messages: int, size: int, max_messages: int, port: int) -> dict:
+    from proplan.managers import notification_manager as nm
+
+    nm._transports.clear()
+    os.environ.update(SMTP_HOST="127.0.0.1", SMTP_PORT=str(port), SMTP_TLS="false",
+                      SMTP_POOL_SIZE=str(size), SMTP_MAX_MESSAGES_PER_CONNECTION=str(max_messages))
+    notifier = nm.NotificationManager()
+    with timer() as t:
+        await asyncio.gather(*(notifier.send_email(f"user{i}@example.com", "bench", "body") for i in range(messages)))
+    transport = notifier.transport
+    transport.close()
+    return {
+        "seconds": round(t["seconds"], 3),
+        "messages_per_second": round(messages / t["seconds"], 1),
+        "connections_opened": transport.connections_opened,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8125)
+    args = parser.parse_args()
+
+    from aiosmtpd.controller import Controller
+
+    sink = _Sink()
+    controller = Controller(sink, hostname="127.0.0.1", port=args.port)
+    controller.start()
+    try:
+        results = {}
+        # silence the per-message [email:ok] lines
+        with contextlib.redirect_stdout(io.StringIO()):
+            results["per_message"] = asyncio.run(_send_all(args.messages, args.pool_size, 1, args.port))
+            results["pooled"] = asyncio.run(_send_all(args.messages, args.pool_size, 100, args.port))
+        results["received"] = sink.received
+    finally:
+        controller.stop()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Fan-out through the /ws notification hub with thousands of simulated sockets.
+
+Sockets are in-memory stand-ins (no network), so the numbers isolate the hub itself:
+every socket subscribes to one of `--projects` project topics and a `--slow` share of
+them stall on every send. "sequential" replays the previous `broadcast_json` (await
+each socket in turn); "hub" publishes through `proplan.notifications.Hub`.
+
+    python -m benchmarks.ws_fanout --sockets 10000 --events 200 --slow 0.01
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Optional
+
+from benchmarks.common import timer
+
+
+class FakeSocket:
+    def __init__(self, delay: float, sink: list):
+        self.delay = delay
+        self.sink = sink
+
+    async def send_text(self, text: str) -> None:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        else:
+            await asyncio.sleep(0)
+        self.sink.append((json.loads(text)["seq"], time.perf_counter()))
+
+    async def send_json(self, payload: dict) -> None:
+        await self.send_text(json.dumps(payload))
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        pass
+
+
+def _sockets(count: int, slow_share: float, slow_delay: float, rng: random.Random, sink: list) -> list[FakeSocket]:
+    return [FakeSocket(slow_delay if rng.random() < slow_share else 0.0, sink) for _ in range(count)]
+
+
+def _latencies(sink: list, published: dict[int, float]) -> dict:
+    ordered = sorted(at - published[seq] for seq, at in sink)
+
+    def pct(p: float) -> Optional[float]:
+        return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000, 2) if ordered else None
+
+    return {"delivered": len(ordered), "p50_ms": pct(50), "p99_ms": pct(99), "max_ms": pct(100)}
+
+
+async def sequential(args, rng: random.Random) -> dict:
+    sink: list = []
+    sockets = _sockets(args.sockets, args.slow, args.slow_delay, rng, sink)
+    topics: dict[int, list[FakeSocket]] = {}
+    for i, ws in enumerate(sockets):
+        topics.setdefault(i % args.projects, []).append(ws)
+    published: dict[int, float] = {}
+    with timer() as t:
+        for seq in range(args.events):
+            published[seq] = time.perf_counter()
+            for ws in topics[seq % args.projects]:
+                await ws.send_json({"type": "task.updated", "seq": seq})
+    return {"seconds": round(t["seconds"], 3), **_latencies(sink, published)}
+
+
+async def hub_fanout(args, rng: random.Random) -> dict:
+    from proplan.notifications import Hub, project_topic
+
+    hub = Hub(queue_size=args.queue_size, send_timeout=args.send_timeout)
+    sink: list = []
+    for i, ws in enumerate(_sockets(args.sockets, args.slow, args.slow_delay, rng, sink)):
+        hub.subscribe(hub.connect(ws, user_id=i), [project_topic(i % args.projects)])
+
+    published: dict[int, float] = {}
+    publish_cost = 0.0
+    with timer() as t:
+        for seq in range(args.events):
+            published[seq] = start = time.perf_counter()
+            hub.publish([project_topic(seq % args.projects)], {"type": "task.updated", "seq": seq})
+            publish_cost += time.perf_counter() - start
+            # let writers run between publishes, like requests interleaving on one loop
+            await asyncio.sleep(0)
+        # drain: wait until every outbox is empty or its socket was dropped
+        while any(c._outbox for c in hub.connections):
+            await asyncio.sleep(0.01)
+    for conn in list(hub.connections):
+        hub.disconnect(conn)
+    return {
+        "seconds": round(t["seconds"], 3),
+        "publish_us_avg": round(publish_cost / args.events * 1e6, 1),
+        **_latencies(sink, published),
+        **{k: v for k, v in hub.stats().items() if k in ("coalesced", "dropped")},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sockets", type=int, default=10_000)
+    parser.add_argument("--projects", type=int, default=100, help="project topics the sockets are spread over")
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--slow", type=float, default=0.01, help="share of sockets that stall on send")
+    parser.add_argument("--slow-delay", type=float, default=0.2, help="seconds a slow socket takes per send")
+    parser.add_argument("--queue-size", type=int, default=256)
+    parser.add_argument("--send-timeout", type=float, default=0.1)
+    parser.add_argument("--skip-sequential", action="store_true", help="only run the hub (sequential is slow)")
+    args = parser.parse_args()
+
+    results = {"sockets": args.sockets, "events": args.events, "slow_share": args.slow}
+    if not args.skip_sequential:
+        results["sequential"] = asyncio.run(sequential(args, random.Random(1)))
+    results["hub"] = asyncio.run(hub_fanout(args, random.Random(1)))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
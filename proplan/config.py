@@ -11,3 +11,22 @@ SMTP_PASSWORD = os.getenv("SMTP_PASSWORD") or ""
 SMTP_TLS = os.getenv("SMTP_TLS", "true").lower() == "true"
 MAIL_FROM = os.getenv("MAIL_FROM", "proplan@example.com")
 DAILY_REMINDER_HOUR = int(os.getenv("DAILY_REMINDER_HOUR", "6"))
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "4096"))
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread").lower()
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "32"))
+REMINDER_SEND_CONCURRENCY = int(os.getenv("REMINDER_SEND_CONCURRENCY", "20"))
+QUERY_AUDIT = os.getenv("QUERY_AUDIT", "false").lower() == "true"
+QUERY_AUDIT_REPEAT_THRESHOLD = int(os.getenv("QUERY_AUDIT_REPEAT_THRESHOLD", "3"))
+AVAILABILITY_INDEX_TTL_SECONDS = float(os.getenv("AVAILABILITY_INDEX_TTL_SECONDS", "60"))
+WS_QUEUE_SIZE = int(os.getenv("WS_QUEUE_SIZE", "256"))
+WS_SEND_TIMEOUT = float(os.getenv("WS_SEND_TIMEOUT", "5"))
+GZIP_MIN_SIZE = int(os.getenv("GZIP_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "5"))
+NOTIFY_BROKER = os.getenv("NOTIFY_BROKER", "memory").lower()
+NOTIFY_CHANNEL = os.getenv("NOTIFY_CHANNEL", "proplan_events")
+NOTIFY_SOCKET_PATH = os.getenv("NOTIFY_SOCKET_PATH", "/tmp/proplan-notify.sock")
+NOTIFY_FLUSH_INTERVAL = float(os.getenv("NOTIFY_FLUSH_INTERVAL", "0.01"))
+NOTIFY_MAX_BATCH = int(os.getenv("NOTIFY_MAX_BATCH", "200"))
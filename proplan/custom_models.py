@@ -1,9 +1,11 @@
-from datetime import date
+from datetime import date, datetime
 from typing import Optional
-from pydantic import BaseModel, EmailStr, ConfigDict
+from pydantic import BaseModel, EmailStr, ConfigDict, Field
 
 from proplan.enums import Availability, DayOffType, ProjectStatus, Role, TaskStatus
 
+BULK_MAX_ITEMS = 1000
+
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
@@ -14,6 +16,7 @@ class UserOut(BaseModel):
     email: EmailStr
     availability: Availability
     role: Role
+    version: int
     model_config = ConfigDict(from_attributes=True)
 
 class UserCreate(BaseModel):
@@ -29,6 +32,25 @@ class UserUpdate(BaseModel):
     role: Optional[Role] = None
     password: Optional[str] = None
 
+class ProjectOut(BaseModel):
+    id: int
+    name: str
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    description: Optional[str] = None
+    status: ProjectStatus
+    manager_id: Optional[int] = None
+    version: int
+    model_config = ConfigDict(from_attributes=True)
+
+class ProjectStatsOut(BaseModel):
+    project_id: int
+    open_tasks: int
+    in_progress_tasks: int
+    done_tasks: int
+    members: int
+    model_config = ConfigDict(from_attributes=True)
+
 class ProjectCreate(BaseModel):
     name: str
     start_time: Optional[str] = None
@@ -42,6 +64,24 @@ class ProjectUpdate(BaseModel):
     description: Optional[str] = None
     status: Optional[ProjectStatus] = None
 
+class ProjectWorkersAdd(BaseModel):
+    worker_ids: list[int] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
+class AutoAssignRequest(BaseModel):
+    headcount: int = Field(1, ge=1, le=100, description="Workers wanted per open task")
+    task_headcount: dict[int, int] = Field(default_factory=dict, description="Per-task overrides: task_id -> workers wanted")
+
+class TaskOut(BaseModel):
+    id: int
+    name: str
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    status: TaskStatus
+    details: Optional[str] = None
+    project_id: int
+    version: int
+    model_config = ConfigDict(from_attributes=True)
+
 class TaskCreate(BaseModel):
     name: str
     project_id: int
@@ -49,6 +89,16 @@ class TaskCreate(BaseModel):
     end_time: Optional[str] = None
     details: Optional[str] = None
 
+class TaskBulkCreate(BaseModel):
+    tasks: list[TaskCreate] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
+class TaskAssignment(BaseModel):
+    task_id: int
+    worker_id: int
+
+class TaskBulkAssign(BaseModel):
+    assignments: list[TaskAssignment] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
 class TaskUpdate(BaseModel):
     name: Optional[str] = None
     start_time: Optional[str] = None
@@ -67,4 +117,5 @@ class DayOffOut(BaseModel):
     type: DayOffType
     start_date: date
     end_date: date
+    version: int
     model_config = ConfigDict(from_attributes=True)
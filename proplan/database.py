@@ -1,17 +1,16 @@
 from typing import AsyncGenerator
-from sqlmodel import SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
 from sqlalchemy.orm import sessionmaker
 
 from proplan.config import DATABASE_URL
+from proplan.migrations import migrate
 
 engine: AsyncEngine = create_async_engine(DATABASE_URL, echo=False, future=True)
 async_session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
 
 async def init_db() -> None:
-    async with engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.create_all)
+    await migrate(engine)
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_factory() as session:
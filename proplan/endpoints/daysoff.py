@@ -1,40 +1,79 @@
 from datetime import date
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import select
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from proplan.custom_models import DayOffCreate, DayOffOut
 from proplan.database import get_session
-from proplan.enums import Role
+from proplan.enums import DayOffType, Role
 from proplan.managers.dayoff_manager import DayOffManager
 from proplan.managers.notification_manager import NotificationManager
-from proplan.models import Project, ProjectWorkerLink, User, UserDayOff
+from proplan.models import Project, User, UserDayOff
+from proplan.notifications import publish, user_topic
+from proplan.responses import RowEncoder
+from proplan.utils.availability_index import availability_index
+from proplan.utils.fieldsets import Fields, fieldset
+from proplan.utils.pagination import PageParams, page_params
 from proplan.utils.users_dependency import get_current_user
 
 
 router = APIRouter(prefix="/days-off", tags=["days-off"])
 manager = DayOffManager(NotificationManager())
+dayoff_rows = RowEncoder(DayOffOut)
+
+def date_range(
+    start: Optional[date] = Query(None, alias="from", description="Only entries ending on/after this day"),
+    end: Optional[date] = Query(None, alias="to", description="Only entries starting on/before this day"),
+) -> tuple[Optional[date], Optional[date]]:
+    return start, end
+
+@router.get("/", response_model=List[DayOffOut])
+async def list_days_off(
+    fields: Fields = Depends(fieldset(DayOffOut)),
+    type: Optional[DayOffType] = None,
+    dates: tuple = Depends(date_range),
+    params: PageParams = Depends(page_params),
+    session: AsyncSession = Depends(get_session),
+    user: User = Depends(get_current_user),
+):
+    """Org-wide leave overlapping the range; `from` defaults to today so history is opt-in."""
+    if user.role == Role.WORKER:
+        raise HTTPException(status_code=403, detail="Not allowed")
+    start, end = dates
+    page = await manager.list(session, params, start or date.today(), end, type=type, fields=fields)
+    response = dayoff_rows.response(page.items, fields)
+    page.apply_headers(response)
+    return response
 
 @router.get("/me", response_model=List[DayOffOut])
 async def list_my_days_off(
+    fields: Fields = Depends(fieldset(DayOffOut)),
+    dates: tuple = Depends(date_range),
+    params: PageParams = Depends(page_params),
     session: AsyncSession = Depends(get_session),
     user: User = Depends(get_current_user),
 ):
-    result = await session.exec(select(UserDayOff).where(UserDayOff.user_id == user.id))
-    return result.all()
+    page = await manager.list(session, params, *dates, user_id=user.id, fields=fields)
+    response = dayoff_rows.response(page.items, fields)
+    page.apply_headers(response)
+    return response
 
 @router.get("/user/{user_id}", response_model=List[DayOffOut])
 async def list_user_days_off(
     user_id: int,
+    fields: Fields = Depends(fieldset(DayOffOut)),
+    dates: tuple = Depends(date_range),
+    params: PageParams = Depends(page_params),
     session: AsyncSession = Depends(get_session),
     user: User = Depends(get_current_user),
 ):
     if user.role == Role.WORKER and user.id != user_id:
         raise HTTPException(status_code=403, detail="Not allowed")
 
-    result = await session.exec(select(UserDayOff).where(UserDayOff.user_id == user_id))
-    return result.all()
+    page = await manager.list(session, params, *dates, user_id=user_id, fields=fields)
+    response = dayoff_rows.response(page.items, fields)
+    page.apply_headers(response)
+    return response
 
 @router.post("/", response_model=DayOffOut)
 async def create_my_day_off(
@@ -57,6 +96,9 @@ async def create_my_day_off(
 @router.get("/project/{project_id}", response_model=List[DayOffOut])
 async def list_project_days_off(
     project_id: int,
+    fields: Fields = Depends(fieldset(DayOffOut)),
+    dates: tuple = Depends(date_range),
+    params: PageParams = Depends(page_params),
     session: AsyncSession = Depends(get_session),
     user: User = Depends(get_current_user),
 ):
@@ -67,15 +109,10 @@ async def list_project_days_off(
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    user_ids_res = await session.exec(
-        select(ProjectWorkerLink.user_id).where(ProjectWorkerLink.project_id == project_id)
-    )
-    user_ids = user_ids_res.all()
-    if not user_ids:
-        return []
-
-    result = await session.exec(select(UserDayOff).where(UserDayOff.user_id.in_(user_ids)))
-    return result.all()
+    page = await manager.list(session, params, *dates, project_id=project_id, fields=fields)
+    response = dayoff_rows.response(page.items, fields)
+    page.apply_headers(response)
+    return response
 
 @router.delete("/{entry_id}")
 async def delete_day_off(
@@ -97,4 +134,6 @@ async def delete_day_off(
 
     await session.delete(entry)
     await session.commit()
+    availability_index.remove_leave(entry)
+    publish([user_topic(entry.user_id)], {"type": "dayoff.deleted", "day_off_id": entry.id, "user_id": entry.user_id})
     return {"ok": True, "note": "Days off were succesfully deleted"}
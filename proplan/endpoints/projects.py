@@ -1,36 +1,108 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date, timedelta
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from proplan.custom_models import ProjectCreate, ProjectUpdate
+from proplan.custom_models import (
+    AutoAssignRequest, ProjectCreate, ProjectOut, ProjectStatsOut, ProjectUpdate, ProjectWorkersAdd, UserOut,
+)
 from proplan.database import get_session
 from proplan.enums import Role
 from proplan.managers.notification_manager import NotificationManager
 from proplan.managers.project_manager import ProjectManager
 from proplan.models import User
+from proplan.responses import RowEncoder
+from proplan.utils.etags import etag
+from proplan.utils.fieldsets import Fields, fieldset
+from proplan.utils.pagination import PageParams, page_params
 from proplan.utils.users_dependency import get_current_user
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 project_manager = ProjectManager(NotificationManager())
+project_rows = RowEncoder(ProjectOut)
+stats_rows = RowEncoder(ProjectStatsOut)
 
-@router.get("/")
-async def list_projects(session: AsyncSession = Depends(get_session), user: User = Depends(get_current_user)):
-    return await project_manager.list(session, user)
+@router.get("/", response_model=List[ProjectOut])
+async def list_projects(
+    q: Optional[str] = Query(None, description="Full-text search; matches are returned best first"),
+    params: PageParams = Depends(page_params),
+    fields: Fields = Depends(fieldset(ProjectOut)),
+    session: AsyncSession = Depends(get_session),
+    user: User = Depends(get_current_user),
+):
+    page = await project_manager.list(session, user, params, fields, q)
+    response = project_rows.response(page.items, fields)
+    page.apply_headers(response)
+    return response
+
+@router.get("/stats", response_model=List[ProjectStatsOut])
+async def list_project_stats(
+    params: PageParams = Depends(page_params),
+    session: AsyncSession = Depends(get_session),
+    user: User = Depends(get_current_user),
+):
+    page = await project_manager.list_stats(session, user, params)
+    response = stats_rows.response(page.items)
+    page.apply_headers(response)
+    return response
+
+@router.get("/{project_id}/stats", response_model=ProjectStatsOut)
+async def project_stats(project_id: int, session: AsyncSession = Depends(get_session), user: User = Depends(get_current_user)):
+    return stats_rows.one_response(await project_manager.stats(session, project_id, user))
 
-@router.get("/{project_id}")
-async def get_project(project_id: int, session: AsyncSession = Depends(get_session), user: User = Depends(get_current_user)):
-    return await project_manager.get(session, project_id, user)
+@router.get("/{project_id}/available-workers", response_model=List[UserOut])
+async def available_workers(
+    project_id: int,
+    start: Optional[date] = Query(None, alias="from", description="First day (default: today)"),
+    end: Optional[date] = Query(None, alias="to", description="Last day, inclusive (default: from)"),
+    session: AsyncSession = Depends(get_session),
+    user: User = Depends(get_current_user),
+):
+    start = start or date.today()
+    return await project_manager.available_workers(session, project_id, start, end or start, user)
+
+@router.get("/{project_id}/leave-calendar")
+async def leave_calendar(
+    project_id: int,
+    start: Optional[date] = Query(None, alias="from", description="First day (default: today)"),
+    end: Optional[date] = Query(None, alias="to", description="Last day, inclusive (default: from + 30 days)"),
+    session: AsyncSession = Depends(get_session),
+    user: User = Depends(get_current_user),
+):
+    start = start or date.today()
+    return await project_manager.leave_calendar(session, project_id, start, end or start + timedelta(days=30), user)
+
+@router.get("/{project_id}", response_model=ProjectOut)
+async def get_project(
+    project_id: int,
+    if_none_match: Optional[str] = Header(None),
+    fields: Fields = Depends(fieldset(ProjectOut)),
+    session: AsyncSession = Depends(get_session),
+    user: User = Depends(get_current_user),
+):
+    p = await project_manager.get(session, project_id, user, if_none_match, fields)
+    return project_rows.one_response(p, fields, headers={"ETag": etag(p.version)})
 
-@router.post("/")
+@router.post("/", response_model=ProjectOut)
 async def create_project(payload: ProjectCreate, session: AsyncSession = Depends(get_session), user: User = Depends(get_current_user)):
     if user.role != Role.ADMIN:
         raise HTTPException(403, "Admin only")
     return await project_manager.create(session, payload)
 
-@router.put("/{project_id}")
-async def update_project(project_id: int, payload: ProjectUpdate, session: AsyncSession = Depends(get_session), user: User = Depends(get_current_user)):
+@router.put("/{project_id}", response_model=ProjectOut)
+async def update_project(
+    project_id: int,
+    payload: ProjectUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    session: AsyncSession = Depends(get_session),
+    user: User = Depends(get_current_user),
+):
     if user.role != Role.ADMIN:
         raise HTTPException(403, "Admin only")
-    return await project_manager.update(session, project_id, payload)
+    p = await project_manager.update(session, project_id, payload, if_match)
+    response.headers["ETag"] = etag(p.version)
+    return p
 
 @router.delete("/{project_id}")
 async def delete_project(project_id: int, session: AsyncSession = Depends(get_session), user: User = Depends(get_current_user)):
@@ -62,6 +134,26 @@ async def assign_worker_to_project(
 ):
     return await project_manager.add_worker(session, project_id, worker_id, me)
 
+@router.post("/{project_id}/assign-workers")
+async def assign_workers_to_project(
+    project_id: int,
+    payload: ProjectWorkersAdd,
+    session: AsyncSession = Depends(get_session),
+    me: User = Depends(get_current_user),
+):
+    return await project_manager.add_workers(session, project_id, payload.worker_ids, me)
+
+@router.post("/{project_id}/auto-assign")
+async def auto_assign_workers(
+    project_id: int,
+    payload: Optional[AutoAssignRequest] = None,
+    dry_run: bool = False,
+    session: AsyncSession = Depends(get_session),
+    me: User = Depends(get_current_user),
+):
+    payload = payload or AutoAssignRequest()
+    return await project_manager.auto_assign(session, project_id, payload.headcount, payload.task_headcount, dry_run, me)
+
 @router.post("/{project_id}/remove-worker/{worker_id}")
 async def remove_worker_from_project(
     project_id: int,
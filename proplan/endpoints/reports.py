@@ -1,10 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+import csv, io
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel.ext.asyncio.session import AsyncSession
 from starlette.responses import StreamingResponse
-import csv, io
 from proplan.database import get_session
 from proplan.enums import Role
-from proplan.managers.report_manager import ReportManager
+from proplan.managers.report_manager import PORTFOLIO_SECTIONS, ReportManager
 from proplan.models import User
 from proplan.utils.users_dependency import get_current_user
 
@@ -18,17 +18,39 @@ async def monthly_report(project_id: int, year: int, month: int, session: AsyncS
     return await report_manager.json_report(session, project_id, year, month)
 
 @router.get("/projects/{project_id}/{year:int}/{month:int}/export-csv")
-async def monthly_report_csv(project_id: int, year: int, month: int, session: AsyncSession = Depends(get_session), user: User = Depends(get_current_user)):
+async def monthly_report_csv(project_id: int, year: int, month: int, gzip: bool = False, user: User = Depends(get_current_user)):
+    if user.role not in (Role.ADMIN, Role.MANAGER):
+        raise HTTPException(403, "Manager only")
+    filename = f"project_{project_id}_{year}-{month:02d}.csv"
+    if gzip:
+        filename += ".gz"
+    return StreamingResponse(
+        report_manager.csv_stream(project_id, year, month, gzip=gzip),
+        media_type="application/gzip" if gzip else "text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+@router.get("/portfolio/{year:int}/{month:int}")
+async def portfolio_report(year: int, month: int, session: AsyncSession = Depends(get_session), user: User = Depends(get_current_user)):
+    if user.role not in (Role.ADMIN, Role.MANAGER):
+        raise HTTPException(403, "Manager only")
+    return await report_manager.portfolio_report(session, year, month)
+
+@router.get("/portfolio/{year:int}/{month:int}/export-csv")
+async def portfolio_report_csv(
+    year: int,
+    month: int,
+    section: str = Query("projects", pattern="^(" + "|".join(PORTFOLIO_SECTIONS) + ")$"),
+    session: AsyncSession = Depends(get_session),
+    user: User = Depends(get_current_user),
+):
     if user.role not in (Role.ADMIN, Role.MANAGER):
         raise HTTPException(403, "Manager only")
-    rows = await report_manager.csv_rows(session, project_id, year, month)
-    def generate():
-        buffer = io.StringIO()
-        writer = csv.writer(buffer)
-        writer.writerows(rows)
-        yield buffer.getvalue()
+    report = await report_manager.portfolio_report(session, year, month)
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(report_manager.portfolio_csv_rows(report, section))
     return StreamingResponse(
-        generate(),
+        iter([buffer.getvalue()]),
         media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename=project_{project_id}_{year}-{month:02d}.csv"}
+        headers={"Content-Disposition": f"attachment; filename=portfolio_{section}_{year}-{month:02d}.csv"}
     )
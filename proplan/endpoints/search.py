@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from proplan.database import get_session
+from proplan.endpoints.projects import project_manager, project_rows
+from proplan.endpoints.tasks import task_manager, task_rows
+from proplan.endpoints.users import manager as user_manager, user_rows
+from proplan.enums import Role
+from proplan.models import User
+from proplan.utils.pagination import MAX_PAGE_SIZE, PageParams
+from proplan.utils.users_dependency import get_current_user
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+SEARCH_TYPES = ("tasks", "projects", "users")
+
+@router.get("")
+async def search(
+    q: str = Query(..., min_length=1, description="Words to look for; each one matches as a prefix"),
+    types: str = Query(",".join(SEARCH_TYPES), description="Comma-separated subset of: tasks, projects, users"),
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE, description="Matches per type"),
+    session: AsyncSession = Depends(get_session),
+    user: User = Depends(get_current_user),
+):
+    """
+    Best matches per resource type. Each group carries `next_cursor` for paging on with
+    the type's own list endpoint (`GET /tasks/?q=...&cursor=...`). Workers only see
+    their own tasks.
+    """
+    wanted = [t.strip() for t in types.split(",") if t.strip()]
+    unknown = set(wanted).difference(SEARCH_TYPES)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown types: {', '.join(sorted(unknown))}")
+    if user.role == Role.WORKER:
+        wanted = [t for t in wanted if t == "tasks"]
+
+    params = PageParams(limit=limit)
+    result = {}
+    for kind in wanted:
+        if kind == "tasks":
+            page, rows = await task_manager.list(session, user, params, q=q), task_rows
+        elif kind == "projects":
+            page, rows = await project_manager.list(session, user, params, q=q), project_rows
+        else:
+            page, rows = await user_manager.list(session, params, q=q), user_rows
+        result[kind] = {"items": rows.dicts(page.items), "next_cursor": page.next_cursor}
+    return result
@@ -1,36 +1,79 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from proplan.custom_models import TaskCreate, TaskUpdate
+from proplan.custom_models import TaskBulkAssign, TaskBulkCreate, TaskCreate, TaskOut, TaskUpdate
 from proplan.database import get_session
 from proplan.enums import Role
 from proplan.managers.notification_manager import NotificationManager
 from proplan.managers.task_manager import TaskManager
 from proplan.models import User
+from proplan.responses import RowEncoder
+from proplan.utils.etags import etag
+from proplan.utils.fieldsets import Fields, fieldset
+from proplan.utils.pagination import PageParams, page_params
 from proplan.utils.users_dependency import get_current_user
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 task_manager = TaskManager(NotificationManager())
+task_rows = RowEncoder(TaskOut)
 
-@router.get("/")
-async def list_tasks(session: AsyncSession = Depends(get_session), user: User = Depends(get_current_user)):
-    return await task_manager.list(session, user)
+@router.get("/", response_model=List[TaskOut])
+async def list_tasks(
+    q: Optional[str] = Query(None, description="Full-text search; matches are returned best first"),
+    params: PageParams = Depends(page_params),
+    fields: Fields = Depends(fieldset(TaskOut)),
+    session: AsyncSession = Depends(get_session),
+    user: User = Depends(get_current_user),
+):
+    page = await task_manager.list(session, user, params, fields, q)
+    response = task_rows.response(page.items, fields)
+    page.apply_headers(response)
+    return response
 
-@router.post("/")
+@router.post("/", response_model=TaskOut)
 async def create_task(payload: TaskCreate, session: AsyncSession = Depends(get_session), user: User = Depends(get_current_user)):
     if user.role not in (Role.ADMIN, Role.MANAGER):
         raise HTTPException(403, "Manager only")
     return await task_manager.create(session, payload)
 
-@router.get("/{task_id}")
-async def get_task(task_id: int, session: AsyncSession = Depends(get_session), user: User = Depends(get_current_user)):
-    return await task_manager.get(session, task_id, user)
+@router.post("/bulk")
+async def create_tasks(payload: TaskBulkCreate, session: AsyncSession = Depends(get_session), user: User = Depends(get_current_user)):
+    if user.role not in (Role.ADMIN, Role.MANAGER):
+        raise HTTPException(403, "Manager only")
+    return await task_manager.create_many(session, payload.tasks)
+
+@router.post("/assign-workers")
+async def assign_workers(payload: TaskBulkAssign, session: AsyncSession = Depends(get_session), user: User = Depends(get_current_user)):
+    if user.role not in (Role.ADMIN, Role.MANAGER):
+        raise HTTPException(403, "Manager only")
+    return await task_manager.assign_workers(session, payload.assignments)
+
+@router.get("/{task_id}", response_model=TaskOut)
+async def get_task(
+    task_id: int,
+    if_none_match: Optional[str] = Header(None),
+    fields: Fields = Depends(fieldset(TaskOut)),
+    session: AsyncSession = Depends(get_session),
+    user: User = Depends(get_current_user),
+):
+    t = await task_manager.get(session, task_id, user, if_none_match, fields)
+    return task_rows.one_response(t, fields, headers={"ETag": etag(t.version)})
 
-@router.put("/{task_id}")
-async def update_task(task_id: int, payload: TaskUpdate, session: AsyncSession = Depends(get_session), user: User = Depends(get_current_user)):
+@router.put("/{task_id}", response_model=TaskOut)
+async def update_task(
+    task_id: int,
+    payload: TaskUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    session: AsyncSession = Depends(get_session),
+    user: User = Depends(get_current_user),
+):
     if user.role not in (Role.ADMIN, Role.MANAGER):
         raise HTTPException(403, "Manager only")
-    return await task_manager.update(session, task_id, payload)
+    t = await task_manager.update(session, task_id, payload, if_match)
+    response.headers["ETag"] = etag(t.version)
+    return t
 
 @router.delete("/{task_id}")
 async def delete_task(task_id: int, session: AsyncSession = Depends(get_session), user: User = Depends(get_current_user)):
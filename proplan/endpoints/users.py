@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from proplan.custom_models import UserCreate, UserOut, UserUpdate
@@ -6,12 +7,17 @@ from proplan.database import get_session
 from proplan.enums import Role
 from proplan.managers.user_manager import UserManager
 from proplan.models import User
+from proplan.responses import RowEncoder
+from proplan.utils.etags import etag
+from proplan.utils.fieldsets import Fields, fieldset
+from proplan.utils.pagination import PageParams, page_params
 from proplan.utils.users_dependency import get_current_user
 
 
 
 router = APIRouter(prefix="/users", tags=["users"])
 manager = UserManager()
+user_rows = RowEncoder(UserOut)
 
 def _ensure_can_view(user: User, target_id: int):
     # Workers can only view themselves
@@ -20,22 +26,31 @@ def _ensure_can_view(user: User, target_id: int):
 
 @router.get("/", response_model=list[UserOut])
 async def list_users(
+    q: Optional[str] = Query(None, description="Full-text search; matches are returned best first"),
+    params: PageParams = Depends(page_params),
+    fields: Fields = Depends(fieldset(UserOut)),
     session: AsyncSession = Depends(get_session),
     user: User = Depends(get_current_user),
 ):
     # Workers cannot list everyone
     if user.role == Role.WORKER:
         raise HTTPException(status_code=403, detail="Not allowed")
-    return await manager.list(session)
+    page = await manager.list(session, params, fields, q)
+    response = user_rows.response(page.items, fields)
+    page.apply_headers(response)
+    return response
 
 @router.get("/{user_id}", response_model=UserOut)
 async def get_user(
     user_id: int,
+    if_none_match: Optional[str] = Header(None),
+    fields: Fields = Depends(fieldset(UserOut)),
     session: AsyncSession = Depends(get_session),
     user: User = Depends(get_current_user),
 ):
     _ensure_can_view(user, user_id)
-    return await manager.get(session, user_id)
+    target = await manager.get(session, user_id, if_none_match, fields)
+    return user_rows.one_response(target, fields, headers={"ETag": etag(target.version)})
 
 @router.post("/", response_model=UserOut)
 async def create_user(
@@ -61,6 +76,8 @@ async def create_user(
 async def update_user(
     user_id: int,
     payload: UserUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
@@ -73,11 +90,13 @@ async def update_user(
         session,
         user_id=user_id,
         requester_role=current_user.role,
+        if_match=if_match,
         name=payload.name,
         availability=payload.availability,
         role=payload.role,
         password=payload.password,
     )
+    response.headers["ETag"] = etag(user.version)
     return user
 
 @router.delete("/{user_id}")
@@ -0,0 +1,90 @@
+import json
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from proplan.database import async_session_factory
+from proplan.enums import Role
+from proplan.models import TaskWorkerLink, User
+from proplan.notifications import hub, user_topic
+from proplan.utils.users_dependency import user_from_token
+
+router = APIRouter(tags=["notifications"])
+
+TOPIC_KINDS = ("project", "task", "user")
+
+def parse_topic(topic: str) -> tuple[str, int] | None:
+    kind, _, ident = str(topic).partition(":")
+    if kind not in TOPIC_KINDS or not ident.isdigit():
+        return None
+    return kind, int(ident)
+
+async def authorize_topics(session: AsyncSession, user: User, topics: list[str]) -> tuple[list[str], list[str]]:
+    """
+    Split `topics` into (allowed, denied). Workers only see their own user and the tasks
+    they are assigned to: project topics carry every task of the project, which workers
+    cannot read over REST either.
+    """
+    parsed = {t: parse_topic(t) for t in dict.fromkeys(topics)}
+    allowed = [t for t, p in parsed.items() if p is not None]
+    if user.role == Role.WORKER:
+        wanted = {parsed[t][1] for t in allowed if parsed[t][0] == "task"}
+        tasks = set((await session.exec(
+            select(TaskWorkerLink.task_id).where(
+                TaskWorkerLink.user_id == user.id, TaskWorkerLink.task_id.in_(wanted)
+            )
+        )).all()) if wanted else set()
+        visible = {"user": {user.id}, "task": tasks, "project": set()}
+        allowed = [t for t in allowed if parsed[t][1] in visible[parsed[t][0]]]
+    return allowed, [t for t in parsed if t not in allowed]
+
+@router.websocket("/ws")
+async def notifications_socket(ws: WebSocket):
+    """
+    Authenticate with `?token=<jwt>` (or an Authorization header), then send
+    `{"action": "subscribe" | "unsubscribe", "topics": ["project:1", "task:7"]}`.
+    The socket is always subscribed to its own `user:<id>` topic.
+    """
+    token = ws.query_params.get("token") or ws.headers.get("authorization", "").removeprefix("Bearer ").strip()
+    try:
+        # short-lived session: a socket may stay open for hours
+        async with async_session_factory() as session:
+            user = await user_from_token(token, session)
+    except HTTPException:
+        await ws.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await ws.accept()
+    conn = hub.connect(ws, user.id)
+    try:
+        while True:
+            frame = await ws.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", status.WS_1000_NORMAL_CLOSURE))
+            try:
+                # binary frames carry no "text" and are answered like any other bad message
+                message = json.loads(frame.get("text") or "")
+            except ValueError:
+                message = None
+            action = message.get("action") if isinstance(message, dict) else None
+            topics = message.get("topics") if isinstance(message, dict) else None
+            if action not in ("subscribe", "unsubscribe") or not isinstance(topics, list) or not all(isinstance(t, str) for t in topics):
+                conn.offer(hub.encode({"type": "error", "detail": "Expected {action: subscribe|unsubscribe, topics: [...]}"}))
+                continue
+            if action == "unsubscribe":
+                hub.unsubscribe(conn, [t for t in topics if t != user_topic(user.id)])
+                conn.offer(hub.encode({"type": "unsubscribed", "topics": topics}))
+                continue
+            while True:
+                # a revoke delivered while we were checking may predate our subscription: check again
+                revocations = hub.revocations.get(user.id, 0)
+                async with async_session_factory() as session:
+                    allowed, denied = await authorize_topics(session, user, topics)
+                if hub.revocations.get(user.id, 0) == revocations:
+                    break
+            hub.subscribe(conn, allowed)
+            conn.offer(hub.encode({"type": "subscribed", "topics": allowed, "denied": denied}))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        hub.disconnect(conn)
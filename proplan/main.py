@@ -1,19 +1,81 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm.exc import StaleDataError
 
-from proplan.endpoints import auth, daysoff, projects, reports, tasks, users
+from proplan import metrics, query_audit
+from proplan.config import GZIP_LEVEL, GZIP_MIN_SIZE, QUERY_AUDIT
+from proplan.database import engine
+from proplan.endpoints import auth, daysoff, projects, reports, search, tasks, users, ws
+from proplan.notifications import broker, hub
+from proplan.responses import FastJSONResponse
+from proplan.utils.availability_index import availability_index
+from proplan.utils.password_hasher import password_hasher
+from proplan.utils.principal_cache import principal_cache
 
-app = FastAPI(title="ProPlan (Project Planning)")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await broker.start()
+    yield
+    await broker.stop()
+
+app = FastAPI(title="ProPlan (Project Planning)", lifespan=lifespan, default_response_class=FastJSONResponse)
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_SIZE, compresslevel=GZIP_LEVEL)
+app.add_middleware(metrics.MetricsMiddleware)
+metrics.instrument_engine(engine)
+query_audit.instrument_engine(engine)
+if QUERY_AUDIT:
+    app.add_middleware(query_audit.QueryAuditMiddleware)
+metrics.register_callback(
+    "proplan_principal_cache_lookups_total", "Principal cache lookups by cache and result",
+    lambda: [((cache, result), stats[result])
+             for cache, stats in (("users", principal_cache.users.stats()), ("tokens", principal_cache.tokens.stats()))
+             for result in ("hits", "misses")],
+    labelnames=("cache", "result"), kind="counter",
+)
+metrics.register_callback(
+    "proplan_password_hash_in_flight", "Password hashing jobs running or queued",
+    lambda: [((), password_hasher.in_flight)],
+)
+metrics.register_callback(
+    "proplan_password_hash_rejected_total", "Password hashing jobs shed because the queue was full",
+    lambda: [((), password_hasher.rejected)], kind="counter",
+)
+
+metrics.register_callback(
+    "proplan_ws_connections", "Open /ws notification sockets",
+    lambda: [((), len(hub.connections))],
+)
+metrics.register_callback(
+    "proplan_ws_messages_total", "Notification hub messages by outcome",
+    lambda: [((outcome,), hub.stats()[outcome]) for outcome in ("published", "delivered", "coalesced", "dropped")],
+    labelnames=("outcome",), kind="counter",
+)
+metrics.register_callback(
+    "proplan_notify_batches_total", "Event batches through the notification broker by direction",
+    lambda: [((broker.name, "sent"), broker.batches_sent), ((broker.name, "received"), broker.batches_received)],
+    labelnames=("backend", "direction"), kind="counter",
+)
+
+@app.exception_handler(StaleDataError)
+async def stale_data(request: Request, exc: StaleDataError):
+    # a versioned row changed between our read and our UPDATE (see models.Versioned)
+    return JSONResponse(status_code=409, content={"detail": "Resource was modified concurrently, reload and retry"})
 
 @app.get("/health")
 async def health():
-    return {"ok": True}
+    return {"ok": True, "principal_cache": principal_cache.stats(), "availability_index": availability_index.stats()}
 
+app.include_router(metrics.router)
 app.include_router(users.router)
 app.include_router(auth.router)
 app.include_router(projects.router)
 app.include_router(tasks.router)
 app.include_router(reports.router)
 app.include_router(daysoff.router)
+app.include_router(search.router)
+app.include_router(ws.router)
 
 def run():
     import uvicorn
@@ -1,15 +1,26 @@
 import asyncio
+import random
+import time
+from datetime import date, datetime, timedelta
+from enum import Enum
+from itertools import islice
+from typing import Annotated, Iterable, Iterator
 import typer
 from faker import Faker
+from sqlalchemy import func, insert, text
+from sqlalchemy.ext.asyncio import AsyncConnection
 from sqlmodel import SQLModel, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from proplan.utils.users_dependency import get_password_hash
-from proplan.database import async_session_factory, init_db
+from proplan.database import async_session_factory, engine, init_db
+from proplan.managers.stats_manager import rebuild_stats
+from proplan.migrations import applied_versions, discover, migrate, migrations_metadata
+from proplan.migrations.index_check import check_indexes
 from proplan.models import (
     User, Project, Task,
-    Role, ProjectStatus, TaskStatus,
-    ProjectWorkerLink, TaskWorkerLink,
+    Availability, Role, ProjectStatus, TaskStatus,
+    ProjectWorkerLink, TaskWorkerLink, UserDayOff, DayOffType,
 )
 
 cli = typer.Typer(help="Management commands for ProPlan")
@@ -36,15 +47,16 @@ async def seed_users(session: AsyncSession):
         )
         session.add(manager)
 
-    for i in range(5):
-        email = f"worker{i+1}@example.com"
-        exists = (await session.exec(select(User).where(User.email == email))).first()
-        if not exists:
+    emails = [f"worker{i+1}@example.com" for i in range(5)]
+    existing = set((await session.exec(select(User.email).where(User.email.in_(emails)))).all())
+    worker_hash = get_password_hash("worker123") if len(existing) < len(emails) else ""
+    for email in emails:
+        if email not in existing:
             session.add(
                 User(
                     name=fake.name(),
                     email=email,
-                    password_hash=get_password_hash("worker123"),
+                    password_hash=worker_hash,
                     role=Role.WORKER,
                 )
             )
@@ -105,27 +117,214 @@ async def seed_projects_and_tasks(session: AsyncSession):
             session.add(TaskWorkerLink(task_id=t2.id, user_id=w.id))
         await session.commit()
 
+# ---- bulk synthetic data -----------------------------------------------------
+
+SEED_BATCH_SIZE = 10_000
+BULK_PASSWORD = "worker123"
+TASK_VERBS = ("Inspect", "Install", "Excavate", "Survey", "Paint", "Wire", "Pour", "Deliver", "Review", "Plan")
+TASK_NOUNS = ("foundation", "scaffolding", "roof", "drainage", "facade", "site office", "crane", "permits", "HVAC", "fence")
+
+def _batched(rows: Iterable[tuple], size: int) -> Iterator[list[tuple]]:
+    it = iter(rows)
+    while batch := list(islice(it, size)):
+        yield batch
+
+async def _next_id(conn: AsyncConnection, model) -> int:
+    return ((await conn.execute(select(func.max(model.id)))).scalar() or 0) + 1
+
+async def _bulk_insert(conn: AsyncConnection, model, columns: tuple[str, ...], rows: Iterable[tuple]) -> int:
+    """COPY on Postgres, multi-row INSERT ... VALUES elsewhere; in batches of SEED_BATCH_SIZE."""
+    table = model.__table__
+    count = 0
+    for batch in _batched(rows, SEED_BATCH_SIZE):
+        if conn.dialect.name == "postgresql":
+            raw = (await conn.get_raw_connection()).driver_connection
+            # COPY bypasses SQLAlchemy's Enum type, which stores member names
+            records = [tuple(v.name if isinstance(v, Enum) else v for v in row) for row in batch]
+            await raw.copy_records_to_table(table.name, records=records, columns=list(columns))
+        else:
+            await conn.execute(insert(table), [dict(zip(columns, row)) for row in batch])
+        count += len(batch)
+    return count
+
+async def _sync_sequences(conn: AsyncConnection, *models) -> None:
+    # ids were assigned explicitly, so move Postgres serials past them
+    if conn.dialect.name != "postgresql":
+        return
+    for model in models:
+        name = model.__table__.name
+        await conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('\"{name}\"', 'id'), (SELECT COALESCE(MAX(id), 1) FROM \"{name}\"))"
+        ))
+
+async def seed_bulk(users: int, projects: int, tasks_per_project: int, days_off_per_user: int, random_seed: int) -> dict:
+    """
+    Insert a large synthetic dataset. Ids are assigned up front so link rows can be
+    generated without reading anything back; every worker belongs to one project and
+    about half of them get exactly one task there (one-task-per-worker rule).
+    """
+    rng = random.Random(random_seed)
+    fake = Faker()
+    fake.seed_instance(random_seed)
+    password_hash = get_password_hash(BULK_PASSWORD)
+    now = datetime.utcnow().replace(microsecond=0)
+    today = date.today()
+    counts = {}
+
+    async with engine.begin() as conn:
+        first_user = await _next_id(conn, User)
+        first_project = await _next_id(conn, Project)
+        first_task = await _next_id(conn, Task)
+        first_day_off = await _next_id(conn, UserDayOff)
+        managers = [first_user + i for i in range(-(-projects // 10))]  # one manager per 10 projects
+        workers = [managers[-1] + 1 + i if managers else first_user + i for i in range(users)]
+        project_ids = [first_project + i for i in range(projects)]
+        membership = {w: rng.choice(project_ids) for w in workers} if project_ids else {}
+
+        def user_rows():
+            for uid in managers:
+                yield uid, fake.name(), f"bulk-manager{uid}@example.com", password_hash, Availability.FREE, Role.MANAGER
+            for uid in workers:
+                yield uid, fake.name(), f"bulk-worker{uid}@example.com", password_hash, Availability.FREE, Role.WORKER
+
+        def project_rows():
+            for i, pid in enumerate(project_ids):
+                start = now - timedelta(days=rng.randrange(365))
+                yield pid, f"{fake.company()} #{pid}", start, None, fake.catch_phrase(), ProjectStatus.ONGOING, managers[i // 10]
+
+        def project_member_rows():
+            for i, pid in enumerate(project_ids):
+                yield pid, managers[i // 10]
+            for uid, pid in membership.items():
+                yield pid, uid
+
+        def task_rows():
+            statuses = list(TaskStatus)
+            tid = first_task
+            for pid in project_ids:
+                for _ in range(tasks_per_project):
+                    start = now - timedelta(minutes=rng.randrange(365 * 24 * 60))
+                    name = f"{rng.choice(TASK_VERBS)} {rng.choice(TASK_NOUNS)} #{tid}"
+                    yield tid, name, start, start + timedelta(hours=rng.randrange(1, 72)), rng.choice(statuses), None, pid
+                    tid += 1
+
+        def task_worker_rows():
+            if not tasks_per_project:
+                return
+            for uid, pid in membership.items():
+                if rng.random() < 0.5:
+                    offset = (pid - first_project) * tasks_per_project + rng.randrange(tasks_per_project)
+                    yield first_task + offset, uid
+
+        def day_off_rows():
+            types = list(DayOffType)
+            did = first_day_off
+            for uid in workers:
+                # consecutive, non-overlapping ranges from ~6 months ago onwards
+                cursor = today - timedelta(days=180 - rng.randrange(30))
+                for _ in range(days_off_per_user):
+                    start = cursor + timedelta(days=rng.randrange(1, 30))
+                    end = start + timedelta(days=rng.randrange(0, 10))
+                    yield did, uid, rng.choice(types), start, end
+                    did += 1
+                    cursor = end
+
+        counts["users"] = await _bulk_insert(
+            conn, User, ("id", "name", "email", "password_hash", "availability", "role"), user_rows())
+        counts["projects"] = await _bulk_insert(
+            conn, Project, ("id", "name", "start_time", "end_time", "description", "status", "manager_id"), project_rows())
+        counts["project_members"] = await _bulk_insert(
+            conn, ProjectWorkerLink, ("project_id", "user_id"), project_member_rows())
+        counts["tasks"] = await _bulk_insert(
+            conn, Task, ("id", "name", "start_time", "end_time", "status", "details", "project_id"), task_rows())
+        counts["task_workers"] = await _bulk_insert(
+            conn, TaskWorkerLink, ("task_id", "user_id"), task_worker_rows())
+        counts["days_off"] = await _bulk_insert(
+            conn, UserDayOff, ("id", "user_id", "type", "start_date", "end_date"), day_off_rows())
+        await _sync_sequences(conn, User, Project, Task, UserDayOff)
+        # raw inserts bypass the managers, so count the dashboard rows once at the end
+        await rebuild_stats(conn)
+    return counts
+
 @cli.command("seed")
-def seed_command():
+def seed_command(
+    users: Annotated[int, typer.Option(help="Bulk: synthetic workers to add")] = 0,
+    projects: Annotated[int, typer.Option(help="Bulk: synthetic projects (one extra manager per 10)")] = 0,
+    tasks_per_project: Annotated[int, typer.Option(help="Bulk: tasks per synthetic project")] = 0,
+    days_off_per_user: Annotated[int, typer.Option(help="Bulk: leave entries per synthetic worker")] = 0,
+    random_seed: Annotated[int, typer.Option(help="Seed for reproducible synthetic data")] = 42,
+):
+    """Create the demo accounts/project and, optionally, a large synthetic dataset."""
     async def _run():
         await init_db()
         async with async_session_factory() as session:
             await seed_users(session)
             await seed_projects_and_tasks(session)
+            await rebuild_stats(session)
+            await session.commit()
         print("Mock data generated. Admin: admin@example.com / admin123")
+        if users or projects:
+            start = time.perf_counter()
+            counts = await seed_bulk(users, projects, tasks_per_project, days_off_per_user, random_seed)
+            summary = ", ".join(f"{n} {name}" for name, n in counts.items())
+            print(f"Bulk data generated in {time.perf_counter() - start:.1f}s: {summary}. Password: {BULK_PASSWORD}")
     asyncio.run(_run())
 
 @cli.command("reset-db")
 def reset_db_command():
     """Drop all tables and recreate them (DANGER: wipes all data)."""
     async def _run():
-        from proplan.database import engine
         # Drop & recreate
         async with engine.begin() as conn:
             await conn.run_sync(SQLModel.metadata.drop_all)
-            await conn.run_sync(SQLModel.metadata.create_all)
+            await conn.run_sync(migrations_metadata.drop_all)
+        await migrate(engine)
         print("Database wiped and recreated.")
     asyncio.run(_run())
 
+@cli.command("migrate")
+def migrate_command(target: int = typer.Option(None, help="Stop at this version (default: latest)")):
+    """Apply pending schema migrations."""
+    async def _run():
+        applied = await migrate(engine, target)
+        for m in applied:
+            print(f"applied v{m.version:04d} {m.name}")
+        if not applied:
+            print("Database schema is up to date.")
+    asyncio.run(_run())
+
+@cli.command("migrate-status")
+def migrate_status_command():
+    """List known migrations and whether they are applied."""
+    async def _run():
+        done = await applied_versions(engine)
+        for m in discover():
+            print(f"[{'x' if m.version in done else ' '}] v{m.version:04d} {m.name}")
+    asyncio.run(_run())
+
+@cli.command("rebuild-stats")
+def rebuild_stats_command(project_id: int = typer.Option(None, help="Only this project (default: all)")):
+    """Recount the per-project dashboard counters from the task and membership tables."""
+    async def _run():
+        await init_db()
+        async with engine.begin() as conn:
+            await rebuild_stats(conn, project_id)
+        print("Project stats rebuilt.")
+    asyncio.run(_run())
+
+@cli.command("check-indexes")
+def check_indexes_command():
+    """EXPLAIN the hot manager queries and fail if one does not use its index."""
+    async def _run():
+        await init_db()
+        failed = 0
+        for check, ok, plan in await check_indexes(engine):
+            print(f"{'ok  ' if ok else 'FAIL'} {check.index:32} {check.source}")
+            if not ok:
+                failed += 1
+                print("     " + plan.replace("\n", "\n     "))
+        return failed
+    raise typer.Exit(code=1 if asyncio.run(_run()) else 0)
+
 if __name__ == "__main__":
     cli()
@@ -3,14 +3,25 @@ from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from proplan.models import User
-from proplan.utils.users_dependency import create_access_token, verify_password
+from proplan.utils.password_hasher import password_hasher
+from proplan.utils.users_dependency import create_access_token
 
 
 class AuthManager:
     async def authenticate(self, session: AsyncSession, email: str, password: str) -> str:
         result = await session.exec(select(User).where(User.email == email))
         user = result.first()
-        if not user or not verify_password(password, user.password_hash):
+        if not user:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
+        # end the read transaction so the pooled connection is not held while bcrypt runs
+        await session.commit()
+        valid, new_hash = await password_hasher.verify_and_update(password, user.password_hash)
+        if not valid:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
+        if new_hash:
+            # stored hash used an outdated work factor → upgrade it transparently
+            user.password_hash = new_hash
+            session.add(user)
+            await session.commit()
         token = create_access_token({"sub": user.email, "role": user.role.value, "user_id": user.id})
         return token
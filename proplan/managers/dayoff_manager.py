@@ -1,4 +1,7 @@
+import asyncio
 from datetime import date
+from typing import List, Optional
+from sqlalchemy.orm import aliased
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
@@ -6,7 +9,13 @@ from proplan.enums import DayOffType
 from proplan.managers.notification_manager import NotificationManager
 from fastapi import HTTPException
 
-from proplan.models import Project, User, UserDayOff
+from proplan.models import Project, ProjectWorkerLink, User, UserDayOff
+from proplan.notifications import publish, user_topic
+from proplan.utils.availability_index import availability_index
+from proplan.utils.fieldsets import Fields, load, select_fields
+from proplan.utils.pagination import Page, PageParams, paginate
+
+LeaveRecipients = tuple[UserDayOff, User, list[User]]
 
 class DayOffManager:
     def __init__(self, notifier: NotificationManager):
@@ -19,26 +28,76 @@ class DayOffManager:
         session.add(entry)
         await session.commit()
         await session.refresh(entry)
+        availability_index.add_leave(entry)
 
-        result = await session.exec(select(Project).join(Project.workers).where(User.id == user.id))
-        managers = []
-        for p in result.all():
-            if p.manager_id:
-                m = await session.get(User, p.manager_id)
-                if m:
-                    managers.append(m)
-        # using set to avoid duplicates
-        managers_already_notified = set()
-        for m in managers:
-            if m.id in managers_already_notified: continue
-            managers_already_notified.add(m.id)
-            await self.notify.send_email(
-                m.email,
-                f"{user.name} reported {type.value} ({start_date} to {end_date})",
-                f"User {user.name} ({user.email}) will be off from {start_date} to {end_date} ({type.value})."
+        for _, _, managers in await self.leave_recipients(session, entry_id=entry.id):
+            publish(
+                [user_topic(user.id), *(user_topic(m.id) for m in managers)],
+                {"type": "dayoff.created", "day_off": entry.model_dump(mode="json")},
             )
+            await asyncio.gather(*(
+                self.notify.send_email(
+                    m.email,
+                    f"{user.name} reported {type.value} ({start_date} to {end_date})",
+                    f"User {user.name} ({user.email}) will be off from {start_date} to {end_date} ({type.value})."
+                )
+                for m in managers
+            ))
         return entry
 
-    async def starting_today(self, session: AsyncSession, today: date):
-        result = await session.exec(select(UserDayOff).where(UserDayOff.start_date == today))
-        return result.all()
+    async def list(
+        self,
+        session: AsyncSession,
+        params: PageParams,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        type: Optional[DayOffType] = None,
+        user_id: Optional[int] = None,
+        project_id: Optional[int] = None,
+        fields: Fields = None,
+    ) -> Page:
+        """Leave entries overlapping [start, end] (either side open), optionally per user or project."""
+        if start is not None and end is not None and start > end:
+            raise HTTPException(400, "from must be <= to")
+        statement = select_fields(UserDayOff, fields)
+        if project_id is not None:
+            statement = statement.join(ProjectWorkerLink, ProjectWorkerLink.user_id == UserDayOff.user_id).where(
+                ProjectWorkerLink.project_id == project_id
+            )
+        if user_id is not None:
+            statement = statement.where(UserDayOff.user_id == user_id)
+        if end is not None:
+            statement = statement.where(UserDayOff.start_date <= end)
+        if start is not None:
+            statement = statement.where(UserDayOff.end_date >= start)
+        if type is not None:
+            statement = statement.where(UserDayOff.type == type)
+        return await paginate(session, statement, UserDayOff.id, params, version=UserDayOff.version)
+
+    async def leave_recipients(
+        self, session: AsyncSession, start_date: Optional[date] = None, entry_id: Optional[int] = None
+    ) -> List[LeaveRecipients]:
+        """
+        Resolve (leave entry, user, distinct project managers) in one joined query,
+        either for every entry starting on `start_date` or for a single entry.
+        """
+        manager = aliased(User)
+        statement = (
+            select(UserDayOff, User, manager)
+            .join(User, User.id == UserDayOff.user_id)
+            .outerjoin(ProjectWorkerLink, ProjectWorkerLink.user_id == User.id)
+            .outerjoin(Project, Project.id == ProjectWorkerLink.project_id)
+            .outerjoin(manager, manager.id == Project.manager_id)
+        )
+        if start_date is not None:
+            statement = statement.where(UserDayOff.start_date == start_date)
+        if entry_id is not None:
+            statement = statement.where(UserDayOff.id == entry_id)
+
+        grouped: dict[int, LeaveRecipients] = {}
+        for entry, user, m in (await session.exec(statement)).all():
+            _, _, managers = grouped.setdefault(entry.id, (entry, user, []))
+            # using ids to avoid duplicates (one row per shared project)
+            if m is not None and all(existing.id != m.id for existing in managers):
+                managers.append(m)
+        return list(grouped.values())
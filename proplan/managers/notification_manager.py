@@ -1,6 +1,119 @@
-import os, asyncio, smtplib
+import os, asyncio, smtplib, queue, threading, time
+from concurrent.futures import ThreadPoolExecutor
 from email.message import EmailMessage
 
+from proplan.metrics import email_latency, email_results
+
+
+class SMTPTransport:
+    """
+    Small pool of authenticated SMTP sessions reused across messages.
+
+    Sends run on a dedicated executor sized to the pool, so mail delivery never
+    competes with the default `asyncio.to_thread` executor and at most `size`
+    sessions are open at once. Broken sessions are dropped and re-opened once.
+    """
+
+    def __init__(self, host: str, port: int, user: str, password: str, use_tls: bool,
+                 size: int = 4, max_messages: int = 100, idle_timeout: float = 30.0):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_tls = use_tls
+        self.size = size
+        self.max_messages = max_messages
+        self.idle_timeout = idle_timeout
+        self.executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="smtp")
+        # idle sessions: (smtp, messages_sent, last_used)
+        self._idle: "queue.LifoQueue[tuple[smtplib.SMTP, int, float]]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=10)
+        smtp.ehlo()
+        if self.use_tls:
+            smtp.starttls()
+            smtp.ehlo()
+
+        # Only attempt AUTH if creds provided AND server supports AUTH
+        supports_auth = "auth" in (smtp.esmtp_features or {})
+        if self.user and self.password and supports_auth:
+            smtp.login(self.user, self.password)
+        with self._lock:
+            self.connections_opened += 1
+        return smtp
+
+    def _acquire(self) -> tuple[smtplib.SMTP, int]:
+        while True:
+            try:
+                smtp, sent, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect(), 0
+            if time.monotonic() - last_used < self.idle_timeout:
+                return smtp, sent
+            # servers usually drop idle sessions; don't bother probing old ones
+            self._close(smtp)
+
+    def _release(self, smtp: smtplib.SMTP, sent: int) -> None:
+        if sent >= self.max_messages:
+            self._close(smtp)
+        else:
+            self._idle.put((smtp, sent, time.monotonic()))
+
+    @staticmethod
+    def _close(smtp: smtplib.SMTP) -> None:
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
+    def send(self, msg: EmailMessage) -> None:
+        smtp, sent = self._acquire()
+        try:
+            smtp.send_message(msg)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            # stale pooled session → retry once on a fresh one
+            smtp.close()
+            smtp, sent = self._connect(), 0
+            try:
+                smtp.send_message(msg)
+            except Exception:
+                smtp.close()
+                raise
+        except Exception:
+            # message rejected; don't hand a session in an unknown state to the next sender
+            self._close(smtp)
+            raise
+        self._release(smtp, sent + 1)
+
+    def close(self) -> None:
+        while True:
+            try:
+                smtp, _, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._close(smtp)
+
+
+_transports: dict[tuple, SMTPTransport] = {}
+_transports_lock = threading.Lock()
+
+def get_transport(host: str, port: int, user: str, password: str, use_tls: bool) -> SMTPTransport:
+    # one pool per SMTP account, shared by every NotificationManager in the process
+    key = (host, port, user, use_tls)
+    with _transports_lock:
+        if key not in _transports:
+            _transports[key] = SMTPTransport(
+                host, port, user, password, use_tls,
+                size=int(os.getenv("SMTP_POOL_SIZE", "4")),
+                max_messages=int(os.getenv("SMTP_MAX_MESSAGES_PER_CONNECTION", "100")),
+                idle_timeout=float(os.getenv("SMTP_IDLE_TIMEOUT", "30")),
+            )
+        return _transports[key]
+
+
 class NotificationManager:
     def __init__(self):
         self.host = os.getenv("SMTP_HOST", "").strip()
@@ -9,16 +122,34 @@ class NotificationManager:
         self.password = os.getenv("SMTP_PASSWORD", "").strip()
         self.use_tls = os.getenv("SMTP_TLS", "false").lower() in ("1", "true", "yes")
         self.mail_from = os.getenv("MAIL_FROM", "proplan@example.com")
+        self._transport: SMTPTransport | None = None
+
+    @property
+    def transport(self) -> SMTPTransport:
+        if self._transport is None:
+            self._transport = get_transport(self.host, self.port, self.user, self.password, self.use_tls)
+        return self._transport
 
     async def send_email(self, to: str, subject: str, body: str) -> None:
         if not self.host or not self.port:
+            email_results.inc("skipped")
             print(f"[email:skip] to={to} subject={subject!r}")
             return
+        start = time.perf_counter()
         try:
-            await asyncio.to_thread(self._send_sync, to, subject, body)
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self.transport.executor, self._send_sync, to, subject, body)
+            email_results.inc("ok")
             print(f"[email:ok] to={to} subject={subject!r}")
         except Exception as e:
+            email_results.inc("error")
             print(f"[email:err] to={to} {e}")
+        finally:
+            email_latency.observe(time.perf_counter() - start)
+
+    async def send_many(self, messages: list[tuple[str, str, str]]) -> None:
+        # (to, subject, body) triples; the transport pool bounds actual concurrency
+        await asyncio.gather(*(self.send_email(to, subject, body) for to, subject, body in messages))
 
     def _send_sync(self, to: str, subject: str, body: str) -> None:
         msg = EmailMessage()
@@ -26,16 +157,4 @@ class NotificationManager:
         msg["To"] = to
         msg["Subject"] = subject
         msg.set_content(body)
-
-        with smtplib.SMTP(self.host, self.port, timeout=10) as smtp:
-            smtp.ehlo()
-            if self.use_tls:
-                smtp.starttls()
-                smtp.ehlo()
-
-            # Only attempt AUTH if creds provided AND server supports AUTH
-            supports_auth = "auth" in (smtp.esmtp_features or {})
-            if self.user and self.password and supports_auth:
-                smtp.login(self.user, self.password)
-
-            smtp.send_message(msg)
+        self.transport.send(msg)
@@ -1,28 +1,73 @@
-from datetime import datetime
+from datetime import date, datetime
+from typing import List, Optional
 from fastapi import HTTPException
+from sqlalchemy import func, insert
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
-from proplan.enums import ProjectStatus, Role
+from proplan.enums import DayOffType, ProjectStatus, Role, TaskStatus
 from proplan.managers.notification_manager import NotificationManager
-from proplan.models import Project, ProjectWorkerLink, User
+from proplan.managers.report_manager import invalidate_reports
+from proplan.managers.stats_manager import adjust_stats, drop_stats, rebuild_stats
+from proplan.managers.task_manager import publish_task
+from proplan.models import Project, ProjectStats, ProjectWorkerLink, Task, TaskWorkerLink, User, UserDayOff
+from proplan.notifications import project_topic, publish, user_topic
+from proplan.search import paginate_matches
+from proplan.utils.availability_index import availability_index
+from proplan.utils.etags import check_not_modified, check_precondition, current_version, etag
+from proplan.utils.fieldsets import Fields, load, select_fields, select_rows
+from proplan.utils.leave_calendar import leave_heatmap
+from proplan.utils.matching import Slot, max_assignment
+from proplan.utils.pagination import Page, PageParams, paginate
+
+LEAVE_CALENDAR_MAX_DAYS = 366
 
 class ProjectManager:
     def __init__(self, notifier: NotificationManager):
         self.notify = notifier
 
-    async def list(self, session: AsyncSession, user: User):
+    async def list(
+        self, session: AsyncSession, user: User, params: PageParams, fields: Fields = None, q: Optional[str] = None
+    ) -> Page:
         if user.role == Role.WORKER:
             raise HTTPException(status_code=403, detail="Workers cannot access projects")
-        return (await session.exec(select(Project))).all()
+        if q is not None:
+            return await paginate_matches(session, select_rows(Project, fields), Project, q, params)
+        return await paginate(session, select_fields(Project, fields), Project.id, params, version=Project.version)
 
-    async def get(self, session: AsyncSession, project_id: int, user: User) -> Project:
+    async def get(
+        self, session: AsyncSession, project_id: int, user: User, if_none_match: Optional[str] = None, fields: Fields = None
+    ) -> Project:
         if user.role == Role.WORKER:
             raise HTTPException(status_code=403, detail="Workers cannot access projects")
-        p = await session.get(Project, project_id)
+        if if_none_match:
+            version = await current_version(session, Project, project_id)
+            if version is None:
+                raise HTTPException(status_code=404, detail="Project not found")
+            check_not_modified(if_none_match, etag(version))
+        p = await load(session, Project, project_id, fields)
         if not p:
             raise HTTPException(status_code=404, detail="Project not found")
         return p
 
+    async def stats(self, session: AsyncSession, project_id: int, user: User) -> ProjectStats:
+        """Dashboard counters of one project: a primary-key read."""
+        if user.role == Role.WORKER:
+            raise HTTPException(status_code=403, detail="Workers cannot access projects")
+        row = await session.get(ProjectStats, project_id)
+        if row:
+            return row
+        if not await session.get(Project, project_id):
+            raise HTTPException(status_code=404, detail="Project not found")
+        # project predates the counters (or was bulk-loaded): count it once and keep the row
+        await rebuild_stats(session, project_id)
+        await session.commit()
+        return await session.get(ProjectStats, project_id)
+
+    async def list_stats(self, session: AsyncSession, user: User, params: PageParams) -> Page:
+        if user.role == Role.WORKER:
+            raise HTTPException(status_code=403, detail="Workers cannot access projects")
+        return await paginate(session, select(ProjectStats), ProjectStats.project_id, params)
+
     async def create(self, session: AsyncSession, payload) -> Project:
         p = Project(
             name=payload.name,
@@ -32,14 +77,17 @@ class ProjectManager:
             status=ProjectStatus.STARTED,
         )
         session.add(p)
+        await session.flush()
+        session.add(ProjectStats(project_id=p.id))
         await session.commit()
         await session.refresh(p)
         return p
 
-    async def update(self, session: AsyncSession, project_id: int, payload) -> Project:
+    async def update(self, session: AsyncSession, project_id: int, payload, if_match: Optional[str] = None) -> Project:
         p = await session.get(Project, project_id)
         if not p:
             raise HTTPException(status_code=404, detail="Project not found")
+        check_precondition(if_match, etag(p.version))
         if payload.status is not None and p.status == ProjectStatus.FINISHED and payload.status != ProjectStatus.FINISHED:
             raise HTTPException(status_code=400, detail="Cannot move a Finished project back to another state")
         from datetime import datetime as dt
@@ -56,14 +104,19 @@ class ProjectManager:
         session.add(p)
         await session.commit()
         await session.refresh(p)
+        publish([project_topic(p.id)], {"type": "project.updated", "project": p.model_dump(mode="json")}, f"project:{p.id}")
         return p
 
     async def delete(self, session: AsyncSession, project_id: int) -> None:
         p = await session.get(Project, project_id)
         if not p:
             raise HTTPException(status_code=404, detail="Project not found")
+        await drop_stats(session, project_id)
+        await invalidate_reports(session, project_id)
         await session.delete(p)
         await session.commit()
+        availability_index.invalidate()
+        publish([project_topic(project_id)], {"type": "project.deleted", "project_id": project_id})
 
     async def assign_manager(self, session: AsyncSession, project_id: int, manager_id: int) -> None:
         project = await session.get(Project, project_id)
@@ -86,8 +139,14 @@ class ProjectManager:
         )
         if not existing.first():
             session.add(ProjectWorkerLink(project_id=project.id, user_id=manager.id))
+            await adjust_stats(session, project.id, members=1)
             await session.commit()
 
+        publish(
+            [project_topic(project.id), user_topic(manager.id)],
+            {"type": "project.manager_assigned", "project_id": project.id, "manager_id": manager.id},
+        )
+
         await self.notify.send_email(
             manager.email,
             f"You are manager of project '{project.name}'",
@@ -103,6 +162,7 @@ class ProjectManager:
         p.manager_id = None
         session.add(p)
         await session.commit()
+        publish([project_topic(p.id)], {"type": "project.manager_removed", "project_id": p.id})
 
     async def add_worker(self, session: AsyncSession, project_id: int, worker_id: int, requester: User):
         if requester.role not in (Role.ADMIN, Role.MANAGER):
@@ -125,7 +185,9 @@ class ProjectManager:
             return {"ok": True, "note": "Worker already in project"}
 
         session.add(ProjectWorkerLink(project_id=p.id, user_id=w.id))
+        await adjust_stats(session, p.id, members=1)
         await session.commit()
+        publish([project_topic(p.id), user_topic(w.id)], {"type": "project.worker_added", "project_id": p.id, "worker_id": w.id})
 
         await self.notify.send_email(
             w.email,
@@ -134,6 +196,173 @@ class ProjectManager:
         )
         return {"ok": True, "note": "Worker assigned to project"}
 
+    async def add_workers(self, session: AsyncSession, project_id: int, worker_ids: List[int], requester: User):
+        """Bulk `add_worker`: validated with two set queries, committed once, one result per worker."""
+        if requester.role not in (Role.ADMIN, Role.MANAGER):
+            raise HTTPException(status_code=403, detail="Not allowed")
+
+        p = await session.get(Project, project_id)
+        if not p:
+            raise HTTPException(status_code=404, detail="Project not found")
+
+        ids = list(dict.fromkeys(worker_ids))
+        users = {u.id: u for u in (await session.exec(select(User).where(User.id.in_(ids)))).all()}
+        members = set((await session.exec(
+            select(ProjectWorkerLink.user_id).where(
+                ProjectWorkerLink.project_id == p.id,
+                ProjectWorkerLink.user_id.in_(ids),
+            )
+        )).all())
+
+        results, added = [], []
+        for worker_id in ids:
+            w = users.get(worker_id)
+            if not w:
+                results.append({"worker_id": worker_id, "ok": False, "detail": "Worker not found"})
+            elif w.role != Role.WORKER:
+                results.append({"worker_id": worker_id, "ok": False, "detail": "Only users with role Worker can be added to a project"})
+            elif worker_id in members:
+                results.append({"worker_id": worker_id, "ok": True, "note": "Worker already in project"})
+            else:
+                added.append(w)
+                results.append({"worker_id": worker_id, "ok": True, "note": "Worker assigned to project"})
+
+        if added:
+            session.add_all(ProjectWorkerLink(project_id=p.id, user_id=w.id) for w in added)
+            await adjust_stats(session, p.id, members=len(added))
+            await session.commit()
+            for w in added:
+                publish([project_topic(p.id), user_topic(w.id)], {"type": "project.worker_added", "project_id": p.id, "worker_id": w.id})
+            await self.notify.send_many([
+                (w.email, f"Added to project '{p.name}'", f"Hello {w.name},\n\nYou have been added to project '{p.name}'.")
+                for w in added
+            ])
+        return {"ok": True, "added": len(added), "results": results}
+
+    async def available_workers(self, session: AsyncSession, project_id: int, start: date, end: date, user: User) -> List[User]:
+        """Project workers with no task and no leave overlapping [start, end]: one query plus the index."""
+        if user.role == Role.WORKER:
+            raise HTTPException(status_code=403, detail="Workers cannot access projects")
+        if start > end:
+            raise HTTPException(status_code=400, detail="from must be <= to")
+        if not await session.get(Project, project_id):
+            raise HTTPException(status_code=404, detail="Project not found")
+        members = (await session.exec(
+            select(User)
+            .join(ProjectWorkerLink, ProjectWorkerLink.user_id == User.id)
+            .where(ProjectWorkerLink.project_id == project_id, User.role == Role.WORKER)
+            .order_by(User.id)
+        )).all()
+        index = await availability_index.ensure_loaded(session)
+        free = set(index.available((u.id for u in members), start, end))
+        return [u for u in members if u.id in free]
+
+    async def leave_calendar(self, session: AsyncSession, project_id: int, start: date, end: date, user: User) -> dict:
+        """Members off per day in [start, end], by leave type, from one range query and a sweep."""
+        if user.role == Role.WORKER:
+            raise HTTPException(status_code=403, detail="Workers cannot access projects")
+        if start > end:
+            raise HTTPException(status_code=400, detail="from must be <= to")
+        if (end - start).days >= LEAVE_CALENDAR_MAX_DAYS:
+            raise HTTPException(status_code=400, detail=f"Range is limited to {LEAVE_CALENDAR_MAX_DAYS} days")
+        if not await session.get(Project, project_id):
+            raise HTTPException(status_code=404, detail="Project not found")
+        entries = (await session.exec(
+            select(UserDayOff.user_id, UserDayOff.type, UserDayOff.start_date, UserDayOff.end_date)
+            .join(ProjectWorkerLink, ProjectWorkerLink.user_id == UserDayOff.user_id)
+            .where(
+                ProjectWorkerLink.project_id == project_id,
+                UserDayOff.start_date <= end,
+                UserDayOff.end_date >= start,
+            )
+        )).all()
+        return {
+            "project_id": project_id,
+            "from": start,
+            "to": end,
+            "days": leave_heatmap(entries, start, end, DayOffType),
+        }
+
+    async def auto_assign(self, session: AsyncSession, project_id: int, headcount: int, task_headcount: dict[int, int], dry_run: bool, user: User) -> dict:
+        """
+        Staff the project's open tasks with a maximum matching of eligible members:
+        workers without a task whose leave does not overlap the task's dates.
+        Earlier tasks are filled first. Commits every assignment in one transaction.
+        """
+        if user.role not in (Role.ADMIN, Role.MANAGER):
+            raise HTTPException(status_code=403, detail="Not allowed")
+        p = await session.get(Project, project_id)
+        if not p:
+            raise HTTPException(status_code=404, detail="Project not found")
+
+        open_tasks = select(Task.id).where(Task.project_id == project_id, Task.status == TaskStatus.OPEN)
+        tasks = (await session.exec(
+            select(Task).where(Task.id.in_(open_tasks)).order_by(Task.start_time, Task.id)
+        )).all()
+        staffed = dict((await session.exec(
+            select(TaskWorkerLink.task_id, func.count()).where(TaskWorkerLink.task_id.in_(open_tasks)).group_by(TaskWorkerLink.task_id)
+        )).all())
+        candidates = (
+            select(User.id)
+            .join(ProjectWorkerLink, ProjectWorkerLink.user_id == User.id)
+            .where(
+                ProjectWorkerLink.project_id == project_id,
+                User.role == Role.WORKER,
+                ~select(TaskWorkerLink.task_id).where(TaskWorkerLink.user_id == User.id).exists(),
+            )
+        )
+        workers = {u.id: u for u in (await session.exec(select(User).where(User.id.in_(candidates)).order_by(User.id))).all()}
+
+        slots = []
+        for t in tasks:
+            start = t.start_time.date()
+            wanted = task_headcount.get(t.id, headcount)
+            slots.append(Slot(t.id, max(wanted - staffed.get(t.id, 0), 0), start, max((t.end_time or t.start_time).date(), start)))
+        leave: dict[int, list] = {}
+        if slots and workers:
+            rows = await session.exec(
+                select(UserDayOff.user_id, UserDayOff.start_date, UserDayOff.end_date).where(
+                    UserDayOff.user_id.in_(candidates),
+                    UserDayOff.end_date >= min(s.start for s in slots),
+                    UserDayOff.start_date <= max(s.end for s in slots),
+                )
+            )
+            for user_id, start, end in rows.all():
+                leave.setdefault(user_id, []).append((start, end))
+
+        pairs = max_assignment(slots, list(workers), leave)
+        filled: dict[int, int] = {}
+        for task_id, _ in pairs:
+            filled[task_id] = filled.get(task_id, 0) + 1
+        result = {
+            "dry_run": dry_run,
+            "assigned": len(pairs),
+            "assignments": [{"task_id": task_id, "worker_id": worker_id} for task_id, worker_id in pairs],
+            "unfilled": [
+                {"task_id": s.key, "missing": s.capacity - filled.get(s.key, 0)}
+                for s in slots if s.capacity > filled.get(s.key, 0)
+            ],
+            "idle_workers": len(workers) - len(pairs),
+        }
+        if dry_run or not pairs:
+            return result
+
+        await session.execute(insert(TaskWorkerLink), [{"task_id": t, "user_id": w} for t, w in pairs])
+        await session.commit()
+        by_id = {t.id: t for t in tasks}
+        messages = []
+        for task_id, worker_id in pairs:
+            t, w = by_id[task_id], workers[worker_id]
+            availability_index.assign(t.id, w.id)
+            publish_task("task.worker_assigned", t, user_topic(w.id), worker_id=w.id)
+            messages.append((
+                w.email,
+                f"You were assigned to task '{t.name}'",
+                f"Hello {w.name},\n\nYou have been assigned to task '{t.name}' in project ID {t.project_id}.",
+            ))
+        await self.notify.send_many(messages)
+        return result
+
     async def remove_worker(self, session: AsyncSession, project_id: int, worker_id: int, requester: User):
         if requester.role not in (Role.ADMIN, Role.MANAGER):
             raise HTTPException(status_code=403, detail="Not allowed")
@@ -153,5 +382,11 @@ class ProjectManager:
             return {"ok": True, "note": "Worker not in project"}
 
         await session.delete(link)
+        await adjust_stats(session, project_id, members=-1)
         await session.commit()
+        publish(
+            [project_topic(project_id), user_topic(worker_id)],
+            {"type": "project.worker_removed", "project_id": project_id, "worker_id": worker_id},
+            revoke={"user_id": worker_id, "topics": [project_topic(project_id)]},
+        )
         return {"ok": True, "note": "Worker removed from Project succesfully"}
@@ -1,9 +1,62 @@
+import asyncio, csv, io, zlib
 from datetime import date, datetime
+from typing import AsyncIterator, Optional
+from sqlalchemy import and_, delete, func, or_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import HTTPException
 
-from proplan.models import Project, Task
+from proplan.database import async_session_factory
+from proplan.enums import TaskStatus
+from proplan.models import Project, ProjectReportCache, ProjectReportGeneration, Task, TaskWorkerLink, User
+
+CSV_CHUNK_SIZE = 64 * 1024
+CSV_FETCH_SIZE = 1000
+# CSV columns of each portfolio section, fixed so an empty month still gets its header
+PORTFOLIO_COLUMNS = {
+    "projects": ("project_id", "project_name", "manager_id", *(s.value for s in TaskStatus), "total"),
+    "workers": ("user_id", "name", "tasks"),
+    "managers": ("manager_id", "projects", "tasks"),
+}
+PORTFOLIO_SECTIONS = tuple(PORTFOLIO_COLUMNS)
+
+ReportKey = tuple[int, int, int]  # (project_id, year, month)
+
+# single-flight: one materialization per report key in this process
+_inflight: dict[ReportKey, asyncio.Task] = {}
+
+def _upsert(session: AsyncSession):
+    # INSERT ... ON CONFLICT, which both supported databases spell the same way
+    return (postgresql if session.bind.dialect.name == "postgresql" else sqlite).insert(ProjectReportGeneration)
+
+async def invalidate_reports(session: AsyncSession, project_id: int, *moments: Optional[datetime]) -> None:
+    """
+    Drop cached reports of `project_id` for the months of `moments` (all months if none
+    given). Runs in the caller's transaction, before its commit: the cache and the task
+    rows change together or not at all.
+    """
+    current = date.today()
+    # only closed months are ever cached, so writes to the current month cost nothing here
+    months = {(m.year, m.month) for m in moments if m is not None and (m.year, m.month) < (current.year, current.month)}
+    if moments and not months:
+        return
+    # bump first: this locks the project's generation row until we commit, so an in-flight
+    # materialization either stores before our DELETE runs (and is deleted) or sees the
+    # new generation and stores nothing
+    table = ProjectReportGeneration.__table__
+    await session.execute(
+        _upsert(session).values(project_id=project_id, generation=1).on_conflict_do_update(
+            index_elements=[table.c.project_id], set_={"generation": table.c.generation + 1}
+        )
+    )
+    statement = delete(ProjectReportCache).where(ProjectReportCache.project_id == project_id)
+    if moments:
+        statement = statement.where(or_(*(
+            and_(ProjectReportCache.year == year, ProjectReportCache.month == month) for year, month in months
+        )))
+    await session.execute(statement)
 
 class ReportManager:
     def _validate_month(self, year: int, month: int) -> tuple[datetime, datetime]:
@@ -29,26 +82,162 @@ class ReportManager:
         p = await session.get(Project, project_id)
         if not p:
             raise HTTPException(404, "Project not found")
-        result = await session.exec(
-            select(Task).where(Task.project_id == project_id, Task.start_time >= start_dt, Task.start_time < end_dt)
-        )
-        tasks = result.all()
+        tasks = await self._cached_tasks(session, (project_id, year, month), start_dt, end_dt)
         return {
             "project_id": p.id,
             "project_name": p.name,
             "year": year,
             "month": month,
             "count": len(tasks),
-            "tasks": [{"id": t.id, "name": t.name, "status": t.status.value, "start_time": t.start_time.isoformat() if t.start_time else ""} for t in tasks],
+            "tasks": tasks,
         }
 
-    async def csv_rows(self, session: AsyncSession, project_id: int, year: int, month: int) -> list[list[str]]:
+    async def _cached_tasks(self, session: AsyncSession, key: ReportKey, start_dt: datetime, end_dt: datetime) -> list[dict]:
+        cached = await session.get(ProjectReportCache, key)
+        if cached:
+            return cached.tasks
+        task = _inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._materialize(key, start_dt, end_dt))
+            _inflight[key] = task
+            task.add_done_callback(lambda _: _inflight.pop(key, None))
+        # shield: a cancelled request must not cancel the computation other requests wait on
+        return await asyncio.shield(task)
+
+    async def _materialize(self, key: ReportKey, start_dt: datetime, end_dt: datetime) -> list[dict]:
+        project_id, year, month = key
+        table = ProjectReportGeneration.__table__
+        async with async_session_factory() as session:
+            # the row must exist before the tasks are read, so that a concurrent writer's bump
+            # is a row lock the check below waits on
+            await session.execute(
+                _upsert(session).values(project_id=project_id).on_conflict_do_nothing(index_elements=[table.c.project_id])
+            )
+            await session.commit()
+            generation = (await session.exec(select(table.c.generation).where(table.c.project_id == project_id))).one()
+            result = await session.exec(
+                select(Task.id, Task.name, Task.status, Task.start_time)
+                .where(Task.project_id == key[0], Task.start_time >= start_dt, Task.start_time < end_dt)
+                .order_by(Task.id)
+            )
+            tasks = [
+                {"id": task_id, "name": name, "status": status.value, "start_time": start_time.isoformat() if start_time else ""}
+                for task_id, name, status, start_time in result.all()
+            ]
+            # no-op UPDATE: locks the generation row (waiting for an uncommitted bump) and only
+            # matches if no write to this project committed since `generation` was read
+            current = await session.execute(
+                update(table)
+                .where(table.c.project_id == project_id, table.c.generation == generation)
+                .values(generation=table.c.generation)
+            )
+            if current.rowcount:
+                session.add(ProjectReportCache(project_id=project_id, year=year, month=month, tasks=tasks))
+                try:
+                    await session.commit()
+                except IntegrityError:
+                    # another worker process stored it first
+                    await session.rollback()
+            else:
+                await session.rollback()
+        return tasks
+
+    def csv_stream(self, project_id: int, year: int, month: int, gzip: bool = False) -> AsyncIterator[bytes]:
+        # validate eagerly so errors surface as HTTP errors, not as a broken stream
+        start_dt, end_dt = self._validate_month(year, month)
+        chunks = self._csv_chunks(project_id, start_dt, end_dt)
+        return self._gzip(chunks) if gzip else chunks
+
+    async def _csv_chunks(self, project_id: int, start_dt: datetime, end_dt: datetime) -> AsyncIterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["id", "name", "status", "start_time"])
+        # own session: the response body is produced after the request's session is gone
+        async with async_session_factory() as session:
+            async for row in self._report_rows(session, project_id, start_dt, end_dt):
+                writer.writerow(row)
+                if buffer.tell() >= CSV_CHUNK_SIZE:
+                    yield buffer.getvalue().encode()
+                    buffer.seek(0)
+                    buffer.truncate()
+        yield buffer.getvalue().encode()
+
+    async def _report_rows(self, session: AsyncSession, project_id: int, start_dt: datetime, end_dt: datetime) -> AsyncIterator[list[str]]:
+        cached = await session.get(ProjectReportCache, (project_id, start_dt.year, start_dt.month))
+        if cached:
+            for t in cached.tasks:
+                yield [str(t["id"]), t["name"], t["status"], t["start_time"]]
+            return
+        result = await session.stream(
+            select(Task.id, Task.name, Task.status, Task.start_time)
+            .where(Task.project_id == project_id, Task.start_time >= start_dt, Task.start_time < end_dt)
+            .order_by(Task.id)
+            .execution_options(yield_per=CSV_FETCH_SIZE)
+        )
+        async for task_id, name, status, start_time in result:
+            yield [str(task_id), name, status.value, start_time.isoformat() if start_time else ""]
+
+    async def _gzip(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        compressor = zlib.compressobj(wbits=31)  # 31 → gzip container
+        async for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+
+    async def portfolio_report(self, session: AsyncSession, year: int, month: int) -> dict:
+        """
+        Task counts per project, worker and manager for a month, from two grouped queries.
+        Only projects, workers and managers with tasks starting that month are listed.
+        """
         start_dt, end_dt = self._validate_month(year, month)
-        result = await session.exec(
-            select(Task).where(Task.project_id == project_id, Task.start_time >= start_dt, Task.start_time < end_dt)
+        in_month = (Task.start_time >= start_dt, Task.start_time < end_dt)
+
+        by_project = await session.exec(
+            select(Project.id, Project.name, Project.manager_id, Task.status, func.count(Task.id))
+            .join(Task, Task.project_id == Project.id)
+            .where(*in_month)
+            .group_by(Project.id, Project.name, Project.manager_id, Task.status)
+            .order_by(Project.id)
+        )
+        projects: dict[int, dict] = {}
+        managers: dict[int, dict] = {}
+        for project_id, name, manager_id, status, count in by_project.all():
+            row = projects.setdefault(project_id, {
+                "project_id": project_id,
+                "project_name": name,
+                "manager_id": manager_id,
+                **{s.value: 0 for s in TaskStatus},
+                "total": 0,
+            })
+            row[status.value] += count
+            row["total"] += count
+            if manager_id is not None:
+                totals = managers.setdefault(manager_id, {"manager_id": manager_id, "projects": set(), "tasks": 0})
+                totals["projects"].add(project_id)
+                totals["tasks"] += count
+
+        by_worker = await session.exec(
+            select(User.id, User.name, func.count(TaskWorkerLink.task_id))
+            .join(TaskWorkerLink, TaskWorkerLink.user_id == User.id)
+            .join(Task, Task.id == TaskWorkerLink.task_id)
+            .where(*in_month)
+            .group_by(User.id, User.name)
+            .order_by(User.id)
         )
-        tasks = result.all()
-        rows = [["id", "name", "status", "start_time"]]
-        for t in tasks:
-            rows.append([str(t.id), t.name, t.status.value, t.start_time.isoformat() if t.start_time else ""])
-        return rows
+        workers = [{"user_id": user_id, "name": name, "tasks": count} for user_id, name, count in by_worker.all()]
+
+        return {
+            "year": year,
+            "month": month,
+            "projects": list(projects.values()),
+            "workers": workers,
+            "managers": [
+                {"manager_id": m["manager_id"], "projects": len(m["projects"]), "tasks": m["tasks"]}
+                for m in sorted(managers.values(), key=lambda m: m["manager_id"])
+            ],
+        }
+
+    def portfolio_csv_rows(self, report: dict, section: str) -> list[list]:
+        header = PORTFOLIO_COLUMNS[section]
+        return [list(header)] + [[row[column] for column in header] for row in report[section]]
@@ -1,14 +1,12 @@
+import asyncio
 from datetime import date
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-from proplan.config import DAILY_REMINDER_HOUR
+from proplan.config import DAILY_REMINDER_HOUR, REMINDER_SEND_CONCURRENCY
 from proplan.database import async_session_factory
 from proplan.managers.dayoff_manager import DayOffManager
 from proplan.managers.notification_manager import NotificationManager
-
-from sqlmodel import select
-
-from proplan.models import Project, User
+from proplan.query_audit import audit_queries
 
 class SchedulerManager:
     def __init__(self, notifier: NotificationManager, dayoff: DayOffManager):
@@ -17,27 +15,27 @@ class SchedulerManager:
         self.dayoff = dayoff
 
     async def _send_start_reminders(self):
-        async with async_session_factory() as session:
-            today = date.today()
-            entries = await self.dayoff.starting_today(session, today)
-            for entry in entries:
-                user = await session.get(User, entry.user_id)
-                result = await session.exec(select(Project).join(Project.workers).where(User.id == user.id))
-                managers = []
-                for p in result.all():
-                    if p.manager_id:
-                        m = await session.get(User, p.manager_id)
-                        if m:
-                            managers.append(m)
-                sent = set()
-                for m in managers:
-                    if m.id in sent: continue
-                    sent.add(m.id)
-                    await self.notifier.send_email(
-                        m.email,
-                        f"Reminder: {user.name} starts {entry.type.value} today",
-                        f"User {user.name} ({user.email}) is off from {entry.start_date} to {entry.end_date} ({entry.type.value})."
-                    )
+        with audit_queries("job:daily-reminders") as audit:
+            async with async_session_factory() as session:
+                today = date.today()
+                recipients = await self.dayoff.leave_recipients(session, start_date=today)
+        audit.report()
+
+        limit = asyncio.Semaphore(REMINDER_SEND_CONCURRENCY)
+
+        async def remind(manager, user, entry):
+            async with limit:
+                await self.notifier.send_email(
+                    manager.email,
+                    f"Reminder: {user.name} starts {entry.type.value} today",
+                    f"User {user.name} ({user.email}) is off from {entry.start_date} to {entry.end_date} ({entry.type.value})."
+                )
+
+        await asyncio.gather(*(
+            remind(m, user, entry)
+            for entry, user, managers in recipients
+            for m in managers
+        ))
 
     def start(self):
         trigger = CronTrigger(hour=DAILY_REMINDER_HOUR, minute=0)
@@ -0,0 +1,88 @@
+"""
+Per-project dashboard counters (`project_stats`).
+
+Writers call `adjust_stats` inside their own transaction, before the commit, so a
+counter changes exactly when the rows it counts do. The UPDATE adds a delta in SQL
+(`col = col + n`), so concurrent writers never lose each other's increments. A project
+without a stats row (e.g. inserted by a bulk load) is recounted on its next write or
+read; `manage.py rebuild-stats` recounts everything.
+"""
+from typing import Any, Optional
+import sqlalchemy
+from sqlalchemy import case, delete, func, insert, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from proplan.enums import TaskStatus
+from proplan.models import Project, ProjectStats, ProjectWorkerLink, Task
+
+STATUS_COLUMNS = {
+    TaskStatus.OPEN: "open_tasks",
+    TaskStatus.IN_PROGRESS: "in_progress_tasks",
+    TaskStatus.DONE: "done_tasks",
+}
+COUNTER_COLUMNS = (*STATUS_COLUMNS.values(), "members")
+
+
+def task_delta(status: TaskStatus, n: int = 1) -> dict[str, int]:
+    return {STATUS_COLUMNS[status]: n}
+
+
+def counts_query(project_id: Optional[int] = None) -> Any:
+    """SELECT project_id, <counters> computed from the task and membership tables."""
+    tasks = sqlalchemy.select(
+        Task.project_id,
+        *(func.sum(case((Task.status == status, 1), else_=0)).label(name) for status, name in STATUS_COLUMNS.items()),
+    ).group_by(Task.project_id)
+    members = sqlalchemy.select(
+        ProjectWorkerLink.project_id, func.count().label("members")
+    ).group_by(ProjectWorkerLink.project_id)
+    projects = sqlalchemy.select(Project.id)
+    if project_id is not None:
+        tasks = tasks.where(Task.project_id == project_id)
+        members = members.where(ProjectWorkerLink.project_id == project_id)
+        projects = projects.where(Project.id == project_id)
+    tasks, members = tasks.subquery(), members.subquery()
+    return (
+        projects.add_columns(
+            *(func.coalesce(tasks.c[name], 0) for name in STATUS_COLUMNS.values()),
+            func.coalesce(members.c.members, 0),
+        )
+        .outerjoin(tasks, tasks.c.project_id == Project.id)
+        .outerjoin(members, members.c.project_id == Project.id)
+    )
+
+
+def rebuild_statements(project_id: Optional[int] = None) -> tuple[Any, Any]:
+    """DELETE + INSERT ... SELECT recounting one project's row, or every row."""
+    table = ProjectStats.__table__
+    wipe = delete(table)
+    if project_id is not None:
+        wipe = wipe.where(table.c.project_id == project_id)
+    fill = insert(table).from_select(["project_id", *COUNTER_COLUMNS], counts_query(project_id))
+    return wipe, fill
+
+
+async def rebuild_stats(conn: Any, project_id: Optional[int] = None) -> None:
+    """Recount on an AsyncConnection or AsyncSession; the caller commits."""
+    for statement in rebuild_statements(project_id):
+        await conn.execute(statement)
+
+
+async def adjust_stats(session: AsyncSession, project_id: int, **deltas: int) -> None:
+    """Add `deltas` (column -> n) to the project's counters in the current transaction."""
+    deltas = {name: n for name, n in deltas.items() if n}
+    if not deltas:
+        return
+    # pending ORM writes go first, so a recount below already includes them
+    await session.flush()
+    table = ProjectStats.__table__
+    result = await session.execute(
+        update(table).where(table.c.project_id == project_id).values({name: table.c[name] + n for name, n in deltas.items()})
+    )
+    if result.rowcount == 0:
+        await rebuild_stats(session, project_id)
+
+
+async def drop_stats(session: AsyncSession, project_id: int) -> None:
+    table = ProjectStats.__table__
+    await session.execute(delete(table).where(table.c.project_id == project_id))
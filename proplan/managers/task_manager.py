@@ -1,50 +1,62 @@
 from datetime import date
+from typing import Optional
 from fastapi import HTTPException
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from proplan.enums import Role, TaskStatus
 from proplan.managers.notification_manager import NotificationManager
+from proplan.managers.report_manager import invalidate_reports
+from proplan.managers.stats_manager import adjust_stats, task_delta
 from proplan.models import Project, ProjectWorkerLink, Task, TaskWorkerLink, User, UserDayOff
+from proplan.notifications import project_topic, publish, task_topic, user_topic
+from proplan.search import paginate_matches
+from proplan.utils.availability_index import availability_index
+from proplan.utils.etags import check_not_modified, check_precondition, current_version, etag
+from proplan.utils.fieldsets import Fields, load, select_fields, select_rows
+from proplan.utils.pagination import Page, PageParams, paginate
 
 
+def publish_task(event: str, t: Task, *topics: str, **extra) -> None:
+    # updates coalesce per task: a slow client only needs the latest state
+    key = f"task:{t.id}" if event == "task.updated" else None
+    publish(
+        [task_topic(t.id), project_topic(t.project_id), *topics],
+        {"type": event, "task": t.model_dump(mode="json"), **extra},
+        key,
+    )
+
 class TaskManager:
     def __init__(self, notifier: NotificationManager):
         self.notify = notifier
 
     async def _ensure_worker_available(self, session: AsyncSession, worker: User):
-        # one task per worker
-        existing_task_link = await session.exec(
-            select(TaskWorkerLink).where(TaskWorkerLink.user_id == worker.id)
-        )
-        if existing_task_link.first():
-            raise HTTPException(400, "Worker is already assigned to another task")
-
-        # not on leave today
+        # one task per worker & not on leave today, both answered by one round trip
         today = date.today()
-        on_leave = await session.exec(
-            select(UserDayOff).where(
-                UserDayOff.user_id == worker.id,
-                UserDayOff.start_date <= today,
-                UserDayOff.end_date >= today,
-            )
-        )
-        if on_leave.first():
+        assigned = select(TaskWorkerLink.task_id).where(TaskWorkerLink.user_id == worker.id).exists()
+        on_leave = select(UserDayOff.id).where(
+            UserDayOff.user_id == worker.id,
+            UserDayOff.start_date <= today,
+            UserDayOff.end_date >= today,
+        ).exists()
+        is_assigned, is_on_leave = (await session.exec(select(assigned, on_leave))).one()
+        if is_assigned:
+            raise HTTPException(400, "Worker is already assigned to another task")
+        if is_on_leave:
             raise HTTPException(400, "Worker is currently on leave and cannot be assigned")
 
-    async def list(self, session: AsyncSession, requester: User):
+    async def list(
+        self, session: AsyncSession, requester: User, params: PageParams, fields: Fields = None, q: Optional[str] = None
+    ) -> Page:
+        statement = select_fields(Task, fields) if q is None else select_rows(Task, fields)
         if requester.role == Role.WORKER:
             # tasks for this worker via link table
-            task_ids = await session.exec(
-                select(TaskWorkerLink.task_id).where(TaskWorkerLink.user_id == requester.id)
+            statement = statement.join(TaskWorkerLink, TaskWorkerLink.task_id == Task.id).where(
+                TaskWorkerLink.user_id == requester.id
             )
-            ids = task_ids.all()
-            if not ids:
-                return []
-            result = await session.exec(select(Task).where(Task.id.in_(ids)))
-            return result.all()
-        result = await session.exec(select(Task))
-        return result.all()
+        if q is not None:
+            return await paginate_matches(session, statement, Task, q, params)
+        return await paginate(session, statement, Task.id, params, version=Task.version)
 
     async def create(self, session: AsyncSession, payload) -> Task:
         proj = await session.get(Project, payload.project_id)
@@ -60,14 +72,72 @@ class TaskManager:
             status=TaskStatus.OPEN,
         )
         session.add(t)
+        await adjust_stats(session, t.project_id, **task_delta(t.status))
+        await invalidate_reports(session, t.project_id, t.start_time)
         await session.commit()
         await session.refresh(t)
+        publish_task("task.created", t)
         return t
 
-    async def get(self, session: AsyncSession, task_id: int, requester: User) -> Task:
-        t = await session.get(Task, task_id)
+    async def create_many(self, session: AsyncSession, payloads) -> dict:
+        """Bulk `create`: valid tasks are inserted in one transaction, one result per payload."""
+        from datetime import datetime as dt
+        project_ids = {p.project_id for p in payloads}
+        known = set((await session.exec(select(Project.id).where(Project.id.in_(project_ids)))).all())
+
+        results, created = [], []
+        for index, payload in enumerate(payloads):
+            if payload.project_id not in known:
+                results.append({"index": index, "ok": False, "detail": "Project not found"})
+                continue
+            try:
+                start = None if payload.start_time is None else dt.fromisoformat(payload.start_time)
+                end = None if payload.end_time is None else dt.fromisoformat(payload.end_time)
+            except ValueError as e:
+                results.append({"index": index, "ok": False, "detail": str(e)})
+                continue
+            t = Task(
+                name=payload.name,
+                start_time=start,
+                end_time=end,
+                details=payload.details,
+                project_id=payload.project_id,
+                status=TaskStatus.OPEN,
+            )
+            created.append(t)
+            results.append({"index": index, "ok": True, "task": t})
+
+        if created:
+            session.add_all(created)
+            moments: dict[int, list] = {}
+            for t in created:
+                moments.setdefault(t.project_id, []).append(t.start_time)
+            for project_id, starts in moments.items():
+                await adjust_stats(session, project_id, **task_delta(TaskStatus.OPEN, len(starts)))
+                await invalidate_reports(session, project_id, *starts)
+            await session.commit()
+            for t in created:
+                publish_task("task.created", t)
+        return {"ok": True, "created": len(created), "results": results}
+
+    async def get(
+        self, session: AsyncSession, task_id: int, requester: User, if_none_match: Optional[str] = None, fields: Fields = None
+    ) -> Task:
+        if if_none_match:
+            # polling clients: answer from the version column, load the row only if it changed
+            version = await current_version(session, Task, task_id)
+            if version is None:
+                raise HTTPException(404, "Task not found")
+            await self._ensure_can_view(session, task_id, requester)
+            check_not_modified(if_none_match, etag(version))
+        t = await load(session, Task, task_id, fields)
         if not t:
             raise HTTPException(404, "Task not found")
+        if not if_none_match:
+            await self._ensure_can_view(session, task_id, requester)
+        return t
+
+    async def _ensure_can_view(self, session: AsyncSession, task_id: int, requester: User) -> None:
         if requester.role == Role.WORKER:
             # verify worker is linked to task (no t.workers access)
             link = await session.exec(
@@ -78,14 +148,15 @@ class TaskManager:
             )
             if not link.first():
                 raise HTTPException(403, "Not allowed")
-        return t
 
-    async def update(self, session: AsyncSession, task_id: int, payload) -> Task:
+    async def update(self, session: AsyncSession, task_id: int, payload, if_match: Optional[str] = None) -> Task:
         t = await session.get(Task, task_id)
         if not t:
             raise HTTPException(404, "Task not found")
+        check_precondition(if_match, etag(t.version))
         if payload.status is not None and t.status == TaskStatus.DONE and payload.status != TaskStatus.DONE:
             raise HTTPException(400, "Cannot move a Done task back to another state")
+        previous_start, previous_status = t.start_time, t.status
         from datetime import datetime as dt
         if payload.name is not None: t.name = payload.name
         if payload.start_time is not None: t.start_time = dt.fromisoformat(payload.start_time)
@@ -93,8 +164,12 @@ class TaskManager:
         if payload.status is not None: t.status = payload.status
         if payload.details is not None: t.details = payload.details
         session.add(t)
+        if t.status != previous_status:
+            await adjust_stats(session, t.project_id, **task_delta(previous_status, -1), **task_delta(t.status))
+        await invalidate_reports(session, t.project_id, previous_start, t.start_time)
         await session.commit()
         await session.refresh(t)
+        publish_task("task.updated", t)
         return t
 
     async def delete(self, session: AsyncSession, task_id: int) -> None:
@@ -102,7 +177,11 @@ class TaskManager:
         if not t:
             raise HTTPException(404, "Task not found")
         await session.delete(t)
+        await adjust_stats(session, t.project_id, **task_delta(t.status, -1))
+        await invalidate_reports(session, t.project_id, t.start_time)
         await session.commit()
+        availability_index.drop_task(t.id)
+        publish_task("task.deleted", t)
     
     async def assign_worker(self, session: AsyncSession, task_id: int, worker_id: int):
         t = await session.get(Task, task_id)
@@ -135,6 +214,8 @@ class TaskManager:
 
         session.add(TaskWorkerLink(task_id=t.id, user_id=w.id))
         await session.commit()
+        availability_index.assign(t.id, w.id)
+        publish_task("task.worker_assigned", t, user_topic(w.id), worker_id=w.id)
 
         await self.notify.send_email(
             w.email,
@@ -143,6 +224,69 @@ class TaskManager:
         )
         return {"ok": True}
 
+    async def assign_workers(self, session: AsyncSession, assignments) -> dict:
+        """
+        Bulk `assign_worker`. Membership, existing task links and leave are each checked
+        with one set query; the one-task-per-worker rule also holds within the batch.
+        """
+        task_ids = {a.task_id for a in assignments}
+        worker_ids = {a.worker_id for a in assignments}
+        tasks = {t.id: t for t in (await session.exec(select(Task).where(Task.id.in_(task_ids)))).all()}
+        workers = {u.id: u for u in (await session.exec(select(User).where(User.id.in_(worker_ids)))).all()}
+        members = set((await session.exec(
+            select(ProjectWorkerLink.project_id, ProjectWorkerLink.user_id).where(
+                ProjectWorkerLink.project_id.in_({t.project_id for t in tasks.values()}),
+                ProjectWorkerLink.user_id.in_(worker_ids),
+            )
+        )).all())
+        current_task = dict((await session.exec(
+            select(TaskWorkerLink.user_id, TaskWorkerLink.task_id).where(TaskWorkerLink.user_id.in_(worker_ids))
+        )).all())
+        today = date.today()
+        on_leave = set((await session.exec(
+            select(UserDayOff.user_id).where(
+                UserDayOff.user_id.in_(worker_ids),
+                UserDayOff.start_date <= today,
+                UserDayOff.end_date >= today,
+            )
+        )).all())
+
+        results, added = [], []
+        for a in assignments:
+            t, w = tasks.get(a.task_id), workers.get(a.worker_id)
+            result = {"task_id": a.task_id, "worker_id": a.worker_id, "ok": False}
+            if not t or not w:
+                result["detail"] = "Task or Worker not found"
+            elif (t.project_id, w.id) not in members:
+                result["detail"] = "Worker must be part of the Project first"
+            elif current_task.get(w.id) == t.id:
+                result.update(ok=True, note="Already assigned")
+            elif w.id in current_task:
+                result["detail"] = "Worker is already assigned to another task"
+            elif w.id in on_leave:
+                result["detail"] = "Worker is currently on leave and cannot be assigned"
+            else:
+                current_task[w.id] = t.id
+                added.append((t, w))
+                result["ok"] = True
+            results.append(result)
+
+        if added:
+            session.add_all(TaskWorkerLink(task_id=t.id, user_id=w.id) for t, w in added)
+            await session.commit()
+            for t, w in added:
+                availability_index.assign(t.id, w.id)
+                publish_task("task.worker_assigned", t, user_topic(w.id), worker_id=w.id)
+            await self.notify.send_many([
+                (
+                    w.email,
+                    f"You were assigned to task '{t.name}'",
+                    f"Hello {w.name},\n\nYou have been assigned to task '{t.name}' in project ID {t.project_id}.",
+                )
+                for t, w in added
+            ])
+        return {"ok": True, "assigned": len(added), "results": results}
+
     async def remove_worker(self, session: AsyncSession, task_id: int, worker_id: int):
         link_q = await session.exec(
             select(TaskWorkerLink).where(
@@ -154,6 +298,12 @@ class TaskManager:
         if link:
             await session.delete(link)
             await session.commit()
+            availability_index.unassign(task_id, worker_id)
+            publish(
+                [task_topic(task_id), user_topic(worker_id)],
+                {"type": "task.worker_removed", "task_id": task_id, "worker_id": worker_id},
+                revoke={"user_id": worker_id, "topics": [task_topic(task_id)]},
+            )
         return {"ok": True}
 
     async def reassign_worker(self, session: AsyncSession, task_id: int, old_worker_id: int, new_worker_id: int):
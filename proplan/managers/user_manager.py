@@ -1,19 +1,33 @@
+from typing import Optional
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import HTTPException
 
 from proplan.enums import Availability, Role
-from proplan.models import User
-from proplan.utils.users_dependency import get_password_hash
+from proplan.managers.stats_manager import adjust_stats
+from proplan.models import ProjectWorkerLink, User
+from proplan.search import paginate_matches
+from proplan.utils.pagination import Page, PageParams, paginate
+from proplan.utils.password_hasher import password_hasher
+from proplan.utils.availability_index import availability_index
+from proplan.utils.etags import check_not_modified, check_precondition, current_version, etag
+from proplan.utils.fieldsets import Fields, load, select_fields, select_rows
+from proplan.utils.principal_cache import principal_cache
 
 
 class UserManager:
-    async def list(self, session: AsyncSession) -> list[User]:
-        result = await session.exec(select(User))
-        return result.all()
+    async def list(self, session: AsyncSession, params: PageParams, fields: Fields = None, q: Optional[str] = None) -> Page:
+        if q is not None:
+            return await paginate_matches(session, select_rows(User, fields), User, q, params)
+        return await paginate(session, select_fields(User, fields), User.id, params, version=User.version)
 
-    async def get(self, session: AsyncSession, user_id: int) -> User:
-        user = await session.get(User, user_id)
+    async def get(self, session: AsyncSession, user_id: int, if_none_match: Optional[str] = None, fields: Fields = None) -> User:
+        if if_none_match:
+            version = await current_version(session, User, user_id)
+            if version is None:
+                raise HTTPException(404, "User not found")
+            check_not_modified(if_none_match, etag(version))
+        user = await load(session, User, user_id, fields)
         if not user:
             raise HTTPException(404, "User not found")
         return user
@@ -28,7 +42,7 @@ class UserManager:
         if exists.first():
             raise HTTPException(400, "Email already registered")
         user = User(
-            name=name, email=email, password_hash=get_password_hash(password),
+            name=name, email=email, password_hash=await password_hasher.hash(password),
             availability=availability, role=role
         )
         session.add(user)
@@ -36,21 +50,30 @@ class UserManager:
         await session.refresh(user)
         return user
 
-    async def update(self, session: AsyncSession, user_id: int, requester_role: Role, **fields) -> User:
+    async def update(self, session: AsyncSession, user_id: int, requester_role: Role, if_match: Optional[str] = None, **fields) -> User:
         user = await self.get(session, user_id)
+        check_precondition(if_match, etag(user.version))
         if requester_role == Role.MANAGER and fields.get("role") and fields.get("role") != user.role:
             raise HTTPException(403, "Managers cannot change roles")
         if "password" in fields and fields["password"] is not None:
-            user.password_hash = get_password_hash(fields.pop("password"))
+            user.password_hash = await password_hasher.hash(fields.pop("password"))
         for k, v in list(fields.items()):
             if v is not None and hasattr(user, k):
                 setattr(user, k, v)
         session.add(user)
         await session.commit()
+        principal_cache.invalidate(user.id)
         await session.refresh(user)
         return user
 
     async def delete(self, session: AsyncSession, user_id: int) -> None:
         user = await self.get(session, user_id)
+        project_ids = (await session.exec(
+            select(ProjectWorkerLink.project_id).where(ProjectWorkerLink.user_id == user_id)
+        )).all()
         await session.delete(user)
+        for project_id in project_ids:
+            await adjust_stats(session, project_id, members=-1)
         await session.commit()
+        principal_cache.invalidate(user_id)
+        availability_index.drop_user(user_id)
@@ -0,0 +1,98 @@
+"""
+Versioned schema migrations.
+
+Every `vNNNN_<name>.py` module in this package defines `upgrade(conn)`, which runs
+synchronously (via `AsyncConnection.run_sync`) in its own transaction. Applied
+versions are recorded in the `schema_migrations` table.
+
+Each step spells out its own tables, columns, indexes and SQL instead of importing
+`proplan.models` (or any other app code), so a released step does the same thing
+however the models change later. Steps are idempotent: databases that predate the
+migrations were built with create_all, so use the helpers below, which skip objects
+that already exist.
+"""
+import importlib
+import pkgutil
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from types import ModuleType
+from typing import Optional
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+migrations_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    migrations_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+_MODULE_NAME = re.compile(r"^v(\d{4})_(\w+)$")
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    module: ModuleType
+
+def discover() -> list[Migration]:
+    found = []
+    for info in pkgutil.iter_modules(__path__):
+        match = _MODULE_NAME.match(info.name)
+        if match:
+            module = importlib.import_module(f"{__name__}.{info.name}")
+            found.append(Migration(int(match.group(1)), match.group(2), module))
+    found.sort(key=lambda m: m.version)
+    return found
+
+def _applied_versions(conn: Connection) -> set[int]:
+    migrations_metadata.create_all(conn)
+    return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+async def applied_versions(engine: AsyncEngine) -> set[int]:
+    async with engine.begin() as conn:
+        return await conn.run_sync(_applied_versions)
+
+async def migrate(engine: AsyncEngine, target: Optional[int] = None) -> list[Migration]:
+    """Apply pending migrations up to `target` (all if None); returns the ones applied."""
+    done = await applied_versions(engine)
+    applied = []
+    for migration in discover():
+        if migration.version in done or (target is not None and migration.version > target):
+            continue
+        async with engine.begin() as conn:
+            await conn.run_sync(migration.module.upgrade)
+            await conn.execute(schema_migrations.insert().values(
+                version=migration.version, name=migration.name, applied_at=datetime.utcnow()
+            ))
+        applied.append(migration)
+    return applied
+
+# ---- helpers for idempotent steps -------------------------------------------
+
+def index(table: str, name: str, *columns: str) -> Index:
+    """An index on `table`, spelled out by the migration (column types do not matter for CREATE INDEX)."""
+    stub = Table(table, MetaData(), *(Column(c) for c in columns))
+    return Index(name, *(stub.c[c] for c in columns))
+
+def create_index(conn: Connection, index: Index) -> None:
+    index.create(conn, checkfirst=True)
+
+def drop_index(conn: Connection, table: str, name: str) -> None:
+    if name in {i["name"] for i in inspect(conn).get_indexes(table)}:
+        conn.exec_driver_sql(f'DROP INDEX "{name}"')
+
+def add_column(conn: Connection, table: str, column: Column) -> None:
+    if column.name in {c["name"] for c in inspect(conn).get_columns(table)}:
+        return
+    column_type = column.type.compile(dialect=conn.dialect)
+    ddl = f'ALTER TABLE "{table}" ADD COLUMN "{column.name}" {column_type}'
+    if column.server_default is not None:
+        ddl += f" DEFAULT {column.server_default.arg}"
+    if not column.nullable:
+        ddl += " NOT NULL"
+    conn.exec_driver_sql(ddl)
@@ -0,0 +1,79 @@
+"""
+EXPLAIN-based check that the hot manager queries are served by the performance indexes.
+
+The statements mirror the ones issued by TaskManager, ReportManager and DayOffManager.
+On Postgres, sequential scans are disabled for the check so that tiny dev tables do not
+hide a missing index behind a (correctly) cheaper seq scan.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import aliased
+from sqlmodel import select
+
+from proplan.models import Project, ProjectWorkerLink, Task, TaskWorkerLink, User, UserDayOff
+
+@dataclass(frozen=True)
+class PlanCheck:
+    source: str
+    index: str
+    statement: Any
+
+def plan_checks() -> list[PlanCheck]:
+    today = date.today()
+    manager = aliased(User)
+    return [
+        PlanCheck(
+            "ReportManager.json_report / csv_stream",
+            "ix_task_project_id_start_time",
+            select(Task).where(Task.project_id == 1, Task.start_time >= datetime(2000, 1, 1), Task.start_time < datetime(2000, 2, 1)),
+        ),
+        PlanCheck(
+            "TaskManager._ensure_worker_available (one task per worker)",
+            "ix_task_workers_user_id",
+            select(TaskWorkerLink).where(TaskWorkerLink.user_id == 1),
+        ),
+        PlanCheck(
+            "TaskManager._ensure_worker_available (not on leave)",
+            "ix_userdayoff_user_id_dates",
+            select(UserDayOff).where(UserDayOff.user_id == 1, UserDayOff.start_date <= today, UserDayOff.end_date >= today),
+        ),
+        PlanCheck(
+            "DayOffManager.list (org-wide date range)",
+            "ix_userdayoff_dates",
+            select(UserDayOff).where(UserDayOff.start_date <= today, UserDayOff.end_date >= today),
+        ),
+        PlanCheck(
+            "DayOffManager.leave_recipients (daily reminder job)",
+            "ix_userdayoff_dates",
+            select(UserDayOff, User, manager)
+            .join(User, User.id == UserDayOff.user_id)
+            .outerjoin(ProjectWorkerLink, ProjectWorkerLink.user_id == User.id)
+            .outerjoin(Project, Project.id == ProjectWorkerLink.project_id)
+            .outerjoin(manager, manager.id == Project.manager_id)
+            .where(UserDayOff.start_date == today),
+        ),
+    ]
+
+async def explain(engine: AsyncEngine, statement: Any) -> str:
+    async with engine.connect() as conn:
+        dialect = conn.dialect.name
+        sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+        if dialect == "postgresql":
+            await conn.exec_driver_sql("SET enable_seqscan = off")
+            rows = (await conn.exec_driver_sql(f"EXPLAIN {sql}")).all()
+            await conn.exec_driver_sql("RESET enable_seqscan")
+            return "\n".join(row[0] for row in rows)
+        if dialect == "sqlite":
+            rows = (await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")).all()
+            return "\n".join(str(row[-1]) for row in rows)
+        rows = (await conn.exec_driver_sql(f"EXPLAIN {sql}")).all()
+        return "\n".join(" ".join(str(col) for col in row) for row in rows)
+
+async def check_indexes(engine: AsyncEngine) -> list[tuple[PlanCheck, bool, str]]:
+    results = []
+    for check in plan_checks():
+        plan = await explain(engine, check.statement)
+        results.append((check, check.index in plan, plan))
+    return results
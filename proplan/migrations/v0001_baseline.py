@@ -0,0 +1,70 @@
+"""
+Tables as `init_db` created them with create_all before migrations existed.
+
+Spelled out here rather than taken from the models, so this step keeps creating the
+same schema however the models change later; later steps bring it up to date.
+"""
+from sqlalchemy import JSON, Column, Date, DateTime, Enum, ForeignKey, Integer, MetaData, String, Table
+from sqlalchemy.engine import Connection
+
+metadata = MetaData()
+
+Table(
+    "user", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("email", String, nullable=False, unique=True, index=True),
+    Column("password_hash", String, nullable=False),
+    Column("availability", Enum("FREE", "BUSY", name="availability"), nullable=False),
+    Column("role", Enum("ADMIN", "MANAGER", "WORKER", name="role"), nullable=False),
+)
+Table(
+    "project", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("start_time", DateTime, nullable=False),
+    Column("end_time", DateTime),
+    Column("description", String),
+    Column("status", Enum("STARTED", "ONGOING", "FINISHED", name="projectstatus"), nullable=False),
+    Column("manager_id", Integer, ForeignKey("user.id")),
+)
+Table(
+    "task", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("start_time", DateTime, nullable=False),
+    Column("end_time", DateTime),
+    Column("status", Enum("OPEN", "IN_PROGRESS", "DONE", name="taskstatus"), nullable=False),
+    Column("details", String),
+    Column("project_id", Integer, ForeignKey("project.id"), nullable=False),
+)
+Table(
+    "userdayoff", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("user.id"), nullable=False),
+    Column("type", Enum("HOLIDAY", "SICK_LEAVE", "DAY_OFF", name="dayofftype"), nullable=False),
+    Column("start_date", Date, nullable=False),
+    Column("end_date", Date, nullable=False),
+)
+Table(
+    "project_workers", metadata,
+    Column("project_id", Integer, ForeignKey("project.id"), primary_key=True),
+    Column("user_id", Integer, ForeignKey("user.id"), primary_key=True),
+)
+Table(
+    "task_workers", metadata,
+    Column("task_id", Integer, ForeignKey("task.id"), primary_key=True),
+    Column("user_id", Integer, ForeignKey("user.id"), primary_key=True),
+)
+Table(
+    "project_report_cache", metadata,
+    Column("project_id", Integer, primary_key=True),
+    Column("year", Integer, primary_key=True),
+    Column("month", Integer, primary_key=True),
+    Column("tasks", JSON, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+)
+
+
+def upgrade(conn: Connection) -> None:
+    metadata.create_all(conn)
@@ -0,0 +1,16 @@
+"""Indexes behind the hot lookups: monthly reports, one-task-per-worker, leave checks, daily reminders."""
+from sqlalchemy.engine import Connection
+
+from proplan.migrations import create_index, index
+
+INDEXES = (
+    index("task", "ix_task_project_id_start_time", "project_id", "start_time"),
+    index("task_workers", "ix_task_workers_user_id", "user_id"),
+    index("userdayoff", "ix_userdayoff_user_id_dates", "user_id", "start_date", "end_date"),
+    index("userdayoff", "ix_userdayoff_start_date", "start_date"),
+)
+
+
+def upgrade(conn: Connection) -> None:
+    for ix in INDEXES:
+        create_index(conn, ix)
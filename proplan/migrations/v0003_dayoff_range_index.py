@@ -0,0 +1,10 @@
+"""Range index on leave dates for org-wide day-off queries; it replaces the start_date-only index."""
+from sqlalchemy.engine import Connection
+
+from proplan.migrations import create_index, drop_index, index
+
+
+def upgrade(conn: Connection) -> None:
+    create_index(conn, index("userdayoff", "ix_userdayoff_dates", "start_date", "end_date"))
+    # created by v0002; (start_date, end_date) serves its lookups as well
+    drop_index(conn, "userdayoff", "ix_userdayoff_start_date")
@@ -0,0 +1,12 @@
+"""Row version columns backing ETags and optimistic concurrency; existing rows start at 0."""
+from sqlalchemy import BigInteger, Column
+from sqlalchemy.engine import Connection
+
+from proplan.migrations import add_column
+
+TABLES = ("user", "project", "task", "userdayoff")
+
+
+def upgrade(conn: Connection) -> None:
+    for table in TABLES:
+        add_column(conn, table, Column("version", BigInteger, nullable=False, server_default="0"))
@@ -0,0 +1,51 @@
+"""Full-text search indexes: GIN over tsvector expressions on Postgres, FTS5 tables + triggers on SQLite."""
+from sqlalchemy.engine import Connection
+
+SEARCH_COLUMNS = {
+    "task": ("name", "details"),
+    "project": ("name", "description"),
+    "user": ("name", "email"),
+}
+
+
+def document(columns: tuple[str, ...]) -> str:
+    # proplan.search.document_sql must keep producing this exact expression, or Postgres
+    # will not match its queries to the index
+    parts = " || ' ' || ".join(f"coalesce({name}, '')" for name in columns)
+    return f"to_tsvector('simple', {parts})"
+
+
+def upgrade(conn: Connection) -> None:
+    if conn.dialect.name == "postgresql":
+        for table, columns in SEARCH_COLUMNS.items():
+            conn.exec_driver_sql(
+                f'CREATE INDEX IF NOT EXISTS ix_{table}_search ON "{table}" USING GIN ({document(columns)})'
+            )
+    elif conn.dialect.name == "sqlite":
+        for table, columns in SEARCH_COLUMNS.items():
+            _create_fts5(conn, table, columns)
+
+
+def _create_fts5(conn: Connection, table: str, columns: tuple[str, ...]) -> None:
+    fts = f"{table}_fts"
+    names = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    conn.exec_driver_sql(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({names}, content='{table}', content_rowid='id')"
+    )
+    conn.exec_driver_sql(
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON "{table}" BEGIN '
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new}); END"
+    )
+    conn.exec_driver_sql(
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON "{table}" BEGIN '
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old}); END"
+    )
+    conn.exec_driver_sql(
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {names} ON "{table}" BEGIN '
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new}); END"
+    )
+    # index whatever the table already holds (also resets the index after `reset-db`)
+    conn.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
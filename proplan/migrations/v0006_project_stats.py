@@ -0,0 +1,31 @@
+"""Per-project dashboard counters, filled from the existing tasks and memberships."""
+from sqlalchemy import Column, ForeignKey, Integer, MetaData, Table
+from sqlalchemy.engine import Connection
+
+metadata = MetaData()
+Table("project", metadata, Column("id", Integer, primary_key=True))
+project_stats = Table(
+    "project_stats", metadata,
+    Column("project_id", Integer, ForeignKey("project.id"), primary_key=True),
+    Column("open_tasks", Integer, nullable=False),
+    Column("in_progress_tasks", Integer, nullable=False),
+    Column("done_tasks", Integer, nullable=False),
+    Column("members", Integer, nullable=False),
+)
+
+# task.status holds enum member names
+BACKFILL = """
+INSERT INTO project_stats (project_id, open_tasks, in_progress_tasks, done_tasks, members)
+SELECT p.id,
+       (SELECT count(*) FROM task t WHERE t.project_id = p.id AND t.status = 'OPEN'),
+       (SELECT count(*) FROM task t WHERE t.project_id = p.id AND t.status = 'IN_PROGRESS'),
+       (SELECT count(*) FROM task t WHERE t.project_id = p.id AND t.status = 'DONE'),
+       (SELECT count(*) FROM project_workers w WHERE w.project_id = p.id)
+FROM project p
+"""
+
+
+def upgrade(conn: Connection) -> None:
+    project_stats.create(conn, checkfirst=True)
+    conn.exec_driver_sql("DELETE FROM project_stats")
+    conn.exec_driver_sql(BACKFILL)
@@ -0,0 +1,16 @@
+"""Per-project report generation counter guarding the report cache against stale writes."""
+from sqlalchemy import BigInteger, Column, Integer, MetaData, Table
+from sqlalchemy.engine import Connection
+
+metadata = MetaData()
+project_report_generation = Table(
+    "project_report_generation", metadata,
+    Column("project_id", Integer, primary_key=True),
+    Column("generation", BigInteger, nullable=False, server_default="0"),
+)
+
+
+def upgrade(conn: Connection) -> None:
+    project_report_generation.create(conn, checkfirst=True)
+    # entries stored before the guard may be stale; the cache refills on demand
+    conn.exec_driver_sql("DELETE FROM project_report_cache")
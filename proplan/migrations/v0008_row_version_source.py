@@ -0,0 +1,19 @@
+"""
+Database-allocated row versions: a sequence on PostgreSQL, a single-row counter on
+SQLite. Both start above every version already stored, so no row version is reused.
+"""
+from sqlalchemy.engine import Connection
+
+TABLES = ("user", "project", "task", "userdayoff")
+
+
+def upgrade(conn: Connection) -> None:
+    start = 1 + max(
+        conn.exec_driver_sql(f'SELECT COALESCE(MAX(version), 0) FROM "{table}"').scalar_one() for table in TABLES
+    )
+    if conn.dialect.name == "postgresql":
+        conn.exec_driver_sql(f"CREATE SEQUENCE IF NOT EXISTS row_version_seq START WITH {start}")
+        return
+    conn.exec_driver_sql("CREATE TABLE IF NOT EXISTS row_version (value BIGINT NOT NULL)")
+    if conn.exec_driver_sql("SELECT COUNT(*) FROM row_version").scalar_one() == 0:
+        conn.exec_driver_sql(f"INSERT INTO row_version (value) VALUES ({start - 1})")
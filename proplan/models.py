@@ -1,8 +1,45 @@
 from datetime import date, datetime
 from typing import List, Optional
-from sqlmodel import SQLModel, Field, Relationship, Column, String
+from sqlalchemy import BigInteger, Index, event, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, declared_attr
+from sqlmodel import SQLModel, Field, Relationship, Column, String, JSON
 from proplan.enums import DayOffType, Role, Availability, ProjectStatus, TaskStatus
 
+def allocate_versions(conn: Connection, n: int) -> list[int]:
+    """
+    `n` fresh row versions from the database (migration v0008), never from the clock:
+    `row_version_seq` on PostgreSQL, the `row_version` counter row on SQLite, which is
+    bumped in the writer's own transaction (SQLite runs one writer at a time).
+    """
+    if conn.dialect.name == "postgresql":
+        return list(conn.execute(text("SELECT nextval('row_version_seq') FROM generate_series(1, :n)"), {"n": n}).scalars())
+    conn.execute(text("UPDATE row_version SET value = value + :n"), {"n": n})
+    last = conn.execute(text("SELECT value FROM row_version")).scalar_one()
+    return list(range(last - n + 1, last + 1))
+
+def version_column() -> Column:
+    return Column("version", BigInteger, nullable=False, server_default="0")
+
+class Versioned:
+    """Row version set on every INSERT/UPDATE (see `_assign_versions`); a stale UPDATE raises StaleDataError."""
+    @declared_attr
+    def __mapper_args__(cls):
+        # False: the ORM keeps checking the old version in the UPDATE's WHERE, but takes the new one from us
+        return {"version_id_col": cls.__table__.c.version, "version_id_generator": False}
+
+@event.listens_for(Session, "before_flush")
+def _assign_versions(session: Session, flush_context, instances) -> None:
+    # same rule as the ORM's own counter: a row gets a new version when one of its columns changes
+    rows = [obj for obj in session.new if isinstance(obj, Versioned)]
+    rows += [
+        obj for obj in session.dirty
+        if isinstance(obj, Versioned) and session.is_modified(obj, include_collections=False)
+    ]
+    if rows:
+        for obj, version in zip(rows, allocate_versions(session.connection(), len(rows))):
+            obj.version = version
+
 class ProjectWorkerLink(SQLModel, table=True):
     __tablename__ = "project_workers"
     project_id: Optional[int] = Field(default=None, foreign_key="project.id", primary_key=True)
@@ -10,16 +47,19 @@ class ProjectWorkerLink(SQLModel, table=True):
 
 class TaskWorkerLink(SQLModel, table=True):
     __tablename__ = "task_workers"
+    # the primary key leads with task_id; "is this worker on any task" needs its own index
+    __table_args__ = (Index("ix_task_workers_user_id", "user_id"),)
     task_id: Optional[int] = Field(default=None, foreign_key="task.id", primary_key=True)
     user_id: Optional[int] = Field(default=None, foreign_key="user.id", primary_key=True)
 
-class User(SQLModel, table=True):
+class User(Versioned, SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
     email: str = Field(sa_column=Column(String, unique=True, index=True, nullable=False))
     password_hash: str = Field(exclude=True)
     availability: Availability = Field(default=Availability.FREE)
     role: Role = Field(default=Role.WORKER)
+    version: int = Field(default=0, sa_column=version_column())
 
     managed_projects: List["Project"] = Relationship(back_populates="manager")
     projects: List["Project"] = Relationship(back_populates="workers", link_model=ProjectWorkerLink)
@@ -27,13 +67,14 @@ class User(SQLModel, table=True):
 
     days_off: List["UserDayOff"] = Relationship(back_populates="user")
 
-class Project(SQLModel, table=True):
+class Project(Versioned, SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
     start_time: datetime = Field(default_factory=datetime.utcnow)
     end_time: Optional[datetime] = None
     description: Optional[str] = None
     status: ProjectStatus = Field(default=ProjectStatus.STARTED)
+    version: int = Field(default=0, sa_column=version_column())
 
     manager_id: Optional[int] = Field(default=None, foreign_key="user.id")
     manager: Optional["User"] = Relationship(back_populates="managed_projects")
@@ -41,24 +82,56 @@ class Project(SQLModel, table=True):
     workers: List[User] = Relationship(back_populates="projects", link_model=ProjectWorkerLink)
     tasks: List["Task"] = Relationship(back_populates="project")
 
-class Task(SQLModel, table=True):
+class Task(Versioned, SQLModel, table=True):
+    __table_args__ = (Index("ix_task_project_id_start_time", "project_id", "start_time"),)
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
     start_time: datetime = Field(default_factory=datetime.utcnow)
     end_time: Optional[datetime] = None
     status: TaskStatus = Field(default=TaskStatus.OPEN)
     details: Optional[str] = None
+    version: int = Field(default=0, sa_column=version_column())
 
     project_id: int = Field(foreign_key="project.id")
     project: Optional["Project"] = Relationship(back_populates="tasks")
 
     workers: List["User"] = Relationship(back_populates="tasks", link_model=TaskWorkerLink)
 
-class UserDayOff(SQLModel, table=True):
+class UserDayOff(Versioned, SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_userdayoff_user_id_dates", "user_id", "start_date", "end_date"),
+        # org-wide "who is off between X and Y"; also serves the reminder job's start_date lookup
+        Index("ix_userdayoff_dates", "start_date", "end_date"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True, index=True)
     user_id: int = Field(foreign_key="user.id")
     type: DayOffType
     start_date: date
     end_date: date
+    version: int = Field(default=0, sa_column=version_column())
 
     user: Optional["User"] = Relationship(back_populates="days_off")
+
+class ProjectStats(SQLModel, table=True):
+    """Task counts by status and member count of a project, kept current by the managers."""
+    __tablename__ = "project_stats"
+    project_id: int = Field(foreign_key="project.id", primary_key=True)
+    open_tasks: int = 0
+    in_progress_tasks: int = 0
+    done_tasks: int = 0
+    members: int = 0
+
+class ProjectReportCache(SQLModel, table=True):
+    """Materialized task rows of a closed-month project report."""
+    __tablename__ = "project_report_cache"
+    project_id: int = Field(primary_key=True)
+    year: int = Field(primary_key=True)
+    month: int = Field(primary_key=True)
+    tasks: list = Field(default_factory=list, sa_column=Column(JSON, nullable=False))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class ProjectReportGeneration(SQLModel, table=True):
+    """Bumped by every write that invalidates a project's cached reports, in that write's transaction."""
+    __tablename__ = "project_report_generation"
+    project_id: int = Field(primary_key=True)
+    generation: int = Field(default=0, sa_column=Column(BigInteger, nullable=False, server_default="0"))
@@ -1,14 +1,445 @@
-from typing import Set
+"""
+In-app notification hub behind the `/ws` endpoint.
+
+Every socket gets a bounded outbox drained by its own writer task, so `publish` never
+awaits a client: it serialises the event once and drops it into the outbox of each
+subscriber of its topics (`project:<id>`, `task:<id>`, `user:<id>`). Events that carry
+a coalescing key replace a still-queued event with the same key; a client whose
+outbox is full anyway, or whose send stalls, is disconnected and has to resync.
+Subscriptions are authorized once, at subscribe time, so events that take access away
+(e.g. `task.worker_removed`) carry a `revoke` that unsubscribes the user's sockets.
+
+With several worker processes, `publish` goes through a `Broker` (NOTIFY_BROKER:
+"memory", "postgres" LISTEN/NOTIFY or a local "socket" relay) that ships events in
+small batches to the hub of every worker.
+"""
+import asyncio
+import fcntl
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Iterable, Optional
 from fastapi import WebSocket
+from sqlalchemy import text
+
+from proplan.config import (
+    NOTIFY_BROKER,
+    NOTIFY_CHANNEL,
+    NOTIFY_FLUSH_INTERVAL,
+    NOTIFY_MAX_BATCH,
+    NOTIFY_SOCKET_PATH,
+    WS_QUEUE_SIZE,
+    WS_SEND_TIMEOUT,
+)
+
+# close code for clients that could not keep up ("try again later")
+SLOW_CONSUMER = 1013
+
+def project_topic(project_id: int) -> str:
+    return f"project:{project_id}"
+
+def task_topic(task_id: int) -> str:
+    return f"task:{task_id}"
+
+def user_topic(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+class Connection:
+    def __init__(self, hub: "Hub", ws: WebSocket, user_id: int, queue_size: int, send_timeout: float):
+        self.hub = hub
+        self.ws = ws
+        self.user_id = user_id
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.topics: set[str] = set()
+        # coalescing key (or a unique sequence number) -> serialised message
+        self._outbox: "OrderedDict[Any, str]" = OrderedDict()
+        self._ready = asyncio.Event()
+        self._seq = 0
+        self.closed = False
+        self.writer: Optional[asyncio.Task] = None
 
-connections: Set[WebSocket] = set()
+    def offer(self, text: str, key: Optional[str] = None) -> bool:
+        """Queue a message without blocking; False means the consumer was dropped."""
+        if self.closed:
+            return False
+        if key is not None and key in self._outbox:
+            self._outbox[key] = text
+            self.hub.coalesced += 1
+            return True
+        if len(self._outbox) >= self.queue_size:
+            self.hub.drop(self, "outbox full")
+            return False
+        if key is None:
+            self._seq += 1
+            key = self._seq
+        self._outbox[key] = text
+        self._ready.set()
+        return True
 
-async def broadcast_json(payload: dict):
-    dead = []
-    for ws in list(connections):
+    async def run_writer(self) -> None:
         try:
-            await ws.send_json(payload)
+            while not self.closed:
+                await self._ready.wait()
+                self._ready.clear()
+                while self._outbox and not self.closed:
+                    _, text = self._outbox.popitem(last=False)
+                    await asyncio.wait_for(self.ws.send_text(text), self.send_timeout)
+                    self.hub.delivered += 1
+        except asyncio.TimeoutError:
+            self.hub.drop(self, "send timed out")
         except Exception:
-            dead.append(ws)
-    for ws in dead:
-        connections.discard(ws)
+            # peer went away; the reader side will notice too
+            self.hub.drop(self, None)
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        try:
+            await self.ws.close(code=code, reason=reason)
+        except Exception:
+            pass
+
+
+class Hub:
+    def __init__(self, queue_size: int = WS_QUEUE_SIZE, send_timeout: float = WS_SEND_TIMEOUT):
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.connections: set[Connection] = set()
+        self.topics: dict[str, set[Connection]] = {}
+        # user id -> number of revokes seen; lets a subscribe notice one that raced its check
+        self.revocations: dict[int, int] = {}
+        self.published = 0
+        self.delivered = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def connect(self, ws: WebSocket, user_id: int) -> Connection:
+        conn = Connection(self, ws, user_id, self.queue_size, self.send_timeout)
+        self.connections.add(conn)
+        conn.writer = asyncio.create_task(conn.run_writer())
+        self.subscribe(conn, [user_topic(user_id)])
+        return conn
+
+    def subscribe(self, conn: Connection, topics: Iterable[str]) -> None:
+        for topic in topics:
+            conn.topics.add(topic)
+            self.topics.setdefault(topic, set()).add(conn)
+
+    def unsubscribe(self, conn: Connection, topics: Iterable[str]) -> None:
+        for topic in topics:
+            conn.topics.discard(topic)
+            subscribers = self.topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(conn)
+                if not subscribers:
+                    del self.topics[topic]
+
+    def disconnect(self, conn: Connection) -> None:
+        if conn not in self.connections:
+            return
+        conn.closed = True
+        conn._ready.set()
+        self.connections.discard(conn)
+        self.unsubscribe(conn, list(conn.topics))
+        if conn.writer is not None and conn.writer is not asyncio.current_task():
+            conn.writer.cancel()
+
+    def drop(self, conn: Connection, reason: Optional[str]) -> None:
+        if conn not in self.connections:
+            return
+        self.disconnect(conn)
+        if reason is not None:
+            self.dropped += 1
+            asyncio.get_running_loop().create_task(conn.close(SLOW_CONSUMER, reason))
+
+    def revoke(self, user_id: int, topics: Iterable[str]) -> None:
+        """Unsubscribe every socket of `user_id` from `topics`."""
+        self.revocations[user_id] = self.revocations.get(user_id, 0) + 1
+        for topic in topics:
+            for conn in [c for c in self.topics.get(topic, ()) if c.user_id == user_id]:
+                self.unsubscribe(conn, [topic])
+
+    def publish(self, topics: Iterable[str], event: dict, key: Optional[str] = None, revoke: Optional["Revoke"] = None) -> int:
+        """
+        Fan `event` out to every subscriber of any of `topics`, then apply `revoke`;
+        returns the number of recipients.
+        """
+        recipients: set[Connection] = set()
+        for topic in topics:
+            recipients.update(self.topics.get(topic, ()))
+        self.published += 1
+        if recipients:
+            text = self.encode(event)
+            for conn in recipients:
+                conn.offer(text, key)
+        if revoke is not None:
+            self.revoke(revoke["user_id"], revoke["topics"])
+        return len(recipients)
+
+    @staticmethod
+    def encode(event: dict) -> str:
+        return json.dumps(event, default=str)
+
+    def stats(self) -> dict:
+        return {
+            "connections": len(self.connections),
+            "topics": len(self.topics),
+            "published": self.published,
+            "delivered": self.delivered,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+        }
+
+
+# ---- cross-process fan-out -----------------------------------------------------
+
+Message = dict  # {"topics": [...], "event": {...}, "key": str | None, "revoke": Revoke | None}
+Revoke = dict  # {"user_id": int, "topics": [...]}
+
+class Broker:
+    """
+    Carries published events to the hub of every worker process.
+
+    `publish` stays synchronous: messages are buffered and shipped as one batch after
+    at most `flush_interval` seconds (or once `max_batch` are pending). Subclasses
+    implement `_send` and call `deliver` for batches that reach this process. Until
+    `start` has run (scripts, tests) events go straight to the local hub.
+    """
+
+    def __init__(self, hub: Hub, flush_interval: float = NOTIFY_FLUSH_INTERVAL, max_batch: int = NOTIFY_MAX_BATCH):
+        self.hub = hub
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.running = False
+        self.batches_sent = 0
+        self.batches_received = 0
+        self._pending: list[Message] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task] = set()
+
+    def publish(self, topics: Iterable[str], event: dict, key: Optional[str] = None, revoke: Optional[Revoke] = None) -> None:
+        if not self.running:
+            self.hub.publish(topics, event, key, revoke)
+            return
+        self._pending.append({"topics": list(topics), "event": event, "key": key, "revoke": revoke})
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.flush_interval, self._flush)
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.get_running_loop().create_task(self._send_logged(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send_logged(self, batch: list[Message]) -> None:
+        try:
+            await self._send(batch)
+            self.batches_sent += 1
+        except Exception as e:
+            # notifications are best effort; never fail the request that published them
+            print(f"[notify:err] lost {len(batch)} events: {e}")
+
+    def deliver(self, batch: list[Message]) -> None:
+        self.batches_received += 1
+        for m in batch:
+            self.hub.publish(m["topics"], m["event"], m.get("key"), m.get("revoke"))
+
+    @staticmethod
+    def encode_batch(batch: list[Message]) -> str:
+        return json.dumps(batch, default=str, separators=(",", ":"))
+
+    async def _send(self, batch: list[Message]) -> None:
+        raise NotImplementedError
+
+    async def start(self) -> None:
+        self.running = True
+
+    async def stop(self) -> None:
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self.running = False
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "batches_sent": self.batches_sent, "batches_received": self.batches_received}
+
+
+class InProcessBroker(Broker):
+    """Single worker: nothing to cross, deliver immediately."""
+    name = "memory"
+
+    def publish(self, topics: Iterable[str], event: dict, key: Optional[str] = None, revoke: Optional[Revoke] = None) -> None:
+        self.hub.publish(topics, event, key, revoke)
+
+    async def _send(self, batch: list[Message]) -> None:
+        self.deliver(batch)
+
+
+class PostgresBroker(Broker):
+    """
+    LISTEN/NOTIFY on the application's database. One pooled connection is kept for
+    LISTEN; batches are split to stay under the 8000-byte NOTIFY payload limit and
+    come back to the sender like to every other worker.
+    """
+    name = "postgres"
+    MAX_PAYLOAD = 7900
+
+    def __init__(self, hub: Hub, channel: str = NOTIFY_CHANNEL, **kwargs):
+        super().__init__(hub, **kwargs)
+        self.channel = channel
+        self._listen_conn = None
+
+    async def start(self) -> None:
+        from proplan.database import engine
+
+        self._engine = engine
+        self._listen_conn = await engine.connect()
+        raw = (await self._listen_conn.get_raw_connection()).driver_connection
+        await raw.add_listener(self.channel, self._on_notify)
+        await super().start()
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        self.deliver(json.loads(payload))
+
+    def _chunks(self, batch: list[Message]) -> Iterable[str]:
+        if len(batch) > 1:
+            payload = self.encode_batch(batch)
+            if len(payload.encode()) <= self.MAX_PAYLOAD:
+                yield payload
+            else:
+                half = len(batch) // 2
+                yield from self._chunks(batch[:half])
+                yield from self._chunks(batch[half:])
+            return
+        payload = self.encode_batch(batch)
+        if len(payload.encode()) > self.MAX_PAYLOAD:
+            raise ValueError(f"event too large for NOTIFY ({len(payload)} bytes)")
+        yield payload
+
+    async def _send(self, batch: list[Message]) -> None:
+        async with self._engine.connect() as conn:
+            for payload in self._chunks(batch):
+                await conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": self.channel, "payload": payload})
+            await conn.commit()
+
+    async def stop(self) -> None:
+        await super().stop()
+        if self._listen_conn is not None:
+            raw = (await self._listen_conn.get_raw_connection()).driver_connection
+            await raw.remove_listener(self.channel, self._on_notify)
+            await self._listen_conn.close()
+            self._listen_conn = None
+
+
+class SocketBroker(Broker):
+    """
+    Unix-socket relay for several workers on one box, no external service needed.
+    The first worker to bind `path` relays newline-delimited batches to the others;
+    the rest connect to it and re-elect if it goes away.
+    """
+    name = "socket"
+
+    def __init__(self, hub: Hub, path: str = NOTIFY_SOCKET_PATH, **kwargs):
+        super().__init__(hub, **kwargs)
+        self.path = path
+        self.is_relay = False
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._peers: set[asyncio.StreamWriter] = set()
+        self._upstream: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        await self._join()
+        await super().start()
+
+    async def _join(self) -> None:
+        # election under a lock file: an unlocked connect-else-bind races between
+        # bind() and listen() and could unlink a relay that is just starting
+        with open(self.path + ".lock", "w") as lock:
+            await asyncio.to_thread(fcntl.flock, lock, fcntl.LOCK_EX)
+            try:
+                try:
+                    reader, self._upstream = await asyncio.open_unix_connection(self.path, limit=2**24)
+                except (FileNotFoundError, ConnectionRefusedError):
+                    if os.path.exists(self.path):
+                        os.unlink(self.path)  # stale socket from a dead relay
+                    self._server = await asyncio.start_unix_server(self._serve_peer, self.path, limit=2**24)
+                    self.is_relay = True
+                    return
+                self.is_relay = False
+                self._reader_task = asyncio.create_task(self._read_upstream(reader))
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    async def _serve_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._peers.add(writer)
+        try:
+            while line := await reader.readline():
+                self._forward(line, exclude=writer)
+                self.deliver(json.loads(line))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._peers.discard(writer)
+            writer.close()
+
+    def _forward(self, line: bytes, exclude: Optional[asyncio.StreamWriter] = None) -> None:
+        for peer in list(self._peers):
+            if peer is not exclude:
+                peer.write(line)
+
+    async def _read_upstream(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while line := await reader.readline():
+                self.deliver(json.loads(line))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        if self.running:
+            # relay died: elect a new one
+            self._upstream = None
+            await self._join()
+
+    async def _send(self, batch: list[Message]) -> None:
+        line = (self.encode_batch(batch) + "\n").encode()
+        self.deliver(batch)
+        if self.is_relay:
+            self._forward(line)
+            await asyncio.gather(*(peer.drain() for peer in list(self._peers)), return_exceptions=True)
+        elif self._upstream is not None:
+            self._upstream.write(line)
+            await self._upstream.drain()
+
+    async def stop(self) -> None:
+        await super().stop()
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        if self._upstream is not None:
+            self._upstream.close()
+        if self._server is not None:
+            self._server.close()
+            for peer in list(self._peers):
+                peer.close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+
+BROKERS = {"memory": InProcessBroker, "postgres": PostgresBroker, "socket": SocketBroker}
+
+def create_broker(kind: str, hub: Hub, **kwargs) -> Broker:
+    if kind not in BROKERS:
+        raise ValueError(f"unknown NOTIFY_BROKER {kind!r}; choose from {', '.join(BROKERS)}")
+    return BROKERS[kind](hub, **kwargs)
+
+
+hub = Hub()
+broker = create_broker(NOTIFY_BROKER, hub)
+
+def publish(topics: Iterable[str], event: dict, key: Optional[str] = None, revoke: Optional[Revoke] = None) -> None:
+    broker.publish(topics, event, key, revoke)
@@ -0,0 +1,129 @@
+"""
+Per-request / per-job SQL statement auditing to catch N+1 patterns.
+
+While an audit is active (see `audit_queries` and `QueryAuditMiddleware`), every
+statement executed on the instrumented engine is fingerprinted: bound values and
+literals are ignored and expanded IN lists collapse, so the same query shape issued
+in a loop maps to one fingerprint with a high count.
+
+Tests can enforce budgets:
+
+    with audit_queries() as audit:
+        await client.get("/tasks/")
+    audit.assert_budget(max_statements=3, max_repeats=1)
+"""
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from proplan.config import QUERY_AUDIT_REPEAT_THRESHOLD
+
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*(?:\?|\$\d+|%\(\w+\)s|:\w+|__\[POSTCOMPILE_\w+\])\s*,?)+\)", re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"\$\d+|%\(\w+\)s|:\w+")
+_SPACE = re.compile(r"\s+")
+
+def fingerprint(statement: str) -> str:
+    shape = _IN_LIST.sub("IN (...)", statement)
+    shape = _STRING.sub("?", shape)
+    shape = _PARAM.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryAudit:
+    def __init__(self, label: str = "", repeat_threshold: int = QUERY_AUDIT_REPEAT_THRESHOLD,
+                 parent: Optional["QueryAudit"] = None):
+        self.label = label
+        self.repeat_threshold = repeat_threshold
+        # nested audits (e.g. a test around a request audited by the middleware) all see the statement
+        self.parent = parent
+        self.counts: Counter[str] = Counter()
+
+    def record(self, statement: str) -> None:
+        shape = fingerprint(statement)
+        audit = self
+        while audit is not None:
+            audit.counts[shape] += 1
+            audit = audit.parent
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def repeated(self) -> list[tuple[str, int]]:
+        """Statement shapes executed at least `repeat_threshold` times, most frequent first."""
+        return [(shape, n) for shape, n in self.counts.most_common() if n >= self.repeat_threshold]
+
+    def assert_budget(self, max_statements: Optional[int] = None, max_repeats: Optional[int] = None) -> None:
+        problems = []
+        if max_statements is not None and self.total > max_statements:
+            problems.append(f"{self.total} statements (budget {max_statements})")
+        if max_repeats is not None:
+            for shape, n in self.counts.most_common():
+                if n > max_repeats:
+                    problems.append(f"{n}x (budget {max_repeats}): {shape}")
+        if problems:
+            raise QueryBudgetExceeded(f"query budget exceeded for {self.label or 'block'}:\n  " + "\n  ".join(problems))
+
+    def report(self) -> None:
+        for shape, n in self.repeated:
+            print(f"[query-audit] {self.label}: {n}x {shape}")
+
+
+_current: ContextVar[Optional[QueryAudit]] = ContextVar("query_audit", default=None)
+
+@contextmanager
+def audit_queries(label: str = "", repeat_threshold: int = QUERY_AUDIT_REPEAT_THRESHOLD) -> Iterator[QueryAudit]:
+    audit = QueryAudit(label, repeat_threshold, parent=_current.get())
+    token = _current.set(audit)
+    try:
+        yield audit
+    finally:
+        _current.reset(token)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        audit = _current.get()
+        if audit is not None:
+            audit.record(statement)
+
+
+class QueryAuditMiddleware:
+    """Dev middleware: adds X-Query-Count / X-Query-Repeats headers and prints repeated shapes."""
+
+    def __init__(self, app: ASGIApp, repeat_threshold: int = QUERY_AUDIT_REPEAT_THRESHOLD):
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with audit_queries(f"{scope['method']} {scope['path']}", self.repeat_threshold) as audit:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    # for plain responses the handler (and its queries) is done by now
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-query-count", str(audit.total).encode()))
+                    headers.append((b"x-query-repeats", str(len(audit.repeated)).encode()))
+                    message["headers"] = headers
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+        audit.report()
@@ -0,0 +1,73 @@
+"""
+JSON rendering without the stdlib encoder.
+
+`FastJSONResponse` is the app's default response class: bodies are dumped by orjson
+when it is installed, else by pydantic-core (always present with pydantic 2).
+
+`RowEncoder` is the list fast path. FastAPI's `response_model` handling validates
+every ORM row into the schema before dumping it, and reading instrumented attributes
+through pydantic is most of that cost. The encoder reads the schema's fields with one
+precompiled `attrgetter` per row and dumps the result directly, from ORM entities or
+from the column-level rows of a sparse fieldset. List and detail endpoints keep
+`response_model` for the OpenAPI schema and return the encoded body themselves.
+"""
+from operator import attrgetter
+from typing import Any, Callable, Iterable, Optional
+
+import pydantic_core
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # optional speed-up, pydantic-core is the fallback
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return pydantic_core.to_json(content)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class RowEncoder:
+    """
+    Dumps ORM entities or projected rows as `schema` objects; the schema's fields must
+    be plain attributes. `fields` narrows the output to a sparse fieldset.
+    """
+
+    def __init__(self, schema: type[BaseModel]):
+        self.schema = schema
+        self.fields = tuple(schema.model_fields)
+        self._getters: dict[tuple[str, ...], Callable[[Any], tuple]] = {}
+
+    def _getter(self, fields: tuple[str, ...]) -> Callable[[Any], tuple]:
+        getter = self._getters.get(fields)
+        if getter is None:
+            get = attrgetter(*fields)
+            # attrgetter of a single name returns the bare value, not a 1-tuple
+            getter = self._getters[fields] = get if len(fields) > 1 else (lambda row: (get(row),))
+        return getter
+
+    def dicts(self, rows: Iterable[Any], fields: Optional[tuple[str, ...]] = None) -> list[dict]:
+        fields = fields or self.fields
+        get = self._getter(fields)
+        return [dict(zip(fields, get(row))) for row in rows]
+
+    def encode(self, rows: Iterable[Any], fields: Optional[tuple[str, ...]] = None) -> bytes:
+        return dumps(self.dicts(rows, fields))
+
+    def encode_one(self, row: Any, fields: Optional[tuple[str, ...]] = None) -> bytes:
+        fields = fields or self.fields
+        return dumps(dict(zip(fields, self._getter(fields)(row))))
+
+    def response(self, rows: Iterable[Any], fields: Optional[tuple[str, ...]] = None, status_code: int = 200) -> Response:
+        return Response(self.encode(rows, fields), status_code=status_code, media_type="application/json")
+
+    def one_response(self, row: Any, fields: Optional[tuple[str, ...]] = None, headers: Optional[dict] = None) -> Response:
+        return Response(self.encode_one(row, fields), headers=headers, media_type="application/json")
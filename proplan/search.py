@@ -0,0 +1,69 @@
+"""
+Full-text search over tasks, projects and users.
+
+Postgres: GIN indexes on `to_tsvector('simple', ...)` expressions (migration 0005);
+queries repeat the exact index expression so the planner can use it, and rank with
+`ts_rank`. SQLite: FTS5 external-content tables (`<table>_fts`) kept in sync by
+triggers, ranked with `bm25`. Any other dialect falls back to an unindexed LIKE.
+
+Every search term is a prefix match and all terms must match. Ranks are normalised so
+that lower is better, which lets `paginate_ranked` walk (rank, id) ascending.
+"""
+import re
+from typing import Any
+from fastapi import HTTPException
+from sqlalchemy import and_, column, func, literal, literal_column, or_, table
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from proplan.models import Project, Task, User
+from proplan.utils.pagination import Page, PageParams, paginate_ranked
+
+SEARCH_COLUMNS: dict[str, tuple[str, ...]] = {
+    Task.__tablename__: ("name", "details"),
+    Project.__tablename__: ("name", "description"),
+    User.__tablename__: ("name", "email"),
+}
+MAX_TERMS = 8
+_WORD = re.compile(r"\w+")
+
+
+def terms(q: str) -> list[str]:
+    words = _WORD.findall(q.lower())[:MAX_TERMS]
+    if not words:
+        raise HTTPException(status_code=400, detail="Search query needs at least one word")
+    return words
+
+
+def document_sql(table_name: str) -> str:
+    """The tsvector expression indexed by migration 0005 (literal SQL so index and query match)."""
+    prefix = f'"{table_name}".'
+    parts = " || ' ' || ".join(f"coalesce({prefix}{name}, '')" for name in SEARCH_COLUMNS[table_name])
+    return f"to_tsvector('simple', {parts})"
+
+
+def fts_table_name(table_name: str) -> str:
+    return f"{table_name}_fts"
+
+
+def match(statement: Any, model: Any, q: str, dialect: str) -> tuple[Any, Any]:
+    """Restrict `statement` to rows of `model` matching `q`; returns (statement, rank expression)."""
+    words = terms(q)
+    name = model.__tablename__
+    if dialect == "postgresql":
+        document = literal_column(document_sql(name))
+        query = func.to_tsquery(literal_column("'simple'"), " & ".join(f"{w}:*" for w in words))
+        return statement.where(document.op("@@")(query)), -func.ts_rank(document, query)
+    if dialect == "sqlite":
+        fts = table(fts_table_name(name), column("rowid"))
+        fts_ref = literal_column(fts_table_name(name))
+        expression = " ".join(f'"{w}"*' for w in words)
+        statement = statement.join(fts, fts.c.rowid == model.id).where(fts_ref.op("MATCH")(expression))
+        return statement, func.bm25(fts_ref)
+    columns = [getattr(model, c) for c in SEARCH_COLUMNS[name]]
+    return statement.where(and_(*(or_(*(c.ilike(f"%{w}%") for c in columns)) for w in words))), literal(0)
+
+
+async def paginate_matches(session: AsyncSession, statement: Any, model: Any, q: str, params: PageParams) -> Page:
+    """Best matches first; `statement` must be a column-level select (see fieldsets.select_rows)."""
+    statement, rank = match(statement, model, q, session.bind.dialect.name)
+    return await paginate_ranked(session, statement, rank, model.id, params)
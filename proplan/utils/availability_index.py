@@ -0,0 +1,206 @@
+import asyncio
+import time
+from bisect import bisect_right, insort
+from datetime import date
+from functools import partial
+from itertools import accumulate
+from typing import Callable, Iterable, Optional
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from proplan.config import AVAILABILITY_INDEX_TTL_SECONDS
+from proplan.database import async_session_factory
+from proplan.models import TaskWorkerLink, UserDayOff
+
+
+class LeaveCalendar:
+    """Leave ranges of one user sorted by start, with running max of ends for O(log n) overlap tests."""
+
+    __slots__ = ("ranges", "starts", "max_ends")
+
+    def __init__(self):
+        self.ranges: list[tuple[date, date, int]] = []
+        self.starts: list[date] = []
+        self.max_ends: list[date] = []
+
+    def add(self, start: date, end: date, entry_id: int) -> None:
+        insort(self.ranges, (start, end, entry_id))
+        self._reindex()
+
+    def remove(self, entry_id: int) -> None:
+        self.ranges = [r for r in self.ranges if r[2] != entry_id]
+        self._reindex()
+
+    def _reindex(self) -> None:
+        self.starts = [r[0] for r in self.ranges]
+        self.max_ends = list(accumulate((r[1] for r in self.ranges), max))
+
+    def overlaps(self, start: date, end: date) -> bool:
+        # ranges starting on/before `end` overlap iff one of them ends on/after `start`
+        i = bisect_right(self.starts, end)
+        return i > 0 and self.max_ends[i - 1] >= start
+
+    def __bool__(self) -> bool:
+        return bool(self.ranges)
+
+
+class AvailabilityIndex:
+    """
+    Per-process view of who is assigned to a task and who is on leave when.
+
+    Loaded with two queries on first use, then kept in sync by TaskManager and
+    DayOffManager. Like the principal cache it is only synced in-process, so the TTL
+    bounds how stale it can get with several workers; write paths keep checking
+    the database, this index only answers "who is free" reads.
+
+    Once the TTL runs out, reads keep being answered from the current snapshot while
+    one background task reloads it (so staleness stays under TTL + one reload); only
+    the very first load, or one after `invalidate`, makes a request wait. Sync hooks
+    that run during a reload are replayed onto the new snapshot before it is used.
+    """
+
+    def __init__(self, ttl: float = AVAILABILITY_INDEX_TTL_SECONDS):
+        self.ttl = ttl
+        self.tasks_of: dict[int, set[int]] = {}
+        self.workers_of: dict[int, set[int]] = {}
+        self.leave: dict[int, LeaveCalendar] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._refresh: Optional[asyncio.Task] = None
+        # hook calls made while a reload reads the tables, replayed after the swap
+        self._journal: Optional[list[Callable[[], None]]] = None
+        self._epoch = 0  # bumped by `invalidate`; a reload started before it is discarded
+        self.loads = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    async def ensure_loaded(self, session: AsyncSession) -> "AvailabilityIndex":
+        if self.loaded:
+            return self
+        if self._loaded_at is not None:
+            if self._refresh is None:
+                # journal from here: the task may only get to its queries after later writes
+                self._journal = []
+                self._refresh = asyncio.create_task(self._refresh_in_background(self._epoch))
+            return self
+        async with self._lock:
+            if self._loaded_at is None:
+                await self._reload(session, self._epoch)
+        return self
+
+    async def _refresh_in_background(self, epoch: int) -> None:
+        try:
+            async with self._lock, async_session_factory() as session:
+                await self._reload(session, epoch)
+        except Exception as e:
+            # keep serving the old snapshot; the next read past the TTL tries again
+            print(f"[availability-index:err] reload failed: {e}")
+        finally:
+            self._refresh = None
+            self._journal = None
+
+    async def _reload(self, session: AsyncSession, epoch: int) -> None:
+        started = time.monotonic()
+        if self._journal is None:
+            self._journal = []
+        try:
+            tasks_of: dict[int, set[int]] = {}
+            workers_of: dict[int, set[int]] = {}
+            leave: dict[int, LeaveCalendar] = {}
+            for task_id, user_id in (await session.exec(select(TaskWorkerLink.task_id, TaskWorkerLink.user_id))).all():
+                tasks_of.setdefault(user_id, set()).add(task_id)
+                workers_of.setdefault(task_id, set()).add(user_id)
+            statement = select(UserDayOff.id, UserDayOff.user_id, UserDayOff.start_date, UserDayOff.end_date)
+            for entry_id, user_id, start, end in (await session.exec(statement)).all():
+                leave.setdefault(user_id, LeaveCalendar()).ranges.append((start, end, entry_id))
+            for calendar in leave.values():
+                calendar.ranges.sort()
+                calendar._reindex()
+        finally:
+            journal, self._journal = self._journal, None
+        if epoch != self._epoch:
+            return
+        # no await from here on: the swap and the replay happen as one step
+        self.tasks_of, self.workers_of, self.leave = tasks_of, workers_of, leave
+        self._loaded_at = started
+        self.loads += 1
+        for replay in journal:
+            replay()
+
+    def invalidate(self) -> None:
+        self._epoch += 1
+        self._loaded_at = None
+        self.tasks_of.clear()
+        self.workers_of.clear()
+        self.leave.clear()
+
+    # ---- queries ---------------------------------------------------------------
+
+    def is_assigned(self, user_id: int) -> bool:
+        return bool(self.tasks_of.get(user_id))
+
+    def on_leave(self, user_id: int, start: date, end: date) -> bool:
+        calendar = self.leave.get(user_id)
+        return calendar is not None and calendar.overlaps(start, end)
+
+    def available(self, user_ids: Iterable[int], start: date, end: date) -> list[int]:
+        """Users from `user_ids` with no task and no leave overlapping [start, end]."""
+        return [u for u in user_ids if not self.is_assigned(u) and not self.on_leave(u, start, end)]
+
+    # ---- sync hooks (no-ops until loaded; journaled during a reload) ------------
+
+    def _record(self, hook: Callable, *args) -> None:
+        if self._journal is not None:
+            self._journal.append(partial(hook, *args))
+
+    def assign(self, task_id: int, user_id: int) -> None:
+        self._record(self.assign, task_id, user_id)
+        if self._loaded_at is not None:
+            self.tasks_of.setdefault(user_id, set()).add(task_id)
+            self.workers_of.setdefault(task_id, set()).add(user_id)
+
+    def unassign(self, task_id: int, user_id: int) -> None:
+        self._record(self.unassign, task_id, user_id)
+        self.tasks_of.get(user_id, set()).discard(task_id)
+        self.workers_of.get(task_id, set()).discard(user_id)
+
+    def drop_task(self, task_id: int) -> None:
+        self._record(self.drop_task, task_id)
+        for user_id in self.workers_of.pop(task_id, ()):
+            self.tasks_of.get(user_id, set()).discard(task_id)
+
+    def add_leave(self, entry: UserDayOff) -> None:
+        self._record(self._replay_leave, entry)
+        if self._loaded_at is not None:
+            self.leave.setdefault(entry.user_id, LeaveCalendar()).add(entry.start_date, entry.end_date, entry.id)
+
+    def _replay_leave(self, entry: UserDayOff) -> None:
+        # the reload may already have read this entry
+        self.remove_leave(entry)
+        self.add_leave(entry)
+
+    def remove_leave(self, entry: UserDayOff) -> None:
+        self._record(self.remove_leave, entry)
+        calendar = self.leave.get(entry.user_id)
+        if calendar is not None:
+            calendar.remove(entry.id)
+
+    def drop_user(self, user_id: int) -> None:
+        self._record(self.drop_user, user_id)
+        for task_id in self.tasks_of.pop(user_id, ()):
+            self.workers_of.get(task_id, set()).discard(user_id)
+        self.leave.pop(user_id, None)
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "loads": self.loads,
+            "refreshing": self._refresh is not None,
+            "assigned_workers": sum(1 for tasks in self.tasks_of.values() if tasks),
+            "workers_with_leave": sum(1 for c in self.leave.values() if c),
+        }
+
+
+availability_index = AvailabilityIndex()
@@ -0,0 +1,48 @@
+"""
+Strong ETags from row versions (`proplan.models.allocate_versions`).
+
+A row's tag is its version. A page of a list is tagged with a digest of its rows'
+(id, version) pairs, so edits, inserts and deletes that touch the page change it while
+writes elsewhere in the table do not. Conditional requests are answered by raising
+HTTPException: Starlette sends 304 without a body.
+"""
+import hashlib
+from typing import Any, Iterable, Optional
+from fastapi import HTTPException
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+
+def etag(version: int) -> str:
+    return f'"{version}"'
+
+def page_etag(keys: Iterable[tuple[int, int]], more: bool, total: Optional[int] = None) -> str:
+    """Tag of one page: its (id, version) pairs, whether a next page exists and the total, if sent."""
+    digest = hashlib.blake2b(digest_size=12)
+    for key, version in keys:
+        digest.update(b"%d:%d," % (key, version))
+    digest.update(f"{more}:{total}".encode())
+    return f'"{digest.hexdigest()}"'
+
+def _tags(header: str) -> list[str]:
+    return [t.strip() for t in header.split(",") if t.strip()]
+
+def check_not_modified(if_none_match: Optional[str], tag: str) -> None:
+    """304 when If-None-Match lists `tag` (weak comparison, as RFC 9110 asks for GET)."""
+    if not if_none_match:
+        return
+    tags = _tags(if_none_match)
+    if "*" in tags or tag in (t.removeprefix("W/") for t in tags):
+        raise HTTPException(status_code=304, headers={"ETag": tag})
+
+def check_precondition(if_match: Optional[str], tag: str) -> None:
+    """412 unless If-Match is absent, `*`, or lists `tag` (strong comparison)."""
+    if not if_match:
+        return
+    tags = _tags(if_match)
+    if "*" not in tags and tag not in tags:
+        raise HTTPException(status_code=412, detail="Resource has been modified", headers={"ETag": tag})
+
+async def current_version(session: AsyncSession, model: Any, id: int) -> Optional[int]:
+    """Version of one row without loading it (None if it does not exist)."""
+    return (await session.exec(select(model.version).where(model.id == id))).first()
@@ -0,0 +1,55 @@
+"""
+Sparse fieldsets: `?fields=id,name,status` selects only those columns.
+
+Names are checked against the endpoint's output schema, so hidden columns such as
+`password_hash` can never be asked for. `id` is always returned (keyset cursors need
+it) and `version` is always read (ETags need it) but only returned when requested.
+"""
+from typing import Any, Callable, Optional
+import sqlalchemy
+from fastapi import HTTPException, Query
+from pydantic import BaseModel
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+Fields = Optional[tuple[str, ...]]
+
+
+def fieldset(schema: type[BaseModel]) -> Callable[..., Fields]:
+    """Dependency parsing `?fields=` into a tuple of `schema` field names (schema order), or None for all."""
+    known = tuple(schema.model_fields)
+
+    def parse(
+        fields: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(known)}"),
+    ) -> Fields:
+        if not fields:
+            return None
+        wanted = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = wanted.difference(known)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        wanted.add("id")
+        return tuple(f for f in known if f in wanted)
+
+    return parse
+
+
+def select_rows(model: Any, fields: Fields) -> Any:
+    """Column-level select returning rows with `fields` (+ id, version), or every column."""
+    if not fields:
+        return sqlalchemy.select(*model.__table__.columns)
+    names = dict.fromkeys((*fields, "id", "version"))
+    # plain SQLAlchemy select: sqlmodel's would unwrap a one-column result into scalars
+    return sqlalchemy.select(*(getattr(model, name) for name in names))
+
+
+def select_fields(model: Any, fields: Fields) -> Any:
+    """`select(model)`, or a column-level select returning rows with just `fields` (+ id, version)."""
+    return select(model) if not fields else select_rows(model, fields)
+
+
+async def load(session: AsyncSession, model: Any, id: int, fields: Fields) -> Any:
+    """`session.get`, or the projected row for `fields`; None if missing."""
+    if not fields:
+        return await session.get(model, id)
+    return (await session.exec(select_fields(model, fields).where(model.id == id))).first()
@@ -0,0 +1,75 @@
+"""
+Per-day leave counts for a team, computed with difference arrays.
+
+Each (user, type) and each user's ranges are merged first, so overlapping entries
+never count a person twice. Every merged range then costs two array writes
+(+1 on its first day, -1 after its last), and one prefix sum per series turns the
+arrays into daily counts: O(entries log entries + days * types) in total, however
+long the ranges are.
+"""
+from datetime import date, timedelta
+from enum import Enum
+from itertools import accumulate
+from typing import Hashable, Iterable
+
+LeaveEntry = tuple[int, Hashable, date, date]  # user_id, type, start, end (inclusive)
+
+
+def _merged(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Union of inclusive day-offset ranges, adjacent ones joined."""
+    out: list[tuple[int, int]] = []
+    for a, b in sorted(ranges):
+        if out and a <= out[-1][1] + 1:
+            if b > out[-1][1]:
+                out[-1] = (out[-1][0], b)
+        else:
+            out.append((a, b))
+    return out
+
+
+def leave_heatmap(entries: Iterable[LeaveEntry], start: date, end: date, types: Iterable[Hashable]) -> list[dict]:
+    """One row per day in [start, end]: members off, members off per type, and their ids."""
+    days = (end - start).days + 1
+    per_type: dict[Hashable, dict[int, list]] = {t: {} for t in types}
+    per_user: dict[int, list] = {}
+    for user_id, kind, a, b in entries:
+        # clip to the window; callers only pass overlapping entries
+        lo, hi = max((a - start).days, 0), min((b - start).days, days - 1)
+        if lo > hi:
+            continue
+        per_type.setdefault(kind, {}).setdefault(user_id, []).append((lo, hi))
+        per_user.setdefault(user_id, []).append((lo, hi))
+
+    def series(ranges_by_user: dict[int, list]) -> list[int]:
+        diff = [0] * (days + 1)
+        for ranges in ranges_by_user.values():
+            for lo, hi in _merged(ranges):
+                diff[lo] += 1
+                diff[hi + 1] -= 1
+        return list(accumulate(diff[:days]))
+
+    totals = series(per_user)
+    counts = {kind: series(users) for kind, users in per_type.items()}
+
+    # who is off: only rebuild the id list on days someone starts or returns
+    arrivals: dict[int, list[int]] = {}
+    departures: dict[int, list[int]] = {}
+    for user_id, ranges in per_user.items():
+        for lo, hi in _merged(ranges):
+            arrivals.setdefault(lo, []).append(user_id)
+            departures.setdefault(hi + 1, []).append(user_id)
+    off: set[int] = set()
+    ids: list[int] = []
+    rows = []
+    for d in range(days):
+        if d in arrivals or d in departures:
+            off.difference_update(departures.get(d, ()))
+            off.update(arrivals.get(d, ()))
+            ids = sorted(off)
+        rows.append({
+            "date": start + timedelta(days=d),
+            "total": totals[d],
+            "by_type": {(k.value if isinstance(k, Enum) else k): c[d] for k, c in counts.items()},
+            "user_ids": ids,
+        })
+    return rows
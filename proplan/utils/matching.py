@@ -0,0 +1,141 @@
+"""
+Maximum worker-to-task assignment (bipartite b-matching).
+
+Tasks have a capacity (open headcount) and a date window; a worker can fill one slot
+of any task whose window does not overlap their leave. Adjacency is never
+materialised (10k x 10k would be 100M edges): an unconstrained worker fits every
+task, and a worker with leave only stores the few tasks their leave blocks.
+
+1. workers with leave go first, most constrained first, each taking the earliest
+   free task they fit;
+2. unconstrained workers fill what is left;
+3. every worker still unmatched while capacity remains gets one BFS for an
+   augmenting path (Kuhn). A worker without a path now never gets one later, so the
+   result is a maximum matching.
+"""
+from bisect import bisect_left, bisect_right
+from collections import deque
+from dataclasses import dataclass
+from datetime import date
+from typing import Hashable, Optional
+
+
+@dataclass
+class Slot:
+    key: Hashable
+    capacity: int
+    start: date
+    end: date
+
+
+def blocked_tasks(slots: list[Slot], leave: dict[int, list[tuple[date, date]]]) -> dict[int, set[int]]:
+    """Indices of `slots` whose window overlaps each worker's leave."""
+    order = sorted(range(len(slots)), key=lambda i: slots[i].start)
+    starts = [slots[i].start for i in order]
+    longest = max((slots[i].end - slots[i].start for i in order), default=None)
+    blocked: dict[int, set[int]] = {}
+    for worker, ranges in leave.items():
+        hit = set()
+        for a, b in ranges:
+            # a task overlapping [a, b] starts in [a - longest, b] and ends on/after a
+            lo = bisect_left(starts, a - longest) if longest is not None else 0
+            for pos in range(lo, bisect_right(starts, b)):
+                i = order[pos]
+                if slots[i].end >= a:
+                    hit.add(i)
+        if hit:
+            blocked[worker] = hit
+    return blocked
+
+
+def max_assignment(
+    slots: list[Slot], workers: list[int], leave: Optional[dict[int, list[tuple[date, date]]]] = None
+) -> list[tuple[Hashable, int]]:
+    """Return (slot key, worker) pairs of a maximum assignment; slots are preferred in list order."""
+    blocked = blocked_tasks(slots, leave or {})
+    free = [s.capacity for s in slots]
+    holders: list[list[int]] = [[] for _ in slots]
+    match: dict[int, int] = {}
+    open_slots = [i for i, c in enumerate(free) if c > 0]  # kept in slot order
+    remaining = sum(free)
+
+    def take(worker: int, i: int) -> None:
+        nonlocal remaining
+        match[worker] = i
+        holders[i].append(worker)
+        free[i] -= 1
+        remaining -= 1
+
+    def release(worker: int) -> int:
+        nonlocal remaining
+        i = match.pop(worker)
+        holders[i].remove(worker)
+        free[i] += 1
+        remaining += 1
+        return i
+
+    def first_fit(worker: int) -> Optional[int]:
+        nope = blocked.get(worker, ())
+        for i in open_slots:
+            if free[i] > 0 and i not in nope:
+                return i
+        return None
+
+    def compact() -> None:
+        open_slots[:] = [i for i in open_slots if free[i] > 0]
+
+    constrained = sorted((w for w in workers if w in blocked), key=lambda w: -len(blocked[w]))
+    unconstrained = [w for w in workers if w not in blocked]
+
+    for w in constrained:
+        if not remaining:
+            break
+        i = first_fit(w)
+        if i is not None:
+            take(w, i)
+            if not free[i]:
+                compact()
+    cursor = 0
+    for w in unconstrained:
+        if not remaining:
+            break
+        while not free[open_slots[cursor]]:
+            cursor += 1
+        take(w, open_slots[cursor])
+
+    # Kuhn phase: only workers with leave can be stuck while capacity is left
+    for w in constrained:
+        if not remaining:
+            break
+        if w not in match:
+            _augment(w, len(slots), free, holders, match, blocked, take, release)
+    return [(slots[i].key, w) for w, i in match.items()]
+
+
+def _augment(root, n_slots, free, holders, match, blocked, take, release) -> bool:
+    """BFS over alternating paths worker -> fitting slot -> its holder -> ... -> slot with room."""
+    unvisited = set(range(n_slots))
+    parent_slot: dict[int, tuple[int, Optional[int]]] = {}  # slot -> (worker who reached it, worker's previous slot)
+    queue = deque([root])
+    seen_workers = {root}
+    while queue:
+        w = queue.popleft()
+        nope = blocked.get(w, ())
+        for i in [i for i in unvisited if i not in nope]:
+            unvisited.discard(i)
+            parent_slot[i] = (w, match.get(w))
+            if free[i] > 0:
+                # walk back: each worker on the path moves into the slot that reached it
+                while True:
+                    mover, previous = parent_slot[i]
+                    if previous is not None:
+                        release(mover)
+                    take(mover, i)
+                    if previous is None:
+                        return True
+                    i = previous
+            for holder in holders[i]:
+                if holder not in seen_workers:
+                    seen_workers.add(holder)
+                    queue.append(holder)
+    return False
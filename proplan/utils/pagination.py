@@ -0,0 +1,120 @@
+import base64
+import json
+from dataclasses import dataclass, field
+from typing import Any, Optional
+from fastapi import Header, HTTPException, Query, Response
+from sqlalchemy import and_, func, or_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from proplan.utils.etags import check_not_modified, page_etag
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+@dataclass
+class PageParams:
+    limit: int = DEFAULT_PAGE_SIZE
+    cursor: Optional[str] = None
+    with_total: bool = False
+    if_none_match: Optional[str] = None
+
+@dataclass
+class Page:
+    items: list = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    etag: Optional[str] = None
+
+    def apply_headers(self, response: Response) -> None:
+        if self.next_cursor:
+            response.headers["X-Next-Cursor"] = self.next_cursor
+        if self.total is not None:
+            response.headers["X-Total-Count"] = str(self.total)
+        if self.etag:
+            response.headers["ETag"] = self.etag
+
+def page_params(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    with_total: bool = Query(False, description="Also return X-Total-Count (costs an extra COUNT query)"),
+    if_none_match: Optional[str] = Header(None),
+) -> PageParams:
+    return PageParams(limit=limit, cursor=cursor, with_total=with_total, if_none_match=if_none_match)
+
+def encode_cursor(last_id: int, **extra: Any) -> str:
+    raw = json.dumps({"id": last_id, **extra}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise HTTPException(400, "Invalid cursor")
+    if not isinstance(payload, dict) or not isinstance(payload.get("id"), int):
+        raise HTTPException(400, "Invalid cursor")
+    return payload
+
+def decode_cursor(cursor: str) -> int:
+    return _decode(cursor)["id"]
+
+def decode_ranked_cursor(cursor: str) -> tuple[float, int]:
+    payload = _decode(cursor)
+    rank = payload.get("rank")
+    if not isinstance(rank, (int, float)) or isinstance(rank, bool):
+        raise HTTPException(400, "Invalid cursor")
+    return rank, payload["id"]
+
+async def paginate(session: AsyncSession, statement: Any, key: Any, params: PageParams, version: Any = None) -> Page:
+    """
+    Keyset-paginate `statement` on the integer column `key` (ascending).
+
+    With a `version` column the page gets an ETag over its own (key, version) pairs
+    (`page_etag`), at no extra query. A request carrying If-None-Match first reads
+    just those two columns for the page and raises 304 on a match, before any full
+    row is loaded or serialized.
+    """
+    total = tag = None
+    if params.with_total:
+        count_stmt = select(func.count()).select_from(statement.order_by(None).subquery())
+        total = (await session.exec(count_stmt)).one()
+
+    if params.cursor:
+        statement = statement.where(key > decode_cursor(params.cursor))
+    # fetch one extra row to know whether another page exists
+    statement = statement.order_by(key).limit(params.limit + 1)
+    if version is not None and params.if_none_match:
+        keys = (await session.execute(statement.with_only_columns(key, version))).all()
+        check_not_modified(params.if_none_match, page_etag(keys[: params.limit], len(keys) > params.limit, total))
+    items = list((await session.exec(statement)).all())
+
+    more = len(items) > params.limit
+    items = items[: params.limit]
+    next_cursor = encode_cursor(getattr(items[-1], key.key)) if more else None
+    if version is not None:
+        tag = page_etag(((getattr(i, key.key), getattr(i, version.key)) for i in items), more, total)
+    return Page(items=items, next_cursor=next_cursor, total=total, etag=tag)
+
+async def paginate_ranked(session: AsyncSession, statement: Any, rank: Any, key: Any, params: PageParams) -> Page:
+    """
+    Keyset-paginate `statement` on (`rank`, `key`) ascending, e.g. search matches with
+    lower-is-better scores. `statement` must select columns (rows), not an entity.
+    """
+    total = None
+    if params.with_total:
+        count_stmt = select(func.count()).select_from(statement.order_by(None).subquery())
+        total = (await session.exec(count_stmt)).one()
+
+    ranked = statement.add_columns(rank.label("search_rank"))
+    if params.cursor:
+        last_rank, last_id = decode_ranked_cursor(params.cursor)
+        ranked = ranked.where(or_(rank > last_rank, and_(rank == last_rank, key > last_id)))
+    result = await session.exec(ranked.order_by(rank, key).limit(params.limit + 1))
+    items = list(result.all())
+
+    next_cursor = None
+    if len(items) > params.limit:
+        items = items[: params.limit]
+        next_cursor = encode_cursor(items[-1].id, rank=items[-1].search_rank)
+    return Page(items=items, next_cursor=next_cursor, total=total)
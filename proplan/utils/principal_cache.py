@@ -0,0 +1,115 @@
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from proplan.config import PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL_SECONDS
+from proplan.models import User
+
+
+class TTLCache:
+    """Small LRU cache whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl > 0
+
+    def get(self, key: Any) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Any, value: Any, ttl: Optional[float] = None) -> None:
+        if not self.enabled:
+            return
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Any) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+def _detached_copy(user: User) -> User:
+    # every request gets its own instance so no handler can mutate shared state
+    return User(
+        id=user.id,
+        name=user.name,
+        email=user.email,
+        password_hash=user.password_hash,
+        availability=user.availability,
+        role=user.role,
+    )
+
+
+class PrincipalCache:
+    """
+    Per-process cache of authenticated users (by user_id) and decoded JWTs (by token).
+
+    Invalidation is in-process only: with several uvicorn workers, the TTL bounds how
+    long another worker may keep serving a stale role.
+    """
+
+    def __init__(self, maxsize: int = PRINCIPAL_CACHE_SIZE, ttl: float = PRINCIPAL_CACHE_TTL_SECONDS):
+        self.users = TTLCache(maxsize, ttl)
+        self.tokens = TTLCache(maxsize, ttl)
+
+    @property
+    def enabled(self) -> bool:
+        return self.users.enabled
+
+    def configure(self, maxsize: int, ttl: float) -> None:
+        for cache in (self.users, self.tokens):
+            cache.maxsize, cache.ttl = maxsize, ttl
+            cache.clear()
+
+    def get_token(self, token: str) -> Optional[dict]:
+        payload = self.tokens.get(token)
+        # never serve a memoized payload past the token's own expiry
+        if payload is not None and payload.get("exp", 0) <= time.time():
+            self.tokens.pop(token)
+            return None
+        return payload
+
+    def set_token(self, token: str, payload: dict) -> None:
+        self.tokens.set(token, payload, ttl=payload.get("exp", 0) - time.time())
+
+    def get_user(self, user_id: int) -> Optional[User]:
+        user = self.users.get(user_id)
+        return _detached_copy(user) if user is not None else None
+
+    def set_user(self, user: User) -> None:
+        self.users.set(user.id, _detached_copy(user))
+
+    def invalidate(self, user_id: int) -> None:
+        self.users.pop(user_id)
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "users": self.users.stats(), "tokens": self.tokens.stats()}
+
+
+principal_cache = PrincipalCache()
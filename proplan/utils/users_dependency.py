@@ -2,41 +2,45 @@ from datetime import datetime, timedelta
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from proplan.config import ACCESS_TOKEN_EXPIRE_MINUTES, JWT_ALGORITHM, JWT_SECRET
 from proplan.database import get_session
 from proplan.models import User
+from proplan.utils.password_hasher import crypto_context, get_password_hash, verify_password
+from proplan.utils.principal_cache import principal_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
 async def get_current_user(token: str = Depends(oauth2_scheme), session: AsyncSession = Depends(get_session)) -> User:
+    return await user_from_token(token, session)
+
+async def user_from_token(token: str, session: AsyncSession) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        user_id: int | None = payload.get("user_id")
-        if user_id is None:
+    payload = principal_cache.get_token(token)
+    if payload is None:
+        try:
+            payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        except JWTError:
             raise credentials_exception
-    except JWTError:
+        principal_cache.set_token(token, payload)
+    user_id: int | None = payload.get("user_id")
+    if user_id is None:
         raise credentials_exception
+
+    user = principal_cache.get_user(user_id)
+    if user is not None:
+        return user
     user = await session.get(User, user_id)
     if user is None:
         raise credentials_exception
+    principal_cache.set_user(user)
     return user
 
-crypto_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def get_password_hash(password: str) -> str:
-    return crypto_context.hash(password)
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return crypto_context.verify(plain_password, hashed_password)
-
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
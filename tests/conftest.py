@@ -0,0 +1,58 @@
+"""
+The suite runs offline against a scratch SQLite file: DATABASE_URL is set here, before
+anything imports `proplan`, and the demo data is seeded once per session.
+"""
+import asyncio
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(prefix="proplan-tests-"), "test.db")
+
+import pytest
+
+import proplan.main  # noqa: F401  (instruments the engine for query_audit)
+from proplan.database import async_session_factory, engine, init_db
+from proplan.manage import seed_projects_and_tasks, seed_users
+
+
+def _run(coro):
+    """Run `coro` on a fresh event loop; pooled connections must not outlive it."""
+    async def main():
+        try:
+            return await coro
+        finally:
+            await engine.dispose()
+    return asyncio.run(main())
+
+
+class RecordingNotifier:
+    """Stands in for NotificationManager: records mail instead of sending it."""
+
+    def __init__(self):
+        self.sent: list[tuple[str, str, str]] = []
+
+    async def send_email(self, to: str, subject: str, body: str) -> None:
+        self.sent.append((to, subject, body))
+
+    async def send_many(self, messages: list[tuple[str, str, str]]) -> None:
+        self.sent.extend(messages)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def demo_data():
+    async def seed():
+        await init_db()
+        async with async_session_factory() as session:
+            await seed_users(session)
+            await seed_projects_and_tasks(session)
+    _run(seed())
+
+
+@pytest.fixture
+def run():
+    return _run
+
+
+@pytest.fixture
+def notifier() -> RecordingNotifier:
+    return RecordingNotifier()
@@ -0,0 +1,44 @@
+"""An expired availability index keeps answering while one background task reloads it."""
+import asyncio
+
+from proplan.database import async_session_factory
+from proplan.utils.availability_index import AvailabilityIndex
+
+
+def test_expired_index_serves_the_old_snapshot_while_reloading(run):
+    async def scenario():
+        index = AvailabilityIndex(ttl=60)
+        async with async_session_factory() as session:
+            await index.ensure_loaded(session)
+            assert index.loads == 1 and index.is_assigned(3)  # worker1 holds the first demo task
+
+            index._loaded_at -= 120  # the TTL ran out
+            assert await index.ensure_loaded(session) is index
+            assert index.loads == 1 and index._refresh is not None
+            assert index.is_assigned(3)  # still answered from the old snapshot
+            assert await index.ensure_loaded(session) is index  # no second reload is started
+
+            # a write made while the reload reads the tables survives the swap
+            index.assign(10_000, 99)
+            await index._refresh
+        assert index.loads == 2 and index.loaded and index._refresh is None
+        assert index.is_assigned(3) and index.is_assigned(99)
+
+    run(scenario())
+
+
+def test_invalidate_discards_a_reload_in_flight(run):
+    async def scenario():
+        index = AvailabilityIndex(ttl=60)
+        async with async_session_factory() as session:
+            await index.ensure_loaded(session)
+            index._loaded_at -= 120
+            await index.ensure_loaded(session)
+            refresh = index._refresh
+            index.invalidate()
+            await refresh
+            assert not index.loaded and index.loads == 1
+            await index.ensure_loaded(session)
+        assert index.loaded and index.loads == 2
+
+    run(scenario())
@@ -0,0 +1,72 @@
+"""`max_assignment` against a brute-force matcher on small random instances."""
+import random
+from datetime import date, timedelta
+
+from proplan.utils.matching import Slot, blocked_tasks, max_assignment
+
+DAY0 = date(2030, 1, 1)
+
+
+def _overlaps(slot: Slot, ranges: list[tuple[date, date]]) -> bool:
+    return any(slot.start <= b and slot.end >= a for a, b in ranges)
+
+
+def _window(rng: random.Random, span: int = 20, longest: int = 6) -> tuple[date, date]:
+    start = DAY0 + timedelta(days=rng.randrange(span))
+    return start, start + timedelta(days=rng.randrange(longest))
+
+
+def _instance(rng: random.Random):
+    slots = [Slot(f"t{i}", rng.randrange(3), *_window(rng)) for i in range(rng.randrange(1, 5))]
+    workers = list(range(rng.randrange(1, 7)))
+    leave = {w: [_window(rng) for _ in range(rng.randrange(1, 3))] for w in workers if rng.random() < 0.6}
+    return slots, workers, leave
+
+
+def _brute_force(slots: list[Slot], workers: list[int], leave: dict) -> int:
+    """Size of a maximum assignment, trying every choice for every worker."""
+    def best(k: int, free: tuple[int, ...]) -> int:
+        if k == len(workers):
+            return 0
+        w = workers[k]
+        result = best(k + 1, free)  # w stays unassigned
+        for i, slot in enumerate(slots):
+            if free[i] and not _overlaps(slot, leave.get(w, [])):
+                result = max(result, 1 + best(k + 1, free[:i] + (free[i] - 1,) + free[i + 1:]))
+        return result
+    return best(0, tuple(s.capacity for s in slots))
+
+
+def test_blocked_tasks_matches_overlap():
+    rng = random.Random(7)
+    for _ in range(500):
+        slots, workers, leave = _instance(rng)
+        expected = {w: {i for i, s in enumerate(slots) if _overlaps(s, ranges)} for w, ranges in leave.items()}
+        assert blocked_tasks(slots, leave) == {w: hit for w, hit in expected.items() if hit}
+
+
+def test_blocked_tasks_edges():
+    long_task = Slot("long", 1, date(2030, 1, 1), date(2030, 1, 31))
+    short_task = Slot("short", 1, date(2030, 1, 20), date(2030, 1, 21))
+    leave = {
+        1: [(date(2030, 1, 31), date(2030, 2, 2))],  # touches the long task's last day
+        2: [(date(2030, 1, 10), date(2030, 1, 10))],  # inside the long task, before the short one
+        3: [(date(2030, 1, 22), date(2030, 1, 22))],  # the day after the short task ends
+        4: [(date(2029, 12, 1), date(2029, 12, 31))],  # before both
+    }
+    assert blocked_tasks([long_task, short_task], leave) == {1: {0}, 2: {0}, 3: {0}}
+
+
+def test_max_assignment_is_maximum_and_valid():
+    rng = random.Random(11)
+    for _ in range(1000):
+        slots, workers, leave = _instance(rng)
+        pairs = max_assignment(slots, workers, leave)
+        assigned = [w for _, w in pairs]
+        assert len(assigned) == len(set(assigned))
+        by_key = {s.key: s for s in slots}
+        for key, w in pairs:
+            assert not _overlaps(by_key[key], leave.get(w, []))
+        for s in slots:
+            assert sum(1 for key, _ in pairs if key == s.key) <= s.capacity
+        assert len(pairs) == _brute_force(slots, workers, leave), (slots, workers, leave)
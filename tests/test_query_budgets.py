@@ -0,0 +1,90 @@
+"""
+Query budgets for write paths and the reminder job: the statement count must not grow
+with the number of projects, managers or leave entries involved.
+"""
+from datetime import date
+
+from proplan.database import async_session_factory
+from proplan.enums import DayOffType, Role
+from proplan.managers.dayoff_manager import DayOffManager
+from proplan.managers.scheduler_service import SchedulerManager
+from proplan.managers.task_manager import TaskManager
+from proplan.models import Project, ProjectWorkerLink, Task, User, UserDayOff
+from proplan.query_audit import audit_queries
+
+
+async def _new_workers(session, label: str, count: int) -> list[User]:
+    workers = [
+        User(name=f"{label} worker {i}", email=f"{label}-worker-{i}@example.com", password_hash="", role=Role.WORKER)
+        for i in range(count)
+    ]
+    session.add_all(workers)
+    await session.commit()
+    return workers
+
+
+async def _staff_projects(session, label: str, members: list[User], count: int) -> list[Project]:
+    """`count` new projects, each with its own manager, all staffed with `members`."""
+    projects = []
+    for i in range(count):
+        manager = User(name=f"{label} manager {i}", email=f"{label}-manager-{i}@example.com", password_hash="", role=Role.MANAGER)
+        project = Project(name=f"{label} project {i}", manager=manager)
+        session.add(project)
+        await session.flush()
+        session.add_all(ProjectWorkerLink(project_id=project.id, user_id=w.id) for w in members)
+        projects.append(project)
+    await session.commit()
+    return projects
+
+
+def test_dayoff_create(run, notifier):
+    async def scenario():
+        async with async_session_factory() as session:
+            [worker] = await _new_workers(session, "dayoff", 1)
+            await _staff_projects(session, "dayoff", [worker], 3)
+            with audit_queries("DayOffManager.create") as audit:
+                await DayOffManager(notifier).create(session, worker, DayOffType.DAY_OFF, date(2031, 1, 6), date(2031, 1, 7))
+        # insert (+ its version), refresh, then one joined query for the managers
+        audit.assert_budget(max_statements=5, max_repeats=1)
+        assert len(notifier.sent) == 3
+
+    run(scenario())
+
+
+def test_assign_worker(run, notifier):
+    async def scenario():
+        async with async_session_factory() as session:
+            [worker] = await _new_workers(session, "assign", 1)
+            [project] = await _staff_projects(session, "assign", [worker], 1)
+            task = Task(name="Budget task", project_id=project.id)
+            session.add(task)
+            await session.commit()
+        # a fresh session, so the task and worker are read like in a request
+        async with async_session_factory() as session:
+            with audit_queries("TaskManager.assign_worker") as audit:
+                result = await TaskManager(notifier).assign_worker(session, task.id, worker.id)
+        assert result == {"ok": True}
+        # task, worker, membership, availability, existing link, insert
+        audit.assert_budget(max_statements=6, max_repeats=1)
+        assert [to for to, _, _ in notifier.sent] == [worker.email]
+
+    run(scenario())
+
+
+def test_reminder_job(run, notifier):
+    async def scenario():
+        async with async_session_factory() as session:
+            workers = await _new_workers(session, "reminder", 2)
+            await _staff_projects(session, "reminder", workers, 2)
+            session.add_all(
+                UserDayOff(user_id=w.id, type=DayOffType.HOLIDAY, start_date=date.today(), end_date=date.today())
+                for w in workers
+            )
+            await session.commit()
+        with audit_queries("job:daily-reminders") as audit:
+            await SchedulerManager(notifier, DayOffManager(notifier))._send_start_reminders()
+        # one joined query, however many entries, users and managers it resolves
+        audit.assert_budget(max_statements=1)
+        assert len(notifier.sent) == len(workers) * 2
+
+    run(scenario())
@@ -0,0 +1,14 @@
+"""Portfolio CSV export: fixed columns per section, header even for an empty month."""
+from proplan.managers.report_manager import PORTFOLIO_COLUMNS, ReportManager
+
+EMPTY = {"year": 2030, "month": 1, "projects": [], "workers": [], "managers": []}
+
+
+def test_empty_sections_still_have_a_header():
+    for section, columns in PORTFOLIO_COLUMNS.items():
+        assert ReportManager().portfolio_csv_rows(EMPTY, section) == [list(columns)]
+
+
+def test_rows_follow_the_fixed_columns():
+    report = {**EMPTY, "workers": [{"tasks": 4, "name": "Ana", "user_id": 7}]}
+    assert ReportManager().portfolio_csv_rows(report, "workers") == [["user_id", "name", "tasks"], [7, "Ana", 4]]
@@ -0,0 +1,20 @@
+"""/ws answers malformed frames with an error message instead of dropping the socket."""
+from starlette.testclient import TestClient
+
+from proplan.main import app
+
+ERROR = {"type": "error", "detail": "Expected {action: subscribe|unsubscribe, topics: [...]}"}
+
+
+def test_bad_frames_get_an_error_reply():
+    with TestClient(app) as client:
+        token = client.post("/auth/token", data={"username": "admin@example.com", "password": "admin123"}).json()["access_token"]
+        with client.websocket_connect(f"/ws?token={token}") as ws:
+            ws.send_text("not json")
+            assert ws.receive_json() == ERROR
+            ws.send_bytes(b"\x00\x01")
+            assert ws.receive_json() == ERROR
+            ws.send_json({"action": "subscribe", "topics": [{"project": 1}]})
+            assert ws.receive_json() == ERROR
+            ws.send_json({"action": "subscribe", "topics": ["project:1"]})
+            assert ws.receive_json() == {"type": "subscribed", "topics": ["project:1"], "denied": []}